@@ -0,0 +1 @@
+"""Benchmarks for yem_sistem hot paths (run as ``python -m benchmarks.<name>``)."""
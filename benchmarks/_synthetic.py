@@ -0,0 +1,249 @@
+"""Seeded synthetic feed-center data shared by the benchmarks."""
+
+from __future__ import annotations
+
+import random
+import warnings
+from collections.abc import Iterator
+from datetime import datetime, time, timedelta, timezone
+from decimal import Decimal
+from itertools import chain
+from pathlib import Path
+
+from sqlalchemy import create_engine, exc as sa_exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+import yem_sistem.models  # noqa: F401  (registers every table on Base.metadata)
+from yem_sistem.db.base import Base
+from yem_sistem.imports.dtm_batch_import import OPTIONAL_DM_COLUMN, REQUIRED_COLUMNS, DtmBatchImportService, LoadRow
+from yem_sistem.materials.models import Material
+from yem_sistem.stock_movements.models import MovementReason, MovementType, StockMovement
+from yem_sistem.stock_movements.service import StockService
+
+INGREDIENTS_PER_BATCH = 10
+MATERIAL_COUNT = 40
+LEDGER_CHUNK = 50_000
+# every tenth ledger line is a truck delivery, the rest DTM consumption
+DELIVERY_EVERY = 10
+
+
+def make_engine(url: str) -> Engine:
+    """Create a fresh schema on ``url``; every table is dropped first."""
+    warnings.filterwarnings("ignore", category=sa_exc.SAWarning)
+    if url == "sqlite://":
+        # one shared connection so every session sees the same in-memory database
+        engine = create_engine(url, future=True, poolclass=StaticPool, connect_args={"check_same_thread": False})
+    else:
+        engine = create_engine(url, future=True)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def seed_materials(session: Session, opening_kg: Decimal = Decimal("100000000.000")) -> list[Material]:
+    """Insert the material master plus one large IN movement per material."""
+    materials = [Material(code=f"M{i:03d}", name=f"Material {i:03d}", unit="kg") for i in range(MATERIAL_COUNT)]
+    session.add_all(materials)
+    session.flush()
+    StockService(session).add_movements(
+        [
+            StockMovement(
+                material_id=m.id,
+                movement_type=MovementType.IN,
+                reason=MovementReason.MATERIAL_ACCEPTANCE,
+                quantity=opening_kg,
+                movement_at=datetime(2020, 1, 1, tzinfo=timezone.utc),
+                reference_type="acceptance",
+            )
+            for m in materials
+        ]
+    )
+    session.commit()
+    return materials
+
+
+def iter_acceptances(
+    count: int,
+    seed: int = 42,
+    start: datetime = datetime(2021, 1, 1, tzinfo=timezone.utc),
+    span: timedelta = timedelta(days=3 * 365),
+) -> Iterator[dict]:
+    """Yield ``acceptances`` insert rows: truck deliveries spread evenly over ``span`` from ``start``."""
+    rng = random.Random(seed)
+    companies = [f"Supplier {i:02d}" for i in range(15)]
+    letters = "ABCDEFGHJKLMNPRSTUVYZ"
+    plates = [f"{rng.randint(1, 81):02d} {rng.choice(letters)}{rng.choice(letters)} {rng.randint(100, 9999)}" for _ in range(60)]
+    step = span / max(count, 1)
+    for i in range(count):
+        yield {
+            "accepted_at": start + step * i,
+            "company": rng.choice(companies),
+            "plate": rng.choice(plates),
+            "material_id": rng.randint(1, MATERIAL_COUNT),
+            "quantity": Decimal(rng.randint(5_000, 30_000)),
+            "note": None,
+        }
+
+
+def seed_ledger(session: Session, movement_count: int, seed: int = 42) -> None:
+    """Fill the ledger with ``movement_count`` movements over three years and rebuild `stock_balances`.
+
+    Expects `seed_materials` to have run, so its opening stock keeps every
+    balance positive. Every `DELIVERY_EVERY`-th movement is a delivery with its
+    `Acceptance` row, the rest are DTM consumption lines. Rows are written in
+    chunks of `LEDGER_CHUNK`, so 10M movements need little memory.
+    """
+    from sqlalchemy import insert
+
+    from yem_sistem.acceptance.models import Acceptance
+    from yem_sistem.stock_balances.service import StockBalanceService
+
+    rng = random.Random(seed)
+    start = datetime(2021, 1, 1, tzinfo=timezone.utc)
+    span = timedelta(days=3 * 365)
+    step = span / max(movement_count, 1)
+    acceptances = iter_acceptances(len(range(0, movement_count, DELIVERY_EVERY)), seed=seed, start=start, span=span)
+    for first in range(0, movement_count, LEDGER_CHUNK):
+        indexes = range(first, min(first + LEDGER_CHUNK, movement_count))
+        deliveries = [next(acceptances) for i in indexes if i % DELIVERY_EVERY == 0]
+        ids = session.scalars(insert(Acceptance).returning(Acceptance.id, sort_by_parameter_order=True), deliveries).all()
+        rows = [
+            {
+                "material_id": row["material_id"],
+                "movement_type": MovementType.IN,
+                "reason": MovementReason.MATERIAL_ACCEPTANCE,
+                "quantity": row["quantity"],
+                "movement_at": row["accepted_at"],
+                "reference_type": "acceptance",
+                "reference_id": acceptance_id,
+                "note": None,
+            }
+            for acceptance_id, row in zip(ids, deliveries)
+        ]
+        rows.extend(
+            {
+                "material_id": rng.randint(1, MATERIAL_COUNT),
+                "movement_type": MovementType.OUT_PRODUCTION,
+                "reason": MovementReason.DTM_CONSUMPTION,
+                "quantity": Decimal(f"{rng.uniform(20, 900):.1f}"),
+                "movement_at": start + step * i,
+                "reference_type": "DTM_BATCH",
+                "reference_id": i // INGREDIENTS_PER_BATCH + 1,
+                "note": None,
+            }
+            for i in indexes
+            if i % DELIVERY_EVERY
+        )
+        session.execute(insert(StockMovement), rows)
+    StockBalanceService(session).rebuild()
+    session.commit()
+
+
+def seed_herd_year(session: Session, year: int = 2024, groups: int = 12, seed: int = 42) -> None:
+    """Pens, pen-level consumption, group yields, dry matter ratios and prices for a whole year.
+
+    Expects `seed_materials` to have run. Two pens per group; recipe ``Rnn`` is
+    delivered to group ``nn + 1``, matching `iter_load_sheet_values`.
+    """
+    from datetime import date
+
+    from sqlalchemy import insert
+
+    from yem_sistem.herd_kpis.models import GroupYield, PenGroup
+    from yem_sistem.monthly_prices.models import MonthlyPrice
+    from yem_sistem.pen_daily.models import PenDaily
+
+    rng = random.Random(seed)
+    materials = session.query(Material).order_by(Material.id).all()
+    for m in materials:
+        m.dry_matter_ratio = Decimal(str(round(rng.uniform(0.2, 0.9), 4)))
+    session.add_all(
+        PenGroup(pen_code=f"P{g:02d}{side}", group_number=g + 1, recipe_id=f"R{g:02d}")
+        for g in range(groups)
+        for side in "AB"
+    )
+    session.execute(
+        insert(MonthlyPrice),
+        [
+            {"material_id": m.id, "price_month": date(year, month, 1), "unit_price": Decimal(str(round(rng.uniform(2, 20), 3)))}
+            for m in materials
+            for month in range(1, 13)
+        ],
+    )
+    first = date(year, 1, 1)
+    days = [first + timedelta(days=i) for i in range((date(year + 1, 1, 1) - first).days)]
+    pen_rows = []
+    yield_rows = []
+    for d in days:
+        for g in range(groups):
+            yield_rows.append(
+                {"yield_date": d, "group_number": g + 1, "total_cows": rng.randint(40, 120), "avg_yield": Decimal(str(round(rng.uniform(18, 40), 1)))}
+            )
+            # even groups are measured per pen, odd groups only through DTM loads
+            if g % 2:
+                continue
+            for side in "AB":
+                for m in rng.sample(materials, 8):
+                    pen_rows.append(
+                        {"record_date": d, "pen_code": f"P{g:02d}{side}", "material_id": m.id, "consumed_quantity": Decimal(str(round(rng.uniform(50, 600), 1)))}
+                    )
+    session.execute(insert(PenDaily), pen_rows)
+    session.execute(insert(GroupYield), yield_rows)
+    session.commit()
+
+
+def load_sheet_rows(row_count: int, seed: int = 42, zero_ratio: float = 0.01) -> list[LoadRow]:
+    """Build Load sheet records shaped like `DtmBatchImportService._parse_load_sheet` output."""
+    sheet = chain([(*REQUIRED_COLUMNS, OPTIONAL_DM_COLUMN)], iter_load_sheet_values(row_count, seed=seed, zero_ratio=zero_ratio))
+    return list(DtmBatchImportService._iter_load_rows(sheet))
+
+
+def iter_load_sheet_values(row_count: int, seed: int = 42, zero_ratio: float = 0.01) -> Iterator[tuple]:
+    """Yield raw Load sheet cell tuples in `REQUIRED_COLUMNS` order (plus the optional DM column)."""
+    rng = random.Random(seed)
+    recipes = [(f"R{i:02d}", f"Recipe {i:02d}") for i in range(12)]
+    start = datetime(2024, 1, 1, 5, 0)
+    produced = 0
+    batch_no = 0
+    while produced < row_count:
+        batch_no += 1
+        started = start + timedelta(minutes=17 * batch_no)
+        recipe_id, recipe_name = rng.choice(recipes)
+        ingredients = rng.sample(range(MATERIAL_COUNT), INGREDIENTS_PER_BATCH)
+        for material_no in ingredients:
+            target = round(rng.uniform(20, 900), 1)
+            loaded = 0 if rng.random() < zero_ratio else round(target * rng.uniform(0.95, 1.05), 1)
+            yield (
+                f"B{batch_no:07d}",
+                f"Pen {batch_no % 9 + 1}",
+                datetime.combine(started.date(), time(0, 0)),
+                started.time(),
+                (started + timedelta(minutes=12)).time(),
+                f"Feeder {batch_no % 3 + 1}",
+                recipe_id,
+                recipe_name,
+                f"M{material_no:03d}",
+                f"Material {material_no:03d}",
+                target,
+                loaded,
+                round((loaded - target) / target * 100, 2),
+                None,
+            )
+            produced += 1
+            if produced == row_count:
+                break
+
+
+def write_load_sheet(path: Path, row_count: int, seed: int = 42) -> Path:
+    """Write a synthetic DTM export with a ``Load`` sheet to ``path``."""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Load")
+    ws.append([*REQUIRED_COLUMNS, OPTIONAL_DM_COLUMN])
+    for values in iter_load_sheet_values(row_count, seed=seed):
+        ws.append(values)
+    wb.save(path)
+    return path
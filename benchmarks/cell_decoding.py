@@ -0,0 +1,115 @@
+"""Per-row decode cost of the typed column decoders versus the previous static converters.
+
+Usage::
+
+    PYTHONPATH=src python -m benchmarks.cell_decoding --rows 100000
+
+``legacy`` reproduces what one Load sheet row cost before the decoder layer:
+the blank-row ``str(cell).strip()`` scan, one dict per row, and the
+``_to_decimal``/``_to_date``/``_to_time``/``str(...).strip()`` calls made later
+by ``_persist_rows``. ``typed`` runs `DtmBatchImportService._iter_load_rows`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import chain
+
+from benchmarks._synthetic import iter_load_sheet_values
+from yem_sistem.imports.dtm_batch_import import OPTIONAL_DM_COLUMN, REQUIRED_COLUMNS, DtmBatchImportService
+
+
+def _legacy_decimal(value: object) -> Decimal | None:
+    if value is None:
+        return None
+    s = str(value).strip().replace(",", ".")
+    if not s:
+        return None
+    return Decimal(s)
+
+
+def _legacy_date(value: object) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.fromisoformat(str(value)).date()
+
+
+def _legacy_time(value: object):
+    if value is None or str(value).strip() == "":
+        return None
+    if isinstance(value, datetime):
+        return value.time().replace(tzinfo=None)
+    if hasattr(value, "hour"):
+        return value.replace(tzinfo=None)
+    s = str(value).strip()
+    for fmt in ("%H:%M:%S", "%H:%M"):
+        try:
+            return datetime.strptime(s, fmt).time()
+        except ValueError:
+            pass
+    return None
+
+
+def _legacy_opt_str(value: object) -> str | None:
+    if value is None:
+        return None
+    s = str(value).strip()
+    return s or None
+
+
+def decode_legacy(header: tuple, rows: list[tuple]) -> int:
+    index = {name: header.index(name) for name in header}
+    count = 0
+    for row in rows:
+        if all((cell is None or str(cell).strip() == "") for cell in row):
+            continue
+        r = {col: row[index[col]] if index[col] < len(row) else None for col in REQUIRED_COLUMNS}
+        r[OPTIONAL_DM_COLUMN] = row[index[OPTIONAL_DM_COLUMN]]
+        _legacy_decimal(r["Loaded"])
+        for key in ("Ingredient Id", "Ingredient Name"):
+            if r[key] is not None and str(r[key]).strip() != "":
+                str(r[key]).strip().upper()
+        str(r["ID Batch"]).strip()
+        _legacy_date(r["Date"])
+        _legacy_time(r["Start time"])
+        _legacy_time(r["End Time"])
+        str(r["Batch"] or "").strip()
+        _legacy_opt_str(r["Feeder"])
+        _legacy_opt_str(r["Recipe ID"])
+        _legacy_opt_str(r["Recipe Name"])
+        _legacy_decimal(r["Target Weight"])
+        _legacy_decimal(r["Error (%)"])
+        count += 1
+    return count
+
+
+def decode_typed(header: tuple, rows: list[tuple]) -> int:
+    return sum(1 for _ in DtmBatchImportService._iter_load_rows(chain([header], rows)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    header = (*REQUIRED_COLUMNS, OPTIONAL_DM_COLUMN)
+    rows = list(iter_load_sheet_values(args.rows))
+    for name, fn in (("legacy", decode_legacy), ("typed", decode_typed)):
+        best = min(_timed(fn, header, rows) for _ in range(args.repeat))
+        print(f"{name:<6} rows={len(rows)} best={best:6.3f}s per_row={best / len(rows) * 1e6:6.2f}us")
+
+
+def _timed(fn, header: tuple, rows: list[tuple]) -> float:
+    started = time.perf_counter()
+    fn(header, rows)
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Compare the ORM and bulk `_persist_rows` writers on synthetic Load sheets.
+
+Usage::
+
+    PYTHONPATH=src python -m benchmarks.dtm_persist --rows 10000 100000
+    BENCH_DATABASE_URL=postgresql+psycopg://.../yem_bench PYTHONPATH=src python -m benchmarks.dtm_persist
+
+The target database is dropped and recreated for every run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from benchmarks._synthetic import load_sheet_rows, make_engine, seed_materials
+from yem_sistem.batch_items.models import BatchItem
+from yem_sistem.imports.dtm_batch_import import DtmBatchImportService, DtmImportSummary
+from yem_sistem.production_batches.models import ProductionBatch
+from yem_sistem.stock_movements.models import StockMovement
+
+
+def _snapshot(session: Session) -> tuple[list[tuple], list[tuple], list[tuple]]:
+    batches = session.execute(
+        select(
+            ProductionBatch.id,
+            ProductionBatch.id_batch,
+            ProductionBatch.batch_name,
+            ProductionBatch.date,
+            ProductionBatch.start_time,
+            ProductionBatch.end_time,
+            ProductionBatch.feeder,
+            ProductionBatch.recipe_id,
+            ProductionBatch.recipe_name,
+            ProductionBatch.status,
+            ProductionBatch.suspicious_count_zero,
+            ProductionBatch.suspicious_reason,
+        ).order_by(ProductionBatch.id)
+    ).all()
+    items = session.execute(
+        select(
+            BatchItem.production_batch_id,
+            BatchItem.material_id,
+            BatchItem.id_batch,
+            BatchItem.start_time,
+            BatchItem.target_weight,
+            BatchItem.loaded_weight,
+            BatchItem.error_percent,
+            BatchItem.is_zero_loaded,
+            BatchItem.anomaly_note,
+        ).order_by(BatchItem.production_batch_id, BatchItem.material_id)
+    ).all()
+    movements = session.execute(
+        select(
+            StockMovement.material_id,
+            StockMovement.movement_type,
+            StockMovement.quantity,
+            StockMovement.movement_at,
+            StockMovement.reference_id,
+            StockMovement.note,
+        )
+        .where(StockMovement.reference_type == "DTM_BATCH")
+        .order_by(StockMovement.reference_id, StockMovement.material_id)
+    ).all()
+    return [tuple(r) for r in batches], [tuple(r) for r in items], [tuple(r) for r in movements]
+
+
+def run_once(url: str, rows: list[dict[str, object]], *, bulk: bool) -> tuple[float, DtmImportSummary, tuple]:
+    engine = make_engine(url)
+    try:
+        with Session(engine, expire_on_commit=False) as session:
+            seed_materials(session)
+            service = DtmBatchImportService(session, bulk=bulk)
+            started = time.perf_counter()
+            summary = service._persist_rows(rows)
+            session.commit()
+            elapsed = time.perf_counter() - started
+            return elapsed, summary, _snapshot(session)
+    finally:
+        engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--url", default=os.getenv("BENCH_DATABASE_URL", "sqlite://"))
+    args = parser.parse_args()
+
+    for row_count in args.rows:
+        rows = load_sheet_rows(row_count)
+        orm_s, orm_summary, orm_snapshot = run_once(args.url, rows, bulk=False)
+        bulk_s, bulk_summary, bulk_snapshot = run_once(args.url, rows, bulk=True)
+        identical = orm_summary == bulk_summary and orm_snapshot == bulk_snapshot
+        print(
+            f"rows={row_count:>7} orm={orm_s:8.2f}s bulk={bulk_s:8.2f}s "
+            f"speedup={orm_s / bulk_s:5.1f}x identical={identical} summary={bulk_summary}"
+        )
+        if not identical:
+            raise SystemExit("bulk writer output differs from the ORM writer")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Time `FeedEfficiencyService.compute` over a synthetic year of herd and feeding data.
+
+Usage::
+
+    PYTHONPATH=src python -m benchmarks.feed_efficiency --dtm-rows 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from benchmarks._synthetic import load_sheet_rows, make_engine, seed_herd_year, seed_materials
+from yem_sistem.analytics.feed_efficiency import FeedEfficiencyService
+from yem_sistem.imports.dtm_batch_import import DtmBatchImportService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dtm-rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = make_engine(os.getenv("BENCH_DATABASE_URL", "sqlite://"))
+    with Session(engine) as session:
+        seed_materials(session)
+        seed_herd_year(session)
+        DtmBatchImportService(session)._persist_rows(load_sheet_rows(args.dtm_rows))
+        session.commit()
+
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            grid = FeedEfficiencyService(session).compute(date(2024, 1, 1), date(2024, 12, 31), milk_price=Decimal("14.5"))
+            timings.append(time.perf_counter() - started)
+        print(f"groups={len(grid.groups)} days={grid.days} best={min(timings):.3f}s")
+        print(f"mean kg DM / kg milk: {np.nanmean(grid.dm_per_milk):.3f}  30d trend (last day): {np.round(grid.trends[30][:, -1], 3)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Peak memory of the streaming Load sheet parser versus a full-workbook parse.
+
+Usage::
+
+    PYTHONPATH=src python -m benchmarks.load_parser_memory --rows 10000 50000 100000
+
+``full`` reproduces the previous parser (full-mode workbook, every row listed,
+one dict per row); ``streaming`` drains `DtmBatchImportService._parse_load_sheet`.
+Peak figures come from tracemalloc and exclude the uploaded bytes themselves.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+
+from benchmarks._synthetic import write_load_sheet
+from yem_sistem.imports.dtm_batch_import import OPTIONAL_DM_COLUMN, REQUIRED_COLUMNS, DtmBatchImportService
+
+
+def parse_full(content: bytes) -> int:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(filename=BytesIO(content), data_only=True)
+    ws = wb["Load"]
+    values = list(ws.iter_rows(values_only=True))
+    header = [str(c).strip() if c is not None else "" for c in values[0]]
+    index = {name: header.index(name) for name in header}
+    parsed = []
+    for row in values[1:]:
+        rec = {col: row[index[col]] for col in REQUIRED_COLUMNS}
+        rec[OPTIONAL_DM_COLUMN] = row[index[OPTIONAL_DM_COLUMN]]
+        parsed.append(rec)
+    return len(parsed)
+
+
+def parse_streaming(content: bytes) -> int:
+    return sum(1 for _ in DtmBatchImportService._parse_load_sheet("bench.xlsx", content))
+
+
+def measure(fn, content: bytes) -> tuple[int, float, float]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = fn(content)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak / 1024 / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 50_000, 100_000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for row_count in args.rows:
+            content = write_load_sheet(Path(tmp) / f"load_{row_count}.xlsx", row_count).read_bytes()
+            for name, fn in (("full", parse_full), ("streaming", parse_streaming)):
+                count, elapsed, peak_mb = measure(fn, content)
+                print(f"rows={row_count:>7} {name:<9} parsed={count:>7} time={elapsed:7.2f}s peak={peak_mb:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""Reproducible benchmark suite: time the hot paths on seeded data, save JSON, compare runs.
+
+Usage::
+
+    PYTHONPATH=src python -m benchmarks.suite run --scale small --output before.json
+    PYTHONPATH=src python -m benchmarks.suite run --scale small --output after.json
+    PYTHONPATH=src python -m benchmarks.suite compare before.json after.json --threshold 0.15
+    BENCH_DATABASE_URL=postgresql+psycopg://.../yem_bench PYTHONPATH=src python -m benchmarks.suite run --scale large -o pg.json
+
+Every case works on data from `benchmarks._synthetic` with the same seed, so
+two runs at the same scale time identical work. ``compare`` exits with 1 when
+a case's median got slower than ``--threshold`` (a fraction) allows. The
+target database is dropped and recreated for every run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import sqlalchemy
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from benchmarks._synthetic import MATERIAL_COUNT, load_sheet_rows, make_engine, seed_ledger, seed_materials, write_load_sheet
+from yem_sistem.batch_items.models import BatchItem
+from yem_sistem.imports.dtm_batch_import import DtmBatchImportService
+from yem_sistem.production_batches.service import ProductionBatchService
+from yem_sistem.stock_movements.service import StockService
+from yem_sistem.web.routes import _stock_rows
+
+RESULTS_VERSION = 1
+FIX_ZERO_RATIO = 0.05
+
+
+@dataclass(slots=True)
+class Scale:
+    load_rows: int
+    ledger_movements: int
+    stock_lookups: int
+    fix_items: int
+
+
+SCALES = {
+    "small": Scale(load_rows=10_000, ledger_movements=10_000, stock_lookups=1_000, fix_items=20),
+    "medium": Scale(load_rows=100_000, ledger_movements=1_000_000, stock_lookups=1_000, fix_items=100),
+    "large": Scale(load_rows=100_000, ledger_movements=10_000_000, stock_lookups=1_000, fix_items=100),
+}
+
+
+@dataclass(slots=True)
+class CaseResult:
+    params: dict
+    seconds: list[float] = field(default_factory=list)
+
+    def as_json(self) -> dict:
+        return {
+            "params": self.params,
+            "seconds": [round(s, 6) for s in self.seconds],
+            "min": round(min(self.seconds), 6),
+            "median": round(statistics.median(self.seconds), 6),
+            "mean": round(statistics.fmean(self.seconds), 6),
+        }
+
+
+def _timed(fn: Callable[[], object]) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def bench_parse_load_sheet(url: str, scale: Scale, seed: int, repeat: int) -> CaseResult:
+    """`DtmBatchImportService._parse_load_sheet` draining a stored .xlsx export."""
+    result = CaseResult({"rows": scale.load_rows})
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_load_sheet(Path(tmp) / "load.xlsx", scale.load_rows, seed=seed)
+        for _ in range(repeat):
+            result.seconds.append(_timed(lambda: sum(1 for _ in DtmBatchImportService._parse_load_sheet(path.name, path))))
+    return result
+
+
+def bench_persist_rows(url: str, scale: Scale, seed: int, repeat: int) -> CaseResult:
+    """`DtmBatchImportService._persist_rows` plus commit, on a fresh database each time."""
+    rows = load_sheet_rows(scale.load_rows, seed=seed)
+    result = CaseResult({"rows": scale.load_rows})
+    for _ in range(repeat):
+        engine = make_engine(url)
+        try:
+            with Session(engine) as session:
+                seed_materials(session)
+                service = DtmBatchImportService(session)
+
+                def persist() -> None:
+                    service._persist_rows(rows)
+                    session.commit()
+
+                result.seconds.append(_timed(persist))
+        finally:
+            engine.dispose()
+    return result
+
+
+def bench_ledger(url: str, scale: Scale, seed: int, repeat: int) -> dict[str, CaseResult]:
+    """Stock reads and batch fixes against a ledger of ``scale.ledger_movements`` movements."""
+    rng = random.Random(seed)
+    engine = make_engine(url)
+    try:
+        with Session(engine) as session:
+            seed_materials(session)
+            seed_ledger(session, scale.ledger_movements, seed=seed)
+            # enough zero-loaded lines for every repeat to fix its own items
+            needed = scale.fix_items * repeat
+            DtmBatchImportService(session)._persist_rows(
+                load_sheet_rows(int(needed / FIX_ZERO_RATIO * 1.5), seed=seed, zero_ratio=FIX_ZERO_RATIO)
+            )
+            session.commit()
+            zero_items = session.execute(
+                select(BatchItem.production_batch_id, BatchItem.id)
+                .where(BatchItem.is_zero_loaded.is_(True))
+                .order_by(BatchItem.id)
+                .limit(needed)
+            ).all()
+            if len(zero_items) < needed:
+                raise SystemExit(f"synthetic data has {len(zero_items)} zero-loaded items, {needed} needed")
+
+            lookups = CaseResult({"movements": scale.ledger_movements, "lookups": scale.stock_lookups})
+            stocks = CaseResult({"movements": scale.ledger_movements, "materials": MATERIAL_COUNT})
+            fixes = CaseResult({"movements": scale.ledger_movements, "items": scale.fix_items})
+            stock_service = StockService(session)
+            batch_service = ProductionBatchService(session)
+            for round_no in range(repeat):
+                material_ids = [rng.randint(1, MATERIAL_COUNT) for _ in range(scale.stock_lookups)]
+                lookups.seconds.append(_timed(lambda: [stock_service.get_current_stock(m) for m in material_ids]))
+                session.rollback()
+                stocks.seconds.append(_timed(lambda: _stock_rows(session)))
+                session.rollback()
+                batch = zero_items[round_no * scale.fix_items : (round_no + 1) * scale.fix_items]
+                fixes.seconds.append(
+                    _timed(
+                        lambda: [
+                            batch_service.fix_item(
+                                batch_id=batch_id,
+                                batch_item_id=item_id,
+                                corrected_weight=Decimal("125.500"),
+                                correction_note="benchmark correction of a zero load",
+                                actor_role="ADMIN",
+                            )
+                            for batch_id, item_id in batch
+                        ]
+                    )
+                )
+            return {"get_current_stock": lookups, "stock_subquery": stocks, "fix_item": fixes}
+    finally:
+        engine.dispose()
+
+
+CASES: dict[str, Callable[..., CaseResult | dict[str, CaseResult]]] = {
+    "parse_load_sheet": bench_parse_load_sheet,
+    "persist_rows": bench_persist_rows,
+    "ledger": bench_ledger,
+}
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run(args: argparse.Namespace) -> int:
+    scale = SCALES[args.scale]
+    if args.load_rows:
+        scale = replace(scale, load_rows=args.load_rows)
+    if args.movements:
+        scale = replace(scale, ledger_movements=args.movements)
+    report = {
+        "version": RESULTS_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "database": make_url(args.url).get_backend_name(),
+        "scale": args.scale,
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": {},
+    }
+    for name in args.cases or list(CASES):
+        produced = CASES[name](args.url, scale, args.seed, args.repeat)
+        for case, result in (produced.items() if isinstance(produced, dict) else [(name, produced)]):
+            report["results"][case] = result.as_json()
+            print(f"{case:<18} median={report['results'][case]['median']:10.4f}s params={result.params}", file=sys.stderr)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    current = json.loads(Path(args.current).read_text(encoding="utf-8"))
+    for key in ("database", "scale", "seed"):
+        if baseline.get(key) != current.get(key):
+            print(f"warning: {key} differs ({baseline.get(key)} vs {current.get(key)})")
+
+    regressions = 0
+    print(f"{'case':<18} {'baseline':>10} {'current':>10} {'change':>8}")
+    for case in sorted(baseline["results"].keys() | current["results"].keys()):
+        before, after = baseline["results"].get(case), current["results"].get(case)
+        if before is None or after is None:
+            print(f"{case:<18} only in the {'current' if before is None else 'baseline'} run")
+            continue
+        change = after["median"] / before["median"] - 1 if before["median"] else 0.0
+        flag = ""
+        if before["params"] != after["params"]:
+            flag = "  params differ"
+        elif change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif change < -args.threshold:
+            flag = "  improved"
+        print(f"{case:<18} {before['median']:10.4f} {after['median']:10.4f} {change:+8.1%}{flag}")
+    if regressions:
+        print(f"{regressions} case(s) slower than the {args.threshold:.0%} threshold")
+    return 1 if regressions else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks and write a JSON report")
+    run_parser.add_argument("--scale", choices=list(SCALES), default="small")
+    run_parser.add_argument("--cases", nargs="+", choices=list(CASES), default=None)
+    run_parser.add_argument("--load-rows", type=int, default=None, help="Override the scale's Load sheet rows")
+    run_parser.add_argument("--movements", type=int, default=None, help="Override the scale's ledger size")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--url", default=os.getenv("BENCH_DATABASE_URL", "sqlite://"))
+    run_parser.add_argument("--output", "-o", default=None, help="JSON report path (default: stdout)")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="Compare two JSON reports and flag regressions")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown as a fraction (default 0.10)")
+    compare_parser.set_defaults(handler=compare)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+import sys
+
+from yem_sistem.cli import main
+
+sys.exit(main())
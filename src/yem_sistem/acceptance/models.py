@@ -5,7 +5,7 @@ from __future__ import annotations
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import DateTime, ForeignKey, String, UniqueConstraint, func
+from sqlalchemy import DateTime, ForeignKey, Index, String, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from yem_sistem.db.base import Base
@@ -24,6 +24,9 @@ class Acceptance(Base):
             "quantity",
             name="uq_acceptance_duplicate",
         ),
+        # keyset pagination: newest first, optionally per material
+        Index("ix_acceptance_accepted_at_id", "accepted_at", "id"),
+        Index("ix_acceptance_material_accepted_at_id", "material_id", "accepted_at", "id"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
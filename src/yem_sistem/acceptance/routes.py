@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
+from datetime import date
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, Form, Header, HTTPException
+from fastapi import APIRouter, Depends, Form, Header, HTTPException, Query, Request
 from fastapi.responses import HTMLResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from yem_sistem.acceptance.models import Acceptance
 from yem_sistem.acceptance.service import (
     AcceptanceAuthorizationError,
     AcceptanceCreateInput,
@@ -15,7 +18,9 @@ from yem_sistem.acceptance.service import (
     AcceptanceValidationError,
     parse_datetime,
 )
-from yem_sistem.db.session import get_session
+from yem_sistem.db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorError
+from yem_sistem.db.session import get_async_session, get_session
+from yem_sistem.web.templating import templates
 
 router = APIRouter(tags=["acceptance"])
 
@@ -55,71 +60,61 @@ def create_acceptance(
 
 
 @router.get("/acceptance/new", response_class=HTMLResponse)
-def acceptance_new_form() -> str:
-    return """
-<!doctype html>
-<html lang='en'>
-<head>
-  <meta charset='utf-8'>
-  <meta name='viewport' content='width=device-width, initial-scale=1'>
-  <title>New Acceptance</title>
-  <link href='https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css' rel='stylesheet'>
-</head>
-<body class='bg-light'>
-<div class='container py-4'>
-  <h1 class='mb-4'>Create Acceptance (IN)</h1>
-  <form method='post' action='/acceptance' class='card card-body shadow-sm'>
-    <div class='row g-3'>
-      <div class='col-md-4'><label class='form-label'>Date</label><input name='date' type='datetime-local' class='form-control' required></div>
-      <div class='col-md-4'><label class='form-label'>Company</label><input name='company' class='form-control'></div>
-      <div class='col-md-4'><label class='form-label'>Plate</label><input name='plate' class='form-control' required></div>
-      <div class='col-md-4'><label class='form-label'>Material ID</label><input name='material_id' type='number' class='form-control' required></div>
-      <div class='col-md-4'><label class='form-label'>Quantity (15,3)</label><input name='quantity' type='number' step='0.001' class='form-control' required></div>
-      <div class='col-md-12'><label class='form-label'>Note</label><textarea name='note' class='form-control'></textarea></div>
-    </div>
-    <div class='mt-3'>
-      <small class='text-muted'>Send role in header: <code>X-Role: ACCEPTANCE</code> or <code>X-Role: ADMIN</code></small><br>
-      <button type='submit' class='btn btn-primary mt-2'>Save Acceptance</button>
-    </div>
-  </form>
-</div>
-</body>
-</html>
-"""
+async def acceptance_new_form(request: Request) -> HTMLResponse:
+    return templates.TemplateResponse("acceptance_new.html", {"request": request, "page_title": "New Acceptance"})
 
 
-@router.get("/acceptance", response_class=HTMLResponse)
-def acceptance_list(session: Session = Depends(get_session)) -> str:
-    service = AcceptanceService(session)
-    rows = service.list_latest(limit=50)
+def _acceptance_json(acceptance: Acceptance) -> dict:
+    return {
+        "id": acceptance.id,
+        "accepted_at": acceptance.accepted_at.isoformat(),
+        "company": acceptance.company,
+        "plate": acceptance.plate,
+        "material_id": acceptance.material_id,
+        "quantity": str(acceptance.quantity),
+        "note": acceptance.note,
+    }
 
-    body_rows = "".join(
-        f"<tr><td>{r.id}</td><td>{r.accepted_at}</td><td>{r.company or ''}</td><td>{r.plate}</td><td>{r.material_id}</td><td>{r.quantity}</td><td>{r.note or ''}</td></tr>"
-        for r in rows
-    )
 
-    return f"""
-<!doctype html>
-<html lang='en'>
-<head>
-  <meta charset='utf-8'>
-  <meta name='viewport' content='width=device-width, initial-scale=1'>
-  <title>Acceptance List</title>
-  <link href='https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css' rel='stylesheet'>
-</head>
-<body class='bg-light'>
-<div class='container py-4'>
-  <div class='d-flex justify-content-between align-items-center mb-3'>
-    <h1 class='mb-0'>Last 50 Acceptance Entries</h1>
-    <a href='/acceptance/new' class='btn btn-primary'>New</a>
-  </div>
-  <div class='table-responsive card shadow-sm'>
-    <table class='table table-striped mb-0'>
-      <thead><tr><th>ID</th><th>Date</th><th>Company</th><th>Plate</th><th>Material</th><th>Quantity</th><th>Note</th></tr></thead>
-      <tbody>{body_rows}</tbody>
-    </table>
-  </div>
-</div>
-</body>
-</html>
-"""
+@router.get("/acceptances")
+async def list_acceptances(
+    material_id: int | None = Query(default=None),
+    start: date | None = Query(default=None),
+    end: date | None = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None),
+    session: AsyncSession = Depends(get_async_session),
+) -> dict:
+    """Acceptances newest first; pass ``next_cursor`` back as ``cursor`` for the following page."""
+    try:
+        page = await session.run_sync(
+            lambda s: AcceptanceService(s).list_page(
+                material_id=material_id, start=start, end=end, limit=limit, cursor=cursor
+            )
+        )
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {"items": [_acceptance_json(a) for a in page.items], "next_cursor": page.next_cursor}
+
+
+@router.get("/acceptance", response_class=HTMLResponse)
+async def acceptance_list(
+    request: Request,
+    material_id: int | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    session: AsyncSession = Depends(get_async_session),
+) -> HTMLResponse:
+    page = await list_acceptances(material_id=material_id, start=None, end=None, limit=50, cursor=cursor, session=session)
+    next_url = None
+    if page["next_cursor"]:
+        next_url = str(request.url.include_query_params(cursor=page["next_cursor"]))
+    return templates.TemplateResponse(
+        "acceptance_list.html",
+        {
+            "request": request,
+            "page_title": "Acceptance",
+            "rows": page["items"],
+            "next_url": next_url,
+            "first_url": None if cursor is None else str(request.url.remove_query_params("cursor")),
+        },
+    )
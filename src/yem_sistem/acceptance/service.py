@@ -3,14 +3,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from decimal import Decimal
 
-from sqlalchemy import desc, select
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from yem_sistem.acceptance.models import Acceptance
 from yem_sistem.audit_logs.models import AuditLog
+from yem_sistem.db.pagination import DEFAULT_PAGE_SIZE, Page, keyset_page, utc_day_range
+from yem_sistem.materials.index import material_index
 from yem_sistem.stock_movements.models import MovementReason, MovementType, StockMovement
 from yem_sistem.stock_movements.service import StockService
 
@@ -47,6 +49,8 @@ class AcceptanceService:
 
         if payload.quantity <= Decimal("0.000"):
             raise AcceptanceValidationError("quantity must be greater than 0")
+        if not material_index.contains(self.session, payload.material_id):
+            raise AcceptanceValidationError(f"unknown material_id={payload.material_id}")
 
         duplicate_stmt = select(Acceptance.id).where(
             Acceptance.accepted_at == payload.accepted_at,
@@ -98,8 +102,22 @@ class AcceptanceService:
         return acceptance
 
     def list_latest(self, limit: int = 50) -> list[Acceptance]:
-        stmt = select(Acceptance).order_by(desc(Acceptance.accepted_at), desc(Acceptance.id)).limit(limit)
-        return list(self.session.scalars(stmt).all())
+        return self.list_page(limit=limit).items
+
+    def list_page(
+        self,
+        *,
+        material_id: int | None = None,
+        start: date | None = None,
+        end: date | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+    ) -> Page[Acceptance]:
+        """Acceptances newest first by ``(accepted_at, id)``; ``start``/``end`` are inclusive UTC days."""
+        stmt = select(Acceptance).where(*utc_day_range(Acceptance.accepted_at, start, end))
+        if material_id is not None:
+            stmt = stmt.where(Acceptance.material_id == material_id)
+        return keyset_page(self.session, stmt, (Acceptance.accepted_at, Acceptance.id), limit=limit, cursor=cursor)
 
 
 def parse_datetime(value: str) -> datetime:
@@ -0,0 +1,5 @@
+"""Analytics domain module."""
+
+from yem_sistem.analytics.feed_efficiency import FeedEfficiencyGrid, FeedEfficiencyService
+
+__all__ = ["FeedEfficiencyGrid", "FeedEfficiencyService"]
@@ -0,0 +1,233 @@
+"""Feed efficiency KPIs per herd group and day.
+
+Consumption, milk and prices are pulled with a handful of aggregate queries
+and laid out on a ``group x day`` grid; every KPI is then an array operation
+on that grid. Consumption comes from `PenDaily` where a group has pen-level
+records for the day and from DTM `BatchItem` lines (corrected weight when
+present) otherwise, attributed to groups through `PenGroup`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from sqlalchemy import Float, String, cast, func, select
+from sqlalchemy.orm import Session
+
+from yem_sistem.batch_items.models import BatchItem
+from yem_sistem.herd_kpis.models import GroupYield, PenGroup
+from yem_sistem.materials.models import Material
+from yem_sistem.monthly_prices.models import MonthlyPrice
+from yem_sistem.pen_daily.models import PenDaily
+from yem_sistem.production_batches.models import ProductionBatch
+
+TREND_WINDOWS = (7, 30)
+CONSUMPTION_DTYPES = ("datetime64[D]", np.int64, np.int64, np.float64)
+
+
+@dataclass(slots=True)
+class FeedEfficiencyGrid:
+    """Daily KPI arrays of shape ``(len(groups), len(days))``; NaN where undefined."""
+
+    start: date
+    groups: np.ndarray
+    feed_kg: np.ndarray
+    dm_kg: np.ndarray
+    milk_kg: np.ndarray
+    feed_cost: np.ndarray
+    dm_per_milk: np.ndarray
+    iofc: np.ndarray
+    trends: dict[int, np.ndarray]
+
+    @property
+    def days(self) -> int:
+        return self.feed_kg.shape[1]
+
+
+def rolling_ratio(numerator: np.ndarray, denominator: np.ndarray, window: int) -> np.ndarray:
+    """Ratio of trailing ``window``-day sums along the last axis; NaN days count as zero."""
+    num = np.cumsum(np.nan_to_num(numerator), axis=-1)
+    den = np.cumsum(np.nan_to_num(denominator), axis=-1)
+    num[..., window:] = num[..., window:] - num[..., :-window].copy()
+    den[..., window:] = den[..., window:] - den[..., :-window].copy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den > 0, num / den, np.nan)
+
+
+def _iso_day(column):
+    """Dates come back as ISO text, which NumPy parses in bulk far faster than per-row date objects."""
+    return cast(column, String)
+
+
+class FeedEfficiencyService:
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    def compute(self, start: date, end: date, *, milk_price: Decimal | None = None) -> FeedEfficiencyGrid:
+        """KPIs for ``start..end`` inclusive; ``milk_price`` (per kg) enables income over feed cost."""
+        if end < start:
+            raise ValueError("end must not be before start")
+        days = (end - start).days + 1
+        # trends need the window before ``start`` too
+        history_start = start - timedelta(days=max(TREND_WINDOWS) - 1)
+        span = (end - history_start).days + 1
+
+        pen_rows = self._pen_daily_consumption(history_start, end)
+        dtm_rows = self._dtm_consumption(history_start, end)
+        yield_rows = self._group_yields(history_start, end)
+        groups = np.unique(np.concatenate([pen_rows[1], dtm_rows[1], yield_rows[1]]))
+        materials = np.unique(np.concatenate([pen_rows[2], dtm_rows[2]]))
+        dm_ratio = self._dry_matter_ratios(materials)
+        month0 = history_start.year * 12 + history_start.month - 1
+        prices = self._price_matrix(materials, month0, end.year * 12 + end.month - 1)
+
+        shape = (len(groups), span)
+        pen = self._consumption_arrays(pen_rows, history_start, groups, materials, dm_ratio, prices, month0, shape)
+        dtm = self._consumption_arrays(dtm_rows, history_start, groups, materials, dm_ratio, prices, month0, shape)
+        # a group-day with pen-level records is measured at the pen; DTM loads only fill the gaps
+        use_pen = pen[3]
+        has_feed = use_pen | dtm[3]
+        feed_kg, dm_kg, feed_cost = (
+            np.where(has_feed, np.where(use_pen, p, d), np.nan) for p, d in zip(pen[:3], dtm[:3])
+        )
+
+        milk_kg = np.full(shape, np.nan)
+        dates, group_numbers, avg_yield, cows = yield_rows
+        milk_kg[np.searchsorted(groups, group_numbers), self._day_index(dates, history_start)] = avg_yield * cows
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dm_per_milk = np.where(milk_kg > 0, dm_kg / milk_kg, np.nan)
+        if milk_price is None:
+            iofc = np.full(shape, np.nan)
+        else:
+            iofc = milk_kg * float(milk_price) - feed_cost
+
+        trends = {w: rolling_ratio(dm_kg, np.where(np.isnan(dm_kg), np.nan, milk_kg), w) for w in TREND_WINDOWS}
+        cut = span - days
+        return FeedEfficiencyGrid(
+            start=start,
+            groups=groups,
+            feed_kg=feed_kg[:, cut:],
+            dm_kg=dm_kg[:, cut:],
+            milk_kg=milk_kg[:, cut:],
+            feed_cost=feed_cost[:, cut:],
+            dm_per_milk=dm_per_milk[:, cut:],
+            iofc=iofc[:, cut:],
+            trends={w: t[:, cut:] for w, t in trends.items()},
+        )
+
+    @staticmethod
+    def _day_index(dates: np.ndarray, start: date) -> np.ndarray:
+        return (dates - np.datetime64(start, "D")).astype(np.int64)
+
+    def _columns(self, stmt, dtypes: Sequence[str]) -> tuple[np.ndarray, ...]:
+        """Run ``stmt`` on the session's connection (no ORM result layer) and return its columns as arrays."""
+        rows = self.session.connection().execute(stmt).all()
+        if not rows:
+            return tuple(np.empty(0, dtype=dtype) for dtype in dtypes)
+        return tuple(np.asarray(column, dtype=dtype) for column, dtype in zip(zip(*rows), dtypes))
+
+    @classmethod
+    def _consumption_arrays(
+        cls,
+        rows: tuple[np.ndarray, ...],
+        start: date,
+        groups: np.ndarray,
+        materials: np.ndarray,
+        dm_ratio: np.ndarray,
+        prices: np.ndarray,
+        month0: int,
+        shape: tuple[int, int],
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Sum ``(day, group, material, kg)`` columns into feed, DM and cost grids plus a presence mask."""
+        dates, group_numbers, material_ids, kg = rows
+        day_idx = cls._day_index(dates, start)
+        group_idx = np.searchsorted(groups, group_numbers)
+        material_idx = np.searchsorted(materials, material_ids)
+        months = dates.astype("datetime64[M]").astype(np.int64) + 1970 * 12 - month0
+
+        feed = np.zeros(shape)
+        dm = np.zeros(shape)
+        cost = np.zeros(shape)
+        present = np.zeros(shape, dtype=bool)
+        np.add.at(feed, (group_idx, day_idx), kg)
+        np.add.at(dm, (group_idx, day_idx), kg * dm_ratio[material_idx])
+        np.add.at(cost, (group_idx, day_idx), kg * prices[material_idx, months])
+        present[group_idx, day_idx] = True
+        return feed, dm, cost, present
+
+    def _pen_daily_consumption(self, start: date, end: date) -> tuple[np.ndarray, ...]:
+        stmt = (
+            select(
+                _iso_day(PenDaily.record_date),
+                PenGroup.group_number,
+                PenDaily.material_id,
+                cast(func.sum(PenDaily.consumed_quantity), Float),
+            )
+            .join(PenGroup, PenGroup.pen_code == PenDaily.pen_code)
+            .where(PenDaily.record_date.between(start, end))
+            .group_by(PenDaily.record_date, PenGroup.group_number, PenDaily.material_id)
+        )
+        return self._columns(stmt, CONSUMPTION_DTYPES)
+
+    def _dtm_consumption(self, start: date, end: date) -> tuple[np.ndarray, ...]:
+        # recipes fed to pens of more than one group cannot be attributed and are left out
+        recipe_groups = (
+            select(PenGroup.recipe_id, func.min(PenGroup.group_number).label("group_number"))
+            .where(PenGroup.recipe_id.is_not(None))
+            .group_by(PenGroup.recipe_id)
+            .having(func.count(func.distinct(PenGroup.group_number)) == 1)
+            .subquery()
+        )
+        weight = func.coalesce(BatchItem.corrected_weight, BatchItem.loaded_weight)
+        stmt = (
+            select(_iso_day(ProductionBatch.date), recipe_groups.c.group_number, BatchItem.material_id, cast(func.sum(weight), Float))
+            .join(ProductionBatch, ProductionBatch.id == BatchItem.production_batch_id)
+            .join(recipe_groups, recipe_groups.c.recipe_id == ProductionBatch.recipe_id)
+            .where(ProductionBatch.date.between(start, end))
+            .group_by(ProductionBatch.date, recipe_groups.c.group_number, BatchItem.material_id)
+        )
+        return self._columns(stmt, CONSUMPTION_DTYPES)
+
+    def _group_yields(self, start: date, end: date) -> tuple[np.ndarray, ...]:
+        """``(date, group, avg_yield, total_cows)`` columns; missing values are NaN."""
+        stmt = select(
+            _iso_day(GroupYield.yield_date),
+            GroupYield.group_number,
+            cast(GroupYield.avg_yield, Float),
+            cast(GroupYield.total_cows, Float),
+        ).where(GroupYield.yield_date.between(start, end))
+        return self._columns(stmt, ("datetime64[D]", np.int64, np.float64, np.float64))
+
+    def _dry_matter_ratios(self, materials: np.ndarray) -> np.ndarray:
+        """DM fraction per material; NaN for materials without one, which makes their days' DM undefined."""
+        ratios = np.full(len(materials), np.nan)
+        if len(materials):
+            rows = self.session.execute(
+                select(Material.id, Material.dry_matter_ratio).where(Material.id.in_(materials.tolist()))
+            ).tuples()
+            for material_id, ratio in rows:
+                if ratio is not None:
+                    ratios[np.searchsorted(materials, material_id)] = float(ratio)
+        return ratios
+
+    def _price_matrix(self, materials: np.ndarray, first_month: int, last_month: int) -> np.ndarray:
+        """Unit price per ``(material, month)`` with months counted as ``year * 12 + month - 1``; NaN where no `MonthlyPrice` exists."""
+        prices = np.full((len(materials), last_month - first_month + 1), np.nan)
+        if len(materials):
+            rows = self.session.execute(
+                select(MonthlyPrice.material_id, MonthlyPrice.price_month, MonthlyPrice.unit_price).where(
+                    MonthlyPrice.material_id.in_(materials.tolist()),
+                    MonthlyPrice.price_month.between(
+                        date(first_month // 12, first_month % 12 + 1, 1), date(last_month // 12, last_month % 12 + 1, 28)
+                    ),
+                )
+            ).tuples()
+            for material_id, price_month, unit_price in rows:
+                month = price_month.year * 12 + price_month.month - 1
+                prices[np.searchsorted(materials, material_id), month - first_month] = float(unit_price)
+        return prices
@@ -0,0 +1,53 @@
+"""Analytics HTTP routes."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from yem_sistem.analytics.feed_efficiency import FeedEfficiencyService
+from yem_sistem.db.session import get_session
+
+router = APIRouter(tags=["analytics"])
+
+MAX_RANGE_DAYS = 3 * 366
+
+
+def _json_values(values: np.ndarray, digits: int) -> list[float | None]:
+    return np.where(np.isnan(values), None, np.round(values, digits)).tolist()
+
+
+@router.get("/analytics/feed-efficiency")
+def feed_efficiency(
+    start: date = Query(...),
+    end: date = Query(...),
+    milk_price: Decimal | None = Query(default=None, ge=0),
+    session: Session = Depends(get_session),
+) -> dict:
+    """Daily kg DM per kg milk, feed cost and income over feed cost per herd group, with 7/30-day trends."""
+    if end < start or (end - start).days >= MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range must be 1..{MAX_RANGE_DAYS} days")
+    grid = FeedEfficiencyService(session).compute(start, end, milk_price=milk_price)
+    dates = [(start + timedelta(days=i)).isoformat() for i in range(grid.days)]
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "dates": dates,
+        "groups": [
+            {
+                "group_number": int(group),
+                "feed_kg": _json_values(grid.feed_kg[i], 3),
+                "dm_kg": _json_values(grid.dm_kg[i], 3),
+                "milk_kg": _json_values(grid.milk_kg[i], 3),
+                "feed_cost": _json_values(grid.feed_cost[i], 2),
+                "dm_per_milk": _json_values(grid.dm_per_milk[i], 4),
+                "iofc": _json_values(grid.iofc[i], 2),
+                **{f"dm_per_milk_{w}d": _json_values(t[i], 4) for w, t in grid.trends.items()},
+            }
+            for i, group in enumerate(grid.groups)
+        ],
+    }
@@ -0,0 +1,6 @@
+"""DTM load anomaly detection module."""
+
+from yem_sistem.anomalies.models import LoadStatistic
+from yem_sistem.anomalies.service import LoadAnomalyService, LoadSample
+
+__all__ = ["LoadAnomalyService", "LoadSample", "LoadStatistic"]
@@ -0,0 +1,30 @@
+"""Rolling DTM load statistics models."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from yem_sistem.db.base import Base
+
+
+class LoadStatistic(Base):
+    """Running count, mean and sum of squared deviations of DTM loads per recipe and material.
+
+    ``load_ratio`` is loaded / target weight; ``error`` is the sheet's Error (%).
+    Zero-loaded and flagged lines are left out so the history stays clean.
+    """
+
+    __tablename__ = "load_statistics"
+
+    recipe_key: Mapped[str] = mapped_column(String(80), primary_key=True)
+    material_id: Mapped[int] = mapped_column(ForeignKey("materials.id", ondelete="CASCADE"), primary_key=True)
+    ratio_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    ratio_mean: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    ratio_m2: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    error_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error_mean: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    error_m2: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,182 @@
+"""Statistical scoring of DTM load lines against their recipe/material history.
+
+Each import loads the `LoadStatistic` rows of the materials it touches with
+one query, scores every line at once with NumPy (z-scores of the load ratio
+and of Error (%) against the key's running mean and variance), and then folds
+its clean lines into the statistics. The fold merges per-key count, mean and
+M2 (Chan et al.'s parallel variance update) inside the upsert, so concurrent
+imports both count.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from yem_sistem.anomalies.models import LoadStatistic
+from yem_sistem.db.upsert import dialect_insert
+
+MIN_HISTORY = 20
+Z_LIMIT = 4.0
+# deviations below these are never anomalies, however tight the history
+MIN_RATIO_DEVIATION = 0.05
+MIN_ERROR_DEVIATION = 5.0
+MAX_REASONS_PER_BATCH = 5
+# length of `LoadStatistic.recipe_key`; longer recipe names share the key of their prefix
+RECIPE_KEY_LENGTH = 80
+
+
+SAMPLE_DTYPE = np.dtype(
+    [("recipe", np.int64), ("material_id", np.int64), ("target", np.float64), ("loaded", np.float64), ("error", np.float64)]
+)
+
+
+@dataclass(slots=True)
+class LoadSample:
+    """Load lines of one import as a `SAMPLE_DTYPE` record array.
+
+    ``recipe`` indexes ``recipes``; ``error`` is NaN where the sheet had no
+    Error (%). Zero-loaded lines may be included; they are neither scored nor learned.
+    """
+
+    recipes: list[str]
+    rows: np.ndarray
+
+
+class LoadAnomalyService:
+    def __init__(self, session: Session) -> None:
+        self.session = session
+        self.table = LoadStatistic.__table__
+
+    def score_and_learn(self, sample: LoadSample) -> list[str | None]:
+        """Per-line anomaly description (None for normal lines); clean lines then update the history."""
+        rows = sample.rows
+        size = len(rows)
+        if size == 0:
+            return []
+        # truncate before grouping so names that only differ past the key length land on one key
+        recipe_keys: dict[str, int] = {}
+        recipe_code = np.array(
+            [recipe_keys.setdefault(name[:RECIPE_KEY_LENGTH], len(recipe_keys)) for name in sample.recipes], dtype=np.int64
+        )
+        key_names = list(recipe_keys)
+        span = int(rows["material_id"].max()) + 1
+        codes, key_idx = np.unique(recipe_code[rows["recipe"]] * span + rows["material_id"], return_inverse=True)
+        unique_keys = [(key_names[code // span], code % span) for code in codes.tolist()]
+
+        history = self._history(unique_keys)
+        target, loaded = rows["target"], rows["loaded"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where((target > 0) & (loaded > 0), loaded / target, np.nan)
+        error = np.where(loaded > 0, rows["error"], np.nan)
+        ratio_z = self._z_scores(ratio, key_idx, history[0], history[1], history[2], MIN_RATIO_DEVIATION)
+        error_z = self._z_scores(error, key_idx, history[3], history[4], history[5], MIN_ERROR_DEVIATION)
+
+        over = ratio_z > Z_LIMIT
+        under = ratio_z < -Z_LIMIT
+        bad_error = np.abs(error_z) > Z_LIMIT
+        flagged = over | under | bad_error
+
+        reasons: list[str | None] = [None] * size
+        for i in np.flatnonzero(flagged).tolist():
+            parts = []
+            if over[i] or under[i]:
+                parts.append(
+                    f"{'overload' if over[i] else 'underload'} {loaded[i]:.1f}/{target[i]:.1f} kg"
+                    f" (z={ratio_z[i]:+.1f})"
+                )
+            if bad_error[i]:
+                parts.append(f"error {error[i]:.1f}% (z={error_z[i]:+.1f})")
+            reasons[i] = ", ".join(parts)
+
+        self._learn(unique_keys, key_idx[~flagged], ratio[~flagged], error[~flagged])
+        return reasons
+
+    @staticmethod
+    def batch_reason(items: Sequence[tuple[str, str]]) -> str:
+        """One ``suspicious_reason`` sentence from ``(ingredient, description)`` pairs of a batch."""
+        shown = "; ".join(f"{name}: {text}" for name, text in items[:MAX_REASONS_PER_BATCH])
+        more = len(items) - MAX_REASONS_PER_BATCH
+        return f"Load anomalies: {shown}" + (f" (+{more} more)." if more > 0 else ".")
+
+    def _history(self, unique_keys: list[tuple[str, int]]) -> tuple[np.ndarray, ...]:
+        """``(ratio n, mean, M2, error n, mean, M2)`` arrays aligned with ``unique_keys``; zero where unseen."""
+        arrays = tuple(np.zeros(len(unique_keys)) for _ in range(6))
+        t = self.table
+        index = {key: i for i, key in enumerate(unique_keys)}
+        material_ids = sorted({material_id for _, material_id in unique_keys})
+        stmt = select(
+            t.c.recipe_key, t.c.material_id, t.c.ratio_count, t.c.ratio_mean, t.c.ratio_m2,
+            t.c.error_count, t.c.error_mean, t.c.error_m2,
+        ).where(t.c.material_id.in_(material_ids))
+        for row in self.session.execute(stmt):
+            i = index.get((row[0], row[1]))
+            if i is not None:
+                for array, value in zip(arrays, row[2:]):
+                    array[i] = value
+        return arrays
+
+    @staticmethod
+    def _z_scores(
+        values: np.ndarray, key_idx: np.ndarray, count: np.ndarray, mean: np.ndarray, m2: np.ndarray, min_deviation: float
+    ) -> np.ndarray:
+        """z-score of each value against its key's history; 0 where the history is too short or the value missing."""
+        n = count[key_idx]
+        deviation = values - mean[key_idx]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            std = np.sqrt(m2[key_idx] / np.maximum(n - 1, 1))
+            # a constant history (std 0) makes any deviation infinite; min_deviation keeps noise out
+            z = deviation / std
+        usable = (n >= MIN_HISTORY) & ~np.isnan(values) & (np.abs(deviation) > min_deviation)
+        return np.where(usable, z, 0.0)
+
+    def _learn(self, unique_keys: list[tuple[str, int]], key_idx: np.ndarray, ratio: np.ndarray, error: np.ndarray) -> None:
+        size = len(unique_keys)
+        ratio_stats = self._moments(key_idx, ratio, size)
+        error_stats = self._moments(key_idx, error, size)
+        rows = [
+            {
+                "recipe_key": recipe,
+                "material_id": material_id,
+                "ratio_count": int(ratio_stats[0][i]),
+                "ratio_mean": float(ratio_stats[1][i]),
+                "ratio_m2": float(ratio_stats[2][i]),
+                "error_count": int(error_stats[0][i]),
+                "error_mean": float(error_stats[1][i]),
+                "error_m2": float(error_stats[2][i]),
+            }
+            for i, (recipe, material_id) in enumerate(unique_keys)
+            if ratio_stats[0][i] or error_stats[0][i]
+        ]
+        if not rows:
+            return
+        t = self.table
+        stmt = dialect_insert(self.session, t)
+        ex = stmt.excluded
+        set_ = {"updated_at": func.now()}
+        for prefix in ("ratio", "error"):
+            n_a, mean_a, m2_a = t.c[f"{prefix}_count"], t.c[f"{prefix}_mean"], t.c[f"{prefix}_m2"]
+            n_b, mean_b, m2_b = ex[f"{prefix}_count"], ex[f"{prefix}_mean"], ex[f"{prefix}_m2"]
+            total = func.nullif(n_a + n_b, 0)
+            delta = mean_b - mean_a
+            set_[f"{prefix}_count"] = n_a + n_b
+            set_[f"{prefix}_mean"] = func.coalesce(mean_a + delta * n_b / total, mean_a)
+            set_[f"{prefix}_m2"] = func.coalesce(m2_a + m2_b + delta * delta * n_a * n_b / total, m2_a)
+        self.session.execute(stmt.on_conflict_do_update(index_elements=[t.c.recipe_key, t.c.material_id], set_=set_), rows)
+
+    @staticmethod
+    def _moments(key_idx: np.ndarray, values: np.ndarray, size: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Per-key count, mean and M2 of the non-NaN ``values``."""
+        present = ~np.isnan(values)
+        idx = key_idx[present]
+        x = values[present]
+        count = np.bincount(idx, minlength=size).astype(np.float64)
+        total = np.bincount(idx, weights=x, minlength=size)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.where(count > 0, total / count, 0.0)
+        m2 = np.bincount(idx, weights=(x - mean[idx]) ** 2, minlength=size)
+        return count, mean, m2
@@ -35,6 +35,7 @@ class BatchItem(Base):
     correction_note: Mapped[str | None] = mapped_column(Text, nullable=True)
     corrected_by_user_id: Mapped[int | None] = mapped_column(nullable=True)
     corrected_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    anomaly_note: Mapped[str | None] = mapped_column(String(200), nullable=True)
 
     production_batch = relationship("ProductionBatch", back_populates="items")
     material = relationship("Material", back_populates="batch_items")
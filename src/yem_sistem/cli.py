@@ -0,0 +1,188 @@
+"""Command line entry point for maintenance tasks."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+from yem_sistem.db.session import SessionLocal
+
+
+def _stock_balances(args: argparse.Namespace) -> int:
+    from yem_sistem.stock_balances.service import StockBalanceService
+
+    with SessionLocal() as session:
+        service = StockBalanceService(session)
+        drift = service.rebuild() if args.action == "rebuild" else service.verify()
+        for d in drift:
+            print(f"material_id={d.material_id} stored={d.stored} ledger={d.ledger}")
+        if args.action == "rebuild":
+            session.commit()
+            print(f"rebuilt stock_balances, corrected {len(drift)} material(s)")
+            return 0
+        print(f"{len(drift)} material(s) drifted from the ledger")
+        return 1 if drift else 0
+
+
+def _stock_snapshots(args: argparse.Namespace) -> int:
+    from datetime import date
+
+    from yem_sistem.stock_snapshots.service import StockSnapshotService
+
+    through = date.fromisoformat(args.through) if args.through else None
+    with SessionLocal() as session:
+        service = StockSnapshotService(session)
+        written = service.rebuild(through) if args.action == "rebuild" else service.refresh(through)
+        session.commit()
+    print(f"{args.action}: wrote {written} snapshot(s)")
+    return 0
+
+
+def _daily_flows(args: argparse.Namespace) -> int:
+    from yem_sistem.daily_flows.service import DailyFlowService
+
+    with SessionLocal() as session:
+        written = DailyFlowService(session).rebuild()
+        session.commit()
+    print(f"rebuilt daily_material_flows, wrote {written} row(s)")
+    return 0
+
+
+def _import_dtm(args: argparse.Namespace) -> int:
+    from pathlib import Path
+
+    from yem_sistem.imports.multi_file import MultiFileDtmImporter
+
+    importer = MultiFileDtmImporter(SessionLocal, max_workers=args.workers)
+    try:
+        results = importer.import_paths([Path(p) for p in args.paths], args.role, chunk_size=args.chunk_size)
+    except PermissionError as exc:
+        print(f"FAILED   {exc}")
+        return 1
+    for r in results:
+        detail = r.message if r.summary is None else (
+            f"rows={r.summary.rows_processed} movements={r.summary.movements_created} "
+            f"suspicious_batches={r.summary.suspicious_batches_count}"
+        )
+        print(f"{r.status:<8} job={r.job_id or '-'} {r.file_name}: {detail}")
+    return 0 if all(r.status == "SUCCESS" for r in results) else 1
+
+
+def _import_herd(args: argparse.Namespace) -> int:
+    from pathlib import Path
+
+    from yem_sistem.imports.herd_kpi_import import HerdKpiImportError, HerdKpiImportService
+    from yem_sistem.imports.uploads import stage_path
+
+    failed = 0
+    for path in map(Path, args.paths):
+        staged = stage_path(path)
+        with SessionLocal() as session:
+            service = HerdKpiImportService.for_kind(session, args.kind)
+            try:
+                job = service.create_job(staged.file_name, staged.file_hash, args.role)
+                summary = service.run_job(job.id, staged.path)
+            except (HerdKpiImportError, PermissionError) as exc:
+                failed += 1
+                print(f"FAILED   {path.name}: {exc}")
+                continue
+        print(f"SUCCESS  job={job.id} {path.name}: rows={summary.rows_processed} skipped={summary.rows_skipped}")
+    return 1 if failed else 0
+
+
+def _import_acceptance(args: argparse.Namespace) -> int:
+    from pathlib import Path
+
+    from yem_sistem.acceptance.service import AcceptanceAuthorizationError
+    from yem_sistem.imports.weighbridge_import import ACCEPTED, WeighbridgeImportError, WeighbridgeImportService
+
+    failed = 0
+    for path in map(Path, args.paths):
+        with SessionLocal() as session:
+            try:
+                summary = WeighbridgeImportService(session).import_file(path.name, path, args.role)
+            except (WeighbridgeImportError, AcceptanceAuthorizationError) as exc:
+                failed += 1
+                print(f"FAILED   {path.name}: {exc}")
+                continue
+        for r in summary.results:
+            if r.status != ACCEPTED:
+                print(f"  line {r.line}: {r.status} - {r.message}")
+        print(f"SUCCESS  {path.name}: accepted={summary.accepted} duplicates={summary.duplicates} rejected={summary.rejected}")
+    return 1 if failed else 0
+
+
+def _export_monthly(args: argparse.Namespace) -> int:
+    from pathlib import Path
+
+    from yem_sistem.monthly_prices.export import MonthlyAccountingExport, parse_month
+
+    first, last = parse_month(args.start), parse_month(args.end)
+    fmt = args.format or ("xlsx" if args.output and args.output.endswith(".xlsx") else "csv")
+    with SessionLocal() as session:
+        export = MonthlyAccountingExport(session)
+        if fmt == "xlsx":
+            if not args.output:
+                print("--output is required for xlsx", file=sys.stderr)
+                return 2
+            export.write_xlsx(first, last, Path(args.output))
+        elif args.output:
+            with open(args.output, "w", newline="", encoding="utf-8") as fh:
+                export.write_csv(first, last, fh)
+        else:
+            export.write_csv(first, last, sys.stdout)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="yem-sistem")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    balances = commands.add_parser("stock-balances", help="Verify or rebuild stock_balances from the ledger")
+    balances.add_argument("action", choices=["verify", "rebuild"])
+    balances.set_defaults(handler=_stock_balances)
+
+    snapshots = commands.add_parser("stock-snapshots", help="Extend or rebuild daily stock_snapshots")
+    snapshots.add_argument("action", choices=["refresh", "rebuild"])
+    snapshots.add_argument("--through", default=None, help="Last day to snapshot, YYYY-MM-DD (default: yesterday, UTC)")
+    snapshots.set_defaults(handler=_stock_snapshots)
+
+    flows = commands.add_parser("daily-flows", help="Rebuild the daily_material_flows rollup from the ledger")
+    flows.add_argument("action", choices=["rebuild"])
+    flows.set_defaults(handler=_daily_flows)
+
+    dtm = commands.add_parser("import-dtm", help="Import DTM exports from files and directories in parallel")
+    dtm.add_argument("paths", nargs="+", help="DTM .xlsx/.xls files or directories containing them")
+    dtm.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    dtm.add_argument("--chunk-size", type=int, default=None, help="Commit every N batches")
+    dtm.add_argument("--role", default="ADMIN")
+    dtm.set_defaults(handler=_import_dtm)
+
+    herd = commands.add_parser("import-herd", help="Import herd KPI exports (parlour sessions, group yields)")
+    herd.add_argument("kind", choices=["parlour-sessions", "group-yields"])
+    herd.add_argument("paths", nargs="+", help="Herd management .xlsx exports")
+    herd.add_argument("--role", default="ADMIN")
+    herd.set_defaults(handler=_import_herd)
+
+    acceptance = commands.add_parser("import-acceptance", help="Import weighbridge exports as acceptances")
+    acceptance.add_argument("paths", nargs="+", help="Weighbridge .xlsx/.csv exports")
+    acceptance.add_argument("--role", default="ACCEPTANCE")
+    acceptance.set_defaults(handler=_import_acceptance)
+
+    monthly = commands.add_parser("export-monthly", help="Export monthly stock movements and valuation for accounting")
+    monthly.add_argument("start", help="First month, YYYY-MM")
+    monthly.add_argument("end", help="Last month, YYYY-MM")
+    monthly.add_argument("--format", choices=["csv", "xlsx"], default=None, help="Default: from --output, else csv")
+    monthly.add_argument("--output", default=None, help="Output file (default: CSV to stdout)")
+    monthly.set_defaults(handler=_export_monthly)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+"""Daily stock flow rollup module."""
+
+from yem_sistem.daily_flows.models import DailyMaterialFlow
+from yem_sistem.daily_flows.service import DailyFlowPoint, DailyFlowService
+
+__all__ = ["DailyFlowPoint", "DailyFlowService", "DailyMaterialFlow"]
@@ -0,0 +1,26 @@
+"""Daily per-material stock flow rollup models."""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import Date, DateTime, ForeignKey, Integer, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from yem_sistem.db.base import Base
+from yem_sistem.db.types import QUANTITY_TYPE
+
+
+class DailyMaterialFlow(Base):
+    """Movement totals of a material on one UTC day, maintained with every stock movement write."""
+
+    __tablename__ = "daily_material_flows"
+
+    flow_date: Mapped[date] = mapped_column(Date, primary_key=True)
+    material_id: Mapped[int] = mapped_column(ForeignKey("materials.id", ondelete="RESTRICT"), primary_key=True)
+    in_kg: Mapped[Decimal] = mapped_column(QUANTITY_TYPE, nullable=False, default=Decimal("0.000"))
+    out_production_kg: Mapped[Decimal] = mapped_column(QUANTITY_TYPE, nullable=False, default=Decimal("0.000"))
+    out_correction_kg: Mapped[Decimal] = mapped_column(QUANTITY_TYPE, nullable=False, default=Decimal("0.000"))
+    movement_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,164 @@
+"""Per-statement SQL cost accounting.
+
+`instrument_engine` hooks ``before/after_cursor_execute`` and charges every
+statement's count, time and rows (as reported by the driver's ``rowcount``)
+to the innermost active `QueryScope` - an HTTP request (see
+`web.metrics.MetricsMiddleware`) or an import job; a nested scope takes the
+statements for itself, so every statement is counted once. A scope is published to
+the metrics registry under its label when it closes, so label cardinality
+stays bounded by routes and import sources.
+
+Statements slower than ``SLOW_QUERY_SECONDS`` are logged with their
+parameters redacted, and a statement repeated ``N_PLUS_ONE_THRESHOLD`` times
+within one scope is logged and counted once as a likely N+1 pattern.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections import Counter
+from collections.abc import Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.interfaces import ExecuteStyle
+
+from yem_sistem.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_SECONDS", "0.5"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "10"))
+UNSCOPED = "unscoped"
+LOGGED_STATEMENT_CHARS = 2_000
+
+sql_statements = registry.counter("yem_sql_statements_total", "SQL statements executed", ("scope",))
+sql_seconds = registry.counter("yem_sql_seconds_total", "Time spent executing SQL statements", ("scope",))
+sql_rows = registry.counter("yem_sql_rows_total", "Rows returned or affected, as reported by the driver", ("scope",))
+sql_slow = registry.counter("yem_sql_slow_statements_total", "Statements slower than SLOW_QUERY_SECONDS", ("scope",))
+sql_repeated = registry.counter(
+    "yem_sql_repeated_statements_total", "Statements repeated N_PLUS_ONE_THRESHOLD times within one scope", ("scope",)
+)
+sql_duration = registry.histogram("yem_sql_statement_duration_seconds", "Duration of single SQL statements")
+
+_current: ContextVar[QueryScope | None] = ContextVar("yem_query_scope", default=None)
+
+
+class QueryScope:
+    """Statement count, DB time and rows charged to one unit of work."""
+
+    __slots__ = ("label", "statements", "db_seconds", "rows", "slow", "repeated", "_seen")
+
+    def __init__(self, label: str) -> None:
+        self.label = label
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+        self.slow = 0
+        self.repeated: list[str] = []
+        self._seen: Counter[str] = Counter()
+
+    def record(self, statement: str, elapsed: float, rows: int, slow: bool, *, batch: bool = False) -> None:
+        self.statements += 1
+        self.db_seconds += elapsed
+        self.rows += rows
+        self.slow += slow
+        if batch:
+            return
+        seen = self._seen[statement] = self._seen[statement] + 1
+        if seen == N_PLUS_ONE_THRESHOLD:
+            self.repeated.append(statement)
+            logger.warning("possible N+1 in %s: statement executed %d times: %s", self.label, seen, _shorten(statement))
+
+    def publish(self) -> None:
+        labels = (self.label,)
+        sql_statements.inc(labels, self.statements)
+        sql_seconds.inc(labels, self.db_seconds)
+        sql_rows.inc(labels, self.rows)
+        if self.slow:
+            sql_slow.inc(labels, self.slow)
+        if self.repeated:
+            sql_repeated.inc(labels, len(self.repeated))
+
+
+def current_query_scope() -> QueryScope | None:
+    return _current.get()
+
+
+@contextmanager
+def query_scope(label: str) -> Iterator[QueryScope]:
+    """Charge the statements run inside the block to a new scope, published under ``label`` on exit."""
+    scope = QueryScope(label)
+    token = _current.set(scope)
+    try:
+        yield scope
+    finally:
+        _current.reset(token)
+        scope.publish()
+
+
+def redact_parameters(parameters: object, executemany: bool) -> str:
+    """Shape of the bound parameters without their values."""
+    if executemany and isinstance(parameters, Sequence):
+        first = parameters[0] if parameters else None
+        return f"{len(parameters)} sets of {redact_parameters(first, False)}"
+    if isinstance(parameters, Mapping):
+        return "{" + ", ".join(f"{key}=?" for key in parameters) + "}"
+    if isinstance(parameters, Sequence) and not isinstance(parameters, str):
+        return f"({len(parameters)} values)"
+    return "()"
+
+
+def _shorten(statement: str) -> str:
+    text = " ".join(statement.split())
+    return text if len(text) <= LOGGED_STATEMENT_CHARS else text[:LOGGED_STATEMENT_CHARS] + "..."
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("yem_query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["yem_query_started"].pop()
+    rows = max(cursor.rowcount or 0, 0)
+    slow = elapsed >= SLOW_QUERY_SECONDS
+    scope = _current.get()
+    if slow:
+        logger.warning(
+            "slow query %.3fs in %s: %s params=%s",
+            elapsed,
+            scope.label if scope is not None else UNSCOPED,
+            _shorten(statement),
+            redact_parameters(parameters, executemany),
+        )
+    sql_duration.observe((), elapsed)
+    if scope is not None:
+        # one bulk INSERT sent as several "insertmanyvalues" batches is not a repeated statement
+        batch = context is not None and context.execute_style is ExecuteStyle.INSERTMANYVALUES
+        scope.record(statement, elapsed, rows, slow, batch=batch)
+    else:
+        labels = (UNSCOPED,)
+        sql_statements.inc(labels)
+        sql_seconds.inc(labels, elapsed)
+        sql_rows.inc(labels, rows)
+        if slow:
+            sql_slow.inc(labels)
+
+
+def _handle_error(exception_context) -> None:
+    # a failed statement never reaches after_cursor_execute
+    started = exception_context.connection.info.get("yem_query_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+def instrument_engine(engine: Engine) -> Engine:
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+    return engine
@@ -0,0 +1,90 @@
+"""Keyset (cursor) pagination over descending ``(sort key, id)`` orderings.
+
+A page is fetched with ``WHERE (key, id) < (:last_key, :last_id) ORDER BY key
+DESC, id DESC LIMIT n``, which a composite index on ``(key, id)`` (after any
+equality filter columns) answers with one range scan, so deep pages cost the
+same as the first. Cursors are opaque URL-safe tokens of the last row's key.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Generic, TypeVar
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor token cannot be decoded for the requested listing."""
+
+
+@dataclass(slots=True)
+class Page(Generic[T]):
+    items: list[T]
+    next_cursor: str | None
+
+
+def encode_cursor(values: tuple) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else v for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, columns: tuple[InstrumentedAttribute, ...]) -> tuple:
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        if not isinstance(raw, list) or len(raw) != len(columns):
+            raise ValueError
+        values = []
+        for value, column in zip(raw, columns):
+            python_type = column.type.python_type
+            if python_type is datetime:
+                values.append(datetime.fromisoformat(value))
+            elif python_type is date:
+                values.append(date.fromisoformat(value))
+            else:
+                values.append(python_type(value))
+        return tuple(values)
+    except (TypeError, ValueError, UnicodeDecodeError) as exc:
+        raise InvalidCursorError("Invalid cursor") from exc
+
+
+def utc_day_range(column: InstrumentedAttribute, start: date | None, end: date | None) -> list:
+    """Conditions keeping a timestamp ``column`` within the inclusive UTC days ``start..end``."""
+    conditions = []
+    if start is not None:
+        conditions.append(column >= datetime.combine(start, time(0, 0), tzinfo=timezone.utc))
+    if end is not None:
+        conditions.append(column < datetime.combine(end + timedelta(days=1), time(0, 0), tzinfo=timezone.utc))
+    return conditions
+
+
+def keyset_page(
+    session: Session,
+    stmt: Select,
+    order_by: tuple[InstrumentedAttribute, ...],
+    *,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+) -> Page:
+    """Run ``stmt`` (selecting one entity) newest-first by ``order_by`` from ``cursor`` on."""
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    if cursor:
+        stmt = stmt.where(tuple_(*order_by) < tuple_(*decode_cursor(cursor, order_by)))
+    stmt = stmt.order_by(*(column.desc() for column in order_by)).limit(limit + 1)
+    items = list(session.scalars(stmt))
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor(tuple(getattr(last, column.key) for column in order_by))
+    return Page(items=items, next_cursor=next_cursor)
@@ -6,3 +6,4 @@ from sqlalchemy import Numeric
 QUANTITY_TYPE = Numeric(15, 3)
 PRICE_TYPE = Numeric(15, 3)
 ERROR_PERCENT_TYPE = Numeric(8, 3)
+RATIO_TYPE = Numeric(10, 4)
@@ -0,0 +1,18 @@
+"""Dialect-aware ``INSERT ... ON CONFLICT`` helpers."""
+
+from __future__ import annotations
+
+from sqlalchemy import Table
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(session: Session, table: Table):
+    """Return an insert construct that supports ``on_conflict_do_*`` for the session's backend."""
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upsert is not supported for dialect {dialect!r}")
+    return insert(table)
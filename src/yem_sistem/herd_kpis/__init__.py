@@ -0,0 +1,5 @@
+"""Herd KPI domain module."""
+
+from yem_sistem.herd_kpis.models import GroupYield, ParlourSession, PenGroup
+
+__all__ = ["GroupYield", "ParlourSession", "PenGroup"]
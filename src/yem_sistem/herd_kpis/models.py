@@ -0,0 +1,76 @@
+"""Herd management KPI models imported from parlour and group yield exports."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from sqlalchemy import Date, DateTime, ForeignKey, Integer, String, Time, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from yem_sistem.db.base import Base
+from yem_sistem.db.types import QUANTITY_TYPE, RATIO_TYPE
+
+
+class ParlourSession(Base):
+    """One milking session of a parlour (Animal Parlour Performance export)."""
+
+    __tablename__ = "parlour_sessions"
+    __table_args__ = (
+        UniqueConstraint("session_date", "parlour_name", "session_number", name="uq_parlour_sessions_date_parlour_session"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    session_date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    parlour_name: Mapped[str] = mapped_column(String(60), nullable=False)
+    session_number: Mapped[int] = mapped_column(Integer, nullable=False)
+    number_of_batches: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    milk_start_time: Mapped[time | None] = mapped_column(Time, nullable=True)
+    milk_end_time: Mapped[time | None] = mapped_column(Time, nullable=True)
+    session_duration_seconds: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    avg_milk_duration_seconds: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    total_cows: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    milk_yield: Mapped[Decimal | None] = mapped_column(QUANTITY_TYPE, nullable=True)
+    cows_per_hour: Mapped[Decimal | None] = mapped_column(QUANTITY_TYPE, nullable=True)
+    milk_yield_per_hour: Mapped[Decimal | None] = mapped_column(QUANTITY_TYPE, nullable=True)
+    milk_yield_per_cow: Mapped[Decimal | None] = mapped_column(QUANTITY_TYPE, nullable=True)
+    unknown_animals_yield: Mapped[Decimal | None] = mapped_column(QUANTITY_TYPE, nullable=True)
+    milk_weights: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    unknown_milk_weights: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    milk_weights_per_hour: Mapped[Decimal | None] = mapped_column(QUANTITY_TYPE, nullable=True)
+    cows_identified: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    cows_not_identified: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    transponders_identified: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    unknown_transponders: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    import_id: Mapped[int | None] = mapped_column(ForeignKey("imports.id", ondelete="SET NULL"), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class GroupYield(Base):
+    """Daily average milk yield of a herd group (YieldByGroup export)."""
+
+    __tablename__ = "group_yields"
+    __table_args__ = (UniqueConstraint("yield_date", "group_number", name="uq_group_yields_date_group"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    yield_date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    group_number: Mapped[int] = mapped_column(Integer, nullable=False)
+    total_cows: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    avg_yield: Mapped[Decimal | None] = mapped_column(QUANTITY_TYPE, nullable=True)
+    yield_difference: Mapped[Decimal | None] = mapped_column(RATIO_TYPE, nullable=True)
+    herd_avg_yield: Mapped[Decimal | None] = mapped_column(QUANTITY_TYPE, nullable=True)
+    import_id: Mapped[int | None] = mapped_column(ForeignKey("imports.id", ondelete="SET NULL"), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class PenGroup(Base):
+    """Assigns a feeding pen, and the DTM recipe delivered to it, to a herd group."""
+
+    __tablename__ = "pen_groups"
+    __table_args__ = (UniqueConstraint("pen_code", name="uq_pen_groups_pen_code"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    pen_code: Mapped[str] = mapped_column(String(40), nullable=False)
+    group_number: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    recipe_id: Mapped[str | None] = mapped_column(String(80), nullable=True, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -1,6 +1,17 @@
 """Imports domain module."""
 
 from yem_sistem.imports.dtm_batch_import import DtmBatchImportService, DtmImportError
+from yem_sistem.imports.herd_kpi_import import HerdKpiImportError, HerdKpiImportService
 from yem_sistem.imports.models import ImportJob, ImportStatus
+from yem_sistem.imports.weighbridge_import import WeighbridgeImportError, WeighbridgeImportService
 
-__all__ = ["ImportJob", "ImportStatus", "DtmBatchImportService", "DtmImportError"]
+__all__ = [
+    "ImportJob",
+    "ImportStatus",
+    "DtmBatchImportService",
+    "DtmImportError",
+    "HerdKpiImportError",
+    "HerdKpiImportService",
+    "WeighbridgeImportError",
+    "WeighbridgeImportService",
+]
@@ -0,0 +1,189 @@
+"""Typed cell decoders for spreadsheet imports.
+
+A decoder turns one raw cell value (whatever openpyxl/xlrd returned) into the
+Python type the persistence layer expects. Native Excel numbers, dates and
+times are converted directly; only genuine text goes through string parsing.
+Decoders are built once per sheet column and reused for every row.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from datetime import date, datetime, time
+from decimal import Decimal
+
+Decoder = Callable[[object], object]
+
+TIME_FORMATS = ("%H:%M:%S", "%H:%M")
+TEXT_CACHE_LIMIT = 65_536
+
+_NONE_TYPE = type(None)
+
+
+def _none(_: object) -> None:
+    return None
+
+
+def _float_to_decimal(value: float) -> Decimal:
+    if value.is_integer():
+        return Decimal(int(value))
+    return Decimal(repr(value))
+
+
+def _str_to_decimal(value: str) -> Decimal | None:
+    s = value.strip().replace(",", ".")
+    if not s:
+        return None
+    return Decimal(s)
+
+
+_DECIMAL_DISPATCH: dict[type, Callable[[object], Decimal | None]] = {
+    _NONE_TYPE: _none,
+    float: _float_to_decimal,
+    int: Decimal,
+    Decimal: lambda value: value,
+    str: _str_to_decimal,
+}
+
+
+def to_decimal(value: object) -> Decimal | None:
+    convert = _DECIMAL_DISPATCH.get(value.__class__)
+    if convert is None:
+        return _str_to_decimal(str(value))
+    return convert(value)
+
+
+def to_date(value: object) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.fromisoformat(str(value)).date()
+
+
+def _parse_time_text(value: str, formats: tuple[str, ...]) -> time | None:
+    s = value.strip()
+    if not s:
+        return None
+    for fmt in formats:
+        try:
+            return datetime.strptime(s, fmt).time()
+        except ValueError:
+            pass
+    return None
+
+
+def to_time(value: object, formats: tuple[str, ...] = TIME_FORMATS) -> time | None:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.time().replace(tzinfo=None)
+    if isinstance(value, time):
+        return value.replace(tzinfo=None)
+    return _parse_time_text(str(value), formats)
+
+
+def to_opt_str(value: object) -> str | None:
+    if value is None:
+        return None
+    s = str(value).strip()
+    return s or None
+
+
+def decimal_decoder(samples: Iterable[object] = ()) -> Decoder:
+    """Numeric columns get a memoized native-number path; anything else uses `to_decimal`.
+
+    Scale weights are recorded with one decimal, so the same floats recur
+    throughout a sheet and the cache hit rate is high.
+    """
+    if not any(value.__class__ in (float, int) for value in samples):
+        return to_decimal
+
+    cache: dict[float | int, Decimal] = {}
+
+    def decode(value: object) -> Decimal | None:
+        cls = value.__class__
+        if cls is float or cls is int:
+            decoded = cache.get(value)
+            if decoded is None:
+                decoded = _float_to_decimal(value) if cls is float else Decimal(value)
+                if len(cache) < TEXT_CACHE_LIMIT:
+                    cache[value] = decoded
+            return decoded
+        return to_decimal(value)
+
+    return decode
+
+
+def date_decoder(samples: Iterable[object] = ()) -> Decoder:
+    """Dates repeat on every row of a batch, so text and datetime cells are memoized."""
+    cache: dict[object, date] = {}
+
+    def decode(value: object) -> date:
+        cls = value.__class__
+        if cls is date:
+            return value
+        decoded = cache.get(value)
+        if decoded is None:
+            decoded = to_date(value)
+            if len(cache) < TEXT_CACHE_LIMIT:
+                cache[value] = decoded
+        return decoded
+
+    return decode
+
+
+def time_decoder(samples: Iterable[object] = ()) -> Decoder:
+    """Text times are tried with the format seen in the samples first."""
+    formats = TIME_FORMATS
+    for value in samples:
+        if isinstance(value, str) and value.strip():
+            matching = [fmt for fmt in TIME_FORMATS if _parse_time_text(value, (fmt,)) is not None]
+            formats = tuple(matching) + tuple(fmt for fmt in TIME_FORMATS if fmt not in matching)
+            break
+
+    def decode(value: object) -> time | None:
+        cls = value.__class__
+        if cls is time:
+            return value if value.tzinfo is None else value.replace(tzinfo=None)
+        if cls is datetime:
+            return value.time()
+        if value is None:
+            return None
+        return to_time(value, formats)
+
+    return decode
+
+
+def text_decoder(samples: Iterable[object] = (), *, empty: str | None = None) -> Decoder:
+    """Strip text cells, memoizing repeated values such as ids and names."""
+    # keyed on the type too: 1, 1.0 and True hash equal but print differently
+    cache: dict[tuple[type, object], str | None] = {}
+
+    def decode(value: object) -> str | None:
+        if value is None:
+            return empty
+        key = (value.__class__, value)
+        decoded = cache.get(key)
+        if decoded is None and key not in cache:
+            decoded = str(value).strip() or empty
+            if len(cache) < TEXT_CACHE_LIMIT:
+                cache[key] = decoded
+        return decoded
+
+    return decode
+
+
+def required_text_decoder(samples: Iterable[object] = ()) -> Decoder:
+    """Like `text_decoder` but missing cells decode to ``""`` instead of None."""
+    return text_decoder(samples, empty="")
+
+
+def is_blank_row(row: Iterable[object]) -> bool:
+    for cell in row:
+        if cell is None:
+            continue
+        if cell.__class__ is str and not cell.strip():
+            continue
+        return False
+    return True
@@ -3,20 +3,41 @@
 from __future__ import annotations
 
 import hashlib
+import logging
+import sys
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
 from dataclasses import dataclass
 from datetime import date, datetime, time, timezone
 from decimal import Decimal
 from io import BytesIO
+from itertools import chain, islice
+from operator import itemgetter
+from pathlib import Path
 
-from sqlalchemy import select
+import numpy as np
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
 
+from yem_sistem.anomalies.service import SAMPLE_DTYPE, LoadAnomalyService, LoadSample
 from yem_sistem.batch_items.models import BatchItem
-from yem_sistem.imports.models import ImportJob, ImportStatus
-from yem_sistem.materials.models import Material
+from yem_sistem.imports.decoders import (
+    date_decoder,
+    decimal_decoder,
+    is_blank_row,
+    required_text_decoder,
+    text_decoder,
+    time_decoder,
+)
+from yem_sistem.imports.headers import HeaderResolver
+from yem_sistem.imports.jobs import ImportJobService
+from yem_sistem.imports.models import ImportJob
+from yem_sistem.materials.index import material_index
 from yem_sistem.production_batches.models import BatchStatus, ProductionBatch
 from yem_sistem.stock_movements.models import MovementReason, MovementType, StockMovement
 from yem_sistem.stock_movements.service import NegativeStockError, StockService
+from yem_sistem.stock_movements.version import mark_ledger_changed
+
+logger = logging.getLogger(__name__)
 
 
 class DtmImportError(ValueError):
@@ -30,6 +51,12 @@ class DtmImportSummary:
     suspicious_batches_count: int
 
 
+@dataclass(slots=True)
+class _BatchGroup:
+    params: dict[str, object]
+    rows: list[LoadRow]
+
+
 REQUIRED_COLUMNS = [
     "ID Batch",
     "Batch",
@@ -46,147 +73,383 @@ REQUIRED_COLUMNS = [
     "Error (%)",
 ]
 
+OPTIONAL_DM_COLUMN = "Loaded DM KG (optional)"
 
-class DtmBatchImportService:
-    SOURCE_NAME = "DTM_BATCH"
-
-    def __init__(self, session: Session) -> None:
-        self.session = session
-        self.stock_service = StockService(session)
-
-    def import_file(self, file_name: str, content: bytes, actor_role: str) -> DtmImportSummary:
-        if actor_role.upper() != "ADMIN":
-            raise PermissionError("Only ADMIN can import DTM batches.")
-        if not file_name.lower().endswith((".xlsx", ".xls")):
-            raise DtmImportError("Only .xls/.xlsx files are allowed")
+ZERO_LOADED_REASON = "Contains zero loaded ingredient(s)."
 
-        file_hash = hashlib.sha256(content).hexdigest()
-        exists = self.session.execute(
-            select(ImportJob.id).where(ImportJob.source_name == self.SOURCE_NAME, ImportJob.file_hash == file_hash)
-        ).first()
-        if exists is not None:
-            raise DtmImportError("This file is already imported (hash duplicate).")
 
-        import_job = ImportJob(source_name=self.SOURCE_NAME, file_name=file_name, file_hash=file_hash, status=ImportStatus.PENDING)
-        self.session.add(import_job)
-        self.session.flush()
+@dataclass(slots=True)
+class LoadRow:
+    """One non-empty Load sheet line, decoded; fields follow `REQUIRED_COLUMNS` order."""
+
+    id_batch: str
+    batch: str
+    date: date
+    start_time: time | None
+    end_time: time | None
+    feeder: str | None
+    recipe_id: str | None
+    recipe_name: str | None
+    ingredient_id: str | None
+    ingredient_name: str | None
+    target_weight: Decimal | None
+    loaded: Decimal | None
+    error_percent: Decimal | None
+    loaded_dm_kg: Decimal | None = None
+    material_id: int | None = None
+
+
+LOAD_COLUMN_DECODERS = (
+    required_text_decoder,  # ID Batch
+    required_text_decoder,  # Batch
+    date_decoder,  # Date
+    time_decoder,  # Start time
+    time_decoder,  # End Time
+    text_decoder,  # Feeder
+    text_decoder,  # Recipe ID
+    text_decoder,  # Recipe Name
+    text_decoder,  # Ingredient Id
+    text_decoder,  # Ingredient Name
+    decimal_decoder,  # Target Weight
+    decimal_decoder,  # Loaded
+    decimal_decoder,  # Error (%)
+    decimal_decoder,  # Loaded DM KG (optional)
+)
+
+DECODER_SAMPLE_ROWS = 20
+
+
+def _compile_load_picker(positions: Mapping[str, int]) -> Callable[[Sequence[object]], tuple[object, ...]]:
+    """Pick the Load columns in `REQUIRED_COLUMNS` order, plus the optional DM column (None when absent)."""
+    columns = [positions[name] for name in REQUIRED_COLUMNS]
+    has_dm = OPTIONAL_DM_COLUMN in positions
+    if has_dm:
+        columns.append(positions[OPTIONAL_DM_COLUMN])
+    width = max(columns) + 1
+    pick = itemgetter(*columns)
+
+    def picker(row: Sequence[object]) -> tuple[object, ...]:
+        if len(row) < width:
+            row = tuple(row) + (None,) * (width - len(row))
+        return pick(row) if has_dm else pick(row) + (None,)
+
+    return picker
+
+
+LOAD_HEADERS = HeaderResolver({name: (name,) for name in (*REQUIRED_COLUMNS, OPTIONAL_DM_COLUMN)}, _compile_load_picker)
+
+
+class DtmBatchImportService(ImportJobService):
+    SOURCE_NAME = "DTM_BATCH"
+    JOB_LABEL = "DTM batches"
+    ERROR = DtmImportError
 
-        try:
-            rows = self._parse_load_sheet(file_name=file_name, content=content)
-            summary = self._persist_rows(rows)
-            import_job.status = ImportStatus.SUCCESS
-            import_job.message = (
-                f"rows_processed={summary.rows_processed}, movements_created={summary.movements_created}, "
-                f"suspicious_batches_count={summary.suspicious_batches_count}"
-            )
-            self.session.commit()
-            return summary
-        except Exception as exc:
-            self.session.rollback()
-            failed = ImportJob(
-                source_name=self.SOURCE_NAME,
-                file_name=file_name,
-                file_hash=file_hash,
-                status=ImportStatus.FAILED,
-                message=str(exc),
-            )
-            self.session.add(failed)
-            self.session.commit()
-            raise
+    def __init__(self, session: Session, *, bulk: bool = True) -> None:
+        super().__init__(session)
+        self.bulk = bulk
+        self.stock_service = StockService(session)
+        self.anomalies = LoadAnomalyService(session)
+
+    def import_file(
+        self,
+        file_name: str,
+        content: bytes,
+        actor_role: str,
+        *,
+        chunk_size: int | None = None,
+    ) -> DtmImportSummary:
+        """Import a DTM export synchronously; see `create_job` and `run_job`."""
+        import_job = self.create_job(file_name, hashlib.sha256(content).hexdigest(), actor_role, chunk_size=chunk_size)
+        return self.run_job(import_job.id, content, chunk_size=chunk_size)
+
+    def run_job(self, job_id: int, content: bytes | Path, *, chunk_size: int | None = None) -> DtmImportSummary:
+        """Parse and persist the file (bytes or stored path) of a PENDING job, recording the outcome on the job.
+
+        With ``chunk_size`` the rows are committed every ``chunk_size`` complete
+        batches and progress is checkpointed on the `ImportJob`.
+        """
+        import_job = self._get_job(job_id)
+        rows = self._parse_load_sheet(file_name=import_job.file_name, content=content)
+        return self.run_job_rows(job_id, rows, chunk_size=chunk_size)
+
+    def run_job_rows(self, job_id: int, rows: Iterable[LoadRow], *, chunk_size: int | None = None) -> DtmImportSummary:
+        """Persist already parsed rows for a PENDING job; see `run_job`."""
+        with self.job_scope():
+            import_job = self._start_job(job_id)
+            with self._heartbeat(job_id):
+                try:
+                    if chunk_size is None and import_job.batches_done == 0:
+                        summary = self._persist_rows(rows)
+                        import_job.rows_done = summary.rows_processed
+                        import_job.movements_done = summary.movements_created
+                        import_job.suspicious_batches_done = summary.suspicious_batches_count
+                    else:
+                        summary = self._persist_chunked(import_job, rows, chunk_size or sys.maxsize)
+                    self._finish_job(
+                        import_job,
+                        f"rows_processed={summary.rows_processed}, movements_created={summary.movements_created}, "
+                        f"suspicious_batches_count={summary.suspicious_batches_count}",
+                    )
+                    return summary
+                except Exception as exc:
+                    self.session.rollback()
+                    self.fail_job(job_id, str(exc))
+                    raise
 
-    def _parse_load_sheet(self, file_name: str, content: bytes) -> list[dict[str, object]]:
+    @staticmethod
+    def _parse_load_sheet(file_name: str, content: bytes | Path) -> Iterator[LoadRow]:
+        """Yield non-empty Load sheet rows one at a time.
+
+        ``content`` is either the file bytes or the path of a stored upload;
+        stored files are read from disk rather than copied into memory.
+        ``.xlsx`` files are opened in openpyxl read-only mode so only the
+        current row is materialized; the header is mapped to column indices once.
+        """
+        if isinstance(content, Path) and content.stat().st_size == 0:
+            raise DtmImportError("Uploaded file is empty")
         if file_name.lower().endswith(".xlsx"):
             try:
                 from openpyxl import load_workbook
             except ModuleNotFoundError as exc:
                 raise DtmImportError("openpyxl is required for .xlsx import") from exc
 
-            wb = load_workbook(filename=BytesIO(content), data_only=True)
-            ws = wb["Load"] if "Load" in wb.sheetnames else wb.active
-            values = list(ws.iter_rows(values_only=True))
+            # a stored path is read lazily from disk by zipfile; bytes only when the caller already has them
+            wb = load_workbook(filename=content if isinstance(content, Path) else BytesIO(content), read_only=True, data_only=True)
+            try:
+                ws = wb["Load"] if "Load" in wb.sheetnames else wb.active
+                yield from DtmBatchImportService._iter_load_rows(ws.iter_rows(values_only=True))
+            finally:
+                wb.close()
         else:
             try:
                 import xlrd
             except ModuleNotFoundError as exc:
                 raise DtmImportError("xlrd is required for .xls import") from exc
 
-            book = xlrd.open_workbook(file_contents=content)
+            # xlrd memory-maps a file path instead of reading it into a bytes object
+            if isinstance(content, Path):
+                book = xlrd.open_workbook(filename=str(content), use_mmap=True)
+            else:
+                book = xlrd.open_workbook(file_contents=content)
             sheet = book.sheet_by_name("Load") if "Load" in book.sheet_names() else book.sheet_by_index(0)
-            values = [sheet.row_values(i) for i in range(sheet.nrows)]
+            yield from DtmBatchImportService._iter_load_rows(sheet.row_values(i) for i in range(sheet.nrows))
 
-        if not values:
+    @staticmethod
+    def _iter_load_rows(values: Iterator[Sequence[object]]) -> Iterator[LoadRow]:
+        first = next(values, None)
+        if first is None:
             raise DtmImportError("Load sheet is empty")
 
-        header = [str(c).strip() if c is not None else "" for c in values[0]]
-        missing = [c for c in REQUIRED_COLUMNS if c not in header]
+        layout = LOAD_HEADERS.resolve(first)
+        missing = [c for c in REQUIRED_COLUMNS if c not in layout.positions]
         if missing:
             raise DtmImportError(f"Missing required columns: {', '.join(missing)}")
+        if layout.unmapped:
+            logger.warning("Load sheet columns not mapped: %s", ", ".join(layout.unmapped))
+        pick = LOAD_HEADERS.extractor(layout.positions)
+
+        def raw_rows() -> Iterator[tuple[object, ...]]:
+            for row in values:
+                if is_blank_row(row):
+                    continue
+                yield pick(row)
+
+        raw = raw_rows()
+        samples = list(islice(raw, DECODER_SAMPLE_ROWS))
+        (
+            d_id_batch,
+            d_batch,
+            d_date,
+            d_start,
+            d_end,
+            d_feeder,
+            d_recipe_id,
+            d_recipe_name,
+            d_ingredient_id,
+            d_ingredient_name,
+            d_target,
+            d_loaded,
+            d_error,
+            d_dm,
+        ) = [factory([s[i] for s in samples]) for i, factory in enumerate(LOAD_COLUMN_DECODERS)]
+        for c in chain(samples, raw):
+            yield LoadRow(
+                d_id_batch(c[0]),
+                d_batch(c[1]),
+                d_date(c[2]),
+                d_start(c[3]),
+                d_end(c[4]),
+                d_feeder(c[5]),
+                d_recipe_id(c[6]),
+                d_recipe_name(c[7]),
+                d_ingredient_id(c[8]),
+                d_ingredient_name(c[9]),
+                d_target(c[10]),
+                d_loaded(c[11]),
+                d_error(c[12]),
+                d_dm(c[13]),
+            )
 
-        index = {name: header.index(name) for name in header}
-        parsed: list[dict[str, object]] = []
-        for row in values[1:]:
-            if all((cell is None or str(cell).strip() == "") for cell in row):
-                continue
-            rec = {col: row[index[col]] if index[col] < len(row) else None for col in REQUIRED_COLUMNS}
-            rec["Loaded DM KG (optional)"] = row[index["Loaded DM KG (optional)"]] if "Loaded DM KG (optional)" in index and index["Loaded DM KG (optional)"] < len(row) else None
-            parsed.append(rec)
-        return parsed
+    def _persist_rows(self, rows: Iterable[LoadRow]) -> DtmImportSummary:
+        return self._write_rows(self._validate_rows(rows))
+
+    def _persist_chunked(self, job: ImportJob, rows: Iterable[LoadRow], chunk_size: int) -> DtmImportSummary:
+        """Write ``rows`` in chunks of complete batches, committing a checkpoint after each chunk.
+
+        The first ``job.batches_done`` batch keys of the file are skipped; rows
+        whose ``(id_batch, material_id, start_time)`` already exist are dropped
+        so an overlapping retry never duplicates batch items.
+        """
+        skip = job.batches_done
+        seen = 0
+        current_key: tuple[str, date, time | None] | None = None
+        flushed: set[tuple[str, date, time | None]] = set()
+        chunk: list[LoadRow] = []
+        chunk_keys = 0
+
+        def flush() -> None:
+            summary = self._write_rows(self._drop_existing_items(self._validate_rows(chunk)))
+            # rows already stored by an earlier attempt are not progress
+            job.rows_done += summary.rows_processed
+            job.batches_done += chunk_keys
+            job.movements_done += summary.movements_created
+            job.suspicious_batches_done += summary.suspicious_batches_count
+            job.last_batch_key = self._format_batch_key(current_key)
+            self.session.commit()
 
-    def _persist_rows(self, rows: list[dict[str, object]]) -> DtmImportSummary:
-        unknown_ingredients: set[str] = set()
-        materials = list(self.session.scalars(select(Material)).all())
-        by_code = {m.code.strip().upper(): m.id for m in materials}
-        by_name = {m.name.strip().upper(): m.id for m in materials}
-
-        def resolve_material_id(ingredient_id: object, ingredient_name: object) -> int | None:
-            if ingredient_id is not None and str(ingredient_id).strip() != "":
-                key = str(ingredient_id).strip().upper()
-                if key in by_code:
-                    return by_code[key]
-            if ingredient_name is not None and str(ingredient_name).strip() != "":
-                key = str(ingredient_name).strip().upper()
-                if key in by_name:
-                    return by_name[key]
+        for r in rows:
+            key = self._batch_key(r)
+            if key != current_key:
+                if key in flushed:
+                    raise DtmImportError(
+                        f"Rows of batch {self._format_batch_key(key)} are not contiguous; import without chunk_size"
+                    )
+                if current_key is not None:
+                    flushed.add(current_key)
+                seen += 1
+                if seen == skip and job.last_batch_key is not None and self._format_batch_key(key) != job.last_batch_key:
+                    raise DtmImportError("File content does not match the import checkpoint")
+                if seen > skip and chunk_keys == chunk_size:
+                    flush()
+                    chunk = []
+                    chunk_keys = 0
+                current_key = key
+                if seen > skip:
+                    chunk_keys += 1
+            if seen > skip:
+                chunk.append(r)
+
+        if chunk:
+            flush()
+
+        return DtmImportSummary(
+            rows_processed=job.rows_done,
+            movements_created=job.movements_done,
+            suspicious_batches_count=job.suspicious_batches_done,
+        )
+
+    def _drop_existing_items(self, validated: list[LoadRow]) -> list[LoadRow]:
+        """Remove rows already stored under `uq_batch_items_idbatch_material_start`."""
+        id_batches = {r.id_batch for r in validated}
+        if not id_batches:
+            return validated
+        existing = set(
+            self.session.execute(
+                select(BatchItem.id_batch, BatchItem.material_id, BatchItem.start_time).where(BatchItem.id_batch.in_(id_batches))
+            ).tuples()
+        )
+        if not existing:
+            return validated
+        return [
+            r for r in validated if (r.id_batch, r.material_id, r.start_time) not in existing
+        ]
+
+    def _batch_key(self, r: LoadRow) -> tuple[str, date, time | None]:
+        return r.id_batch, r.date, r.start_time
+
+    @staticmethod
+    def _format_batch_key(key: tuple[str, date, time | None] | None) -> str | None:
+        if key is None:
             return None
+        id_batch, batch_date, start_time = key
+        return f"{id_batch}|{batch_date.isoformat()}|{start_time.isoformat() if start_time else ''}"
+
+    def _validate_rows(self, rows: Iterable[LoadRow]) -> list[LoadRow]:
+        unknown_ingredients: set[str] = set()
 
-        validated: list[dict[str, object]] = []
+        validated: list[LoadRow] = []
         for r in rows:
-            loaded = self._to_decimal(r.get("Loaded"))
-            if loaded is None or loaded < Decimal("0.000"):
+            if r.loaded is None or r.loaded < Decimal("0.000"):
                 raise DtmImportError("Loaded value cannot be null or negative")
 
-            material_id = resolve_material_id(r.get("Ingredient Id"), r.get("Ingredient Name"))
+            material_id = material_index.resolve(self.session, r.ingredient_id, r.ingredient_name)
             if material_id is None:
-                unknown_ingredients.add(f"{r.get('Ingredient Id')}/{r.get('Ingredient Name')}")
+                unknown_ingredients.add(f"{r.ingredient_id}/{r.ingredient_name}")
                 continue
 
-            validated.append({**r, "material_id": material_id, "loaded": loaded})
+            r.material_id = material_id
+            validated.append(r)
 
         if unknown_ingredients:
             raise DtmImportError(f"Unknown ingredients: {sorted(unknown_ingredients)}")
+        return validated
+
+    def _score_loads(self, validated: list[LoadRow]) -> list[str | None]:
+        """Anomaly note per validated row (None when normal); zero-loaded rows are flagged separately."""
+        recipes: dict[str, int] = {}
+        # one pass over the rows; NumPy converts the Decimals while filling the record array
+        rows = np.fromiter(
+            (
+                (
+                    recipes.setdefault(r.recipe_id or r.recipe_name or "", len(recipes)),
+                    r.material_id,
+                    r.target_weight or 0,
+                    r.loaded,
+                    np.nan if r.error_percent is None else r.error_percent,
+                )
+                for r in validated
+            ),
+            dtype=SAMPLE_DTYPE,
+            count=len(validated),
+        )
+        return self.anomalies.score_and_learn(LoadSample(recipes=list(recipes), rows=rows))
 
+    @staticmethod
+    def _suspicious_reason(zero_count: int, anomalies: list[tuple[str, str]]) -> str | None:
+        reasons = []
+        if zero_count:
+            reasons.append(ZERO_LOADED_REASON)
+        if anomalies:
+            reasons.append(LoadAnomalyService.batch_reason(anomalies))
+        return " ".join(reasons) or None
+
+    def _write_rows(self, validated: list[LoadRow]) -> DtmImportSummary:
+        if self.bulk:
+            return self._write_rows_bulk(validated)
+        return self._write_rows_orm(validated)
+
+    def _write_rows_orm(self, validated: list[LoadRow]) -> DtmImportSummary:
         batch_map: dict[tuple[str, date, time | None], ProductionBatch] = {}
         suspicious_batches: set[int] = set()
-        movements_created = 0
+        batch_anomalies: dict[tuple[str, date, time | None], list[tuple[str, str]]] = {}
+        movements: list[StockMovement] = []
 
-        for r in validated:
-            id_batch = str(r["ID Batch"]).strip()
-            batch_date = self._to_date(r["Date"])
-            start_time = self._to_time(r.get("Start time"))
-            end_time = self._to_time(r.get("End Time"))
-            key = (id_batch, batch_date, start_time)
+        for r, note in zip(validated, self._score_loads(validated)):
+            key = self._batch_key(r)
+            id_batch, batch_date, start_time = key
+            end_time = r.end_time
 
             batch = batch_map.get(key)
             if batch is None:
                 batch = ProductionBatch(
                     id_batch=id_batch,
-                    batch_name=str(r.get("Batch") or "").strip(),
+                    batch_name=r.batch,
                     date=batch_date,
                     start_time=start_time,
                     end_time=end_time,
-                    feeder=self._to_opt_str(r.get("Feeder")),
-                    recipe_id=self._to_opt_str(r.get("Recipe ID")),
-                    recipe_name=self._to_opt_str(r.get("Recipe Name")),
+                    feeder=r.feeder,
+                    recipe_id=r.recipe_id,
+                    recipe_name=r.recipe_name,
                     status=BatchStatus.OK,
                     suspicious_count_zero=0,
                 )
@@ -194,88 +457,161 @@ class DtmBatchImportService:
                 self.session.flush()
                 batch_map[key] = batch
 
-            target_weight = self._to_decimal(r.get("Target Weight")) or Decimal("0.000")
-            loaded = r["loaded"]
-            error_percent = self._to_decimal(r.get("Error (%)"))
+            target_weight = r.target_weight or Decimal("0.000")
+            loaded = r.loaded
+            error_percent = r.error_percent
 
             item = BatchItem(
                 production_batch_id=batch.id,
-                material_id=int(r["material_id"]),
+                material_id=r.material_id,
                 id_batch=id_batch,
                 start_time=start_time,
                 target_weight=target_weight,
                 loaded_weight=loaded,
                 error_percent=error_percent,
                 is_zero_loaded=(loaded == Decimal("0.000")),
+                anomaly_note=note,
             )
             self.session.add(item)
 
             if loaded == Decimal("0.000"):
                 batch.status = BatchStatus.SUSPICIOUS
                 batch.suspicious_count_zero += 1
-                batch.suspicious_reason = "Contains zero loaded ingredient(s)."
+                batch.suspicious_reason = ZERO_LOADED_REASON
                 suspicious_batches.add(batch.id)
                 continue
+            if note is not None:
+                # only zero loads can be corrected, so anomalies are reported without changing the status
+                batch_anomalies.setdefault(key, []).append((r.ingredient_name or r.ingredient_id or "", note))
 
             movement_at = datetime.combine(batch_date, start_time or time(0, 0), tzinfo=timezone.utc)
-            movement = StockMovement(
-                material_id=int(r["material_id"]),
-                movement_type=MovementType.OUT_PRODUCTION,
-                reason=MovementReason.DTM_CONSUMPTION,
-                quantity=loaded,
-                movement_at=movement_at,
-                reference_type="DTM_BATCH",
-                reference_id=batch.id,
-                note=f"id_batch={id_batch}",
+            movements.append(
+                StockMovement(
+                    material_id=r.material_id,
+                    movement_type=MovementType.OUT_PRODUCTION,
+                    reason=MovementReason.DTM_CONSUMPTION,
+                    quantity=loaded,
+                    movement_at=movement_at,
+                    reference_type="DTM_BATCH",
+                    reference_id=batch.id,
+                    note=f"id_batch={id_batch}",
+                )
             )
-            try:
-                self.stock_service.add_movement(movement)
-            except NegativeStockError as exc:
-                raise DtmImportError(str(exc)) from exc
-            movements_created += 1
+
+        for key, anomalies in batch_anomalies.items():
+            batch = batch_map[key]
+            batch.suspicious_reason = self._suspicious_reason(batch.suspicious_count_zero, anomalies)
+
+        try:
+            self.stock_service.add_movements(movements)
+        except NegativeStockError as exc:
+            raise DtmImportError(str(exc)) from exc
 
         return DtmImportSummary(
             rows_processed=len(validated),
-            movements_created=movements_created,
+            movements_created=len(movements),
             suspicious_batches_count=len(suspicious_batches),
         )
 
-    @staticmethod
-    def _to_opt_str(value: object) -> str | None:
-        if value is None:
-            return None
-        s = str(value).strip()
-        return s or None
-
-    @staticmethod
-    def _to_decimal(value: object) -> Decimal | None:
-        if value is None:
-            return None
-        s = str(value).strip().replace(",", ".")
-        if not s:
-            return None
-        return Decimal(s)
+    def _write_rows_bulk(self, validated: list[LoadRow]) -> DtmImportSummary:
+        """Write the same rows as `_write_rows_orm` with a fixed number of multi-row statements.
+
+        Batches are grouped in memory first, inserted with one multi-row
+        ``INSERT ... RETURNING`` and the generated ids are used to build the
+        item and movement parameter lists, which are sent as executemany.
+        """
+        groups: dict[tuple[str, date, time | None], _BatchGroup] = {}
+        notes = self._score_loads(validated)
+        batch_anomalies: dict[tuple[str, date, time | None], list[tuple[str, str]]] = {}
+        for r, note in zip(validated, notes):
+            key = self._batch_key(r)
+            id_batch, batch_date, start_time = key
+
+            group = groups.get(key)
+            if group is None:
+                group = _BatchGroup(
+                    params={
+                        "id_batch": id_batch,
+                        "batch_name": r.batch,
+                        "date": batch_date,
+                        "start_time": start_time,
+                        "end_time": r.end_time,
+                        "feeder": r.feeder,
+                        "recipe_id": r.recipe_id,
+                        "recipe_name": r.recipe_name,
+                        "status": BatchStatus.OK,
+                        "suspicious_count_zero": 0,
+                        "suspicious_reason": None,
+                    },
+                    rows=[],
+                )
+                groups[key] = group
+
+            group.rows.append(r)
+            if r.loaded == Decimal("0.000"):
+                group.params["status"] = BatchStatus.SUSPICIOUS
+                group.params["suspicious_count_zero"] += 1
+                group.params["suspicious_reason"] = ZERO_LOADED_REASON
+            elif note is not None:
+                batch_anomalies.setdefault(key, []).append((r.ingredient_name or r.ingredient_id or "", note))
+
+        for key, anomalies in batch_anomalies.items():
+            params = groups[key].params
+            params["suspicious_reason"] = self._suspicious_reason(params["suspicious_count_zero"], anomalies)
+
+        if not groups:
+            return DtmImportSummary(rows_processed=0, movements_created=0, suspicious_batches_count=0)
+
+        batch_ids = self.session.scalars(
+            insert(ProductionBatch).returning(ProductionBatch.id, sort_by_parameter_order=True),
+            [g.params for g in groups.values()],
+        ).all()
+        # Core inserts bypass the flush hook; zero-loaded batches may record no movement either
+        mark_ledger_changed(self.session)
+
+        note_by_row = {id(r): note for r, note in zip(validated, notes) if note is not None}
+        item_params: list[dict[str, object]] = []
+        movement_params: list[dict[str, object]] = []
+        for batch_id, ((id_batch, batch_date, start_time), group) in zip(batch_ids, groups.items()):
+            movement_at = datetime.combine(batch_date, start_time or time(0, 0), tzinfo=timezone.utc)
+            for r in group.rows:
+                loaded = r.loaded
+                item_params.append(
+                    {
+                        "production_batch_id": batch_id,
+                        "material_id": r.material_id,
+                        "id_batch": id_batch,
+                        "start_time": start_time,
+                        "target_weight": r.target_weight or Decimal("0.000"),
+                        "loaded_weight": loaded,
+                        "error_percent": r.error_percent,
+                        "is_zero_loaded": loaded == Decimal("0.000"),
+                        "anomaly_note": note_by_row.get(id(r)),
+                    }
+                )
+                if loaded == Decimal("0.000"):
+                    continue
+                movement_params.append(
+                    {
+                        "material_id": r.material_id,
+                        "movement_type": MovementType.OUT_PRODUCTION,
+                        "reason": MovementReason.DTM_CONSUMPTION,
+                        "quantity": loaded,
+                        "movement_at": movement_at,
+                        "reference_type": "DTM_BATCH",
+                        "reference_id": batch_id,
+                        "note": f"id_batch={id_batch}",
+                    }
+                )
 
-    @staticmethod
-    def _to_date(value: object) -> date:
-        if isinstance(value, datetime):
-            return value.date()
-        if isinstance(value, date):
-            return value
-        return datetime.fromisoformat(str(value)).date()
+        self.session.execute(insert(BatchItem), item_params)
+        try:
+            self.stock_service.record_movement_rows(movement_params)
+        except NegativeStockError as exc:
+            raise DtmImportError(str(exc)) from exc
 
-    @staticmethod
-    def _to_time(value: object) -> time | None:
-        if value is None or str(value).strip() == "":
-            return None
-        if isinstance(value, datetime):
-            return value.time().replace(tzinfo=None)
-        if isinstance(value, time):
-            return value.replace(tzinfo=None)
-        s = str(value).strip()
-        for fmt in ("%H:%M:%S", "%H:%M"):
-            try:
-                return datetime.strptime(s, fmt).time()
-            except ValueError:
-                pass
-        return None
+        return DtmImportSummary(
+            rows_processed=len(validated),
+            movements_created=len(movement_params),
+            suspicious_batches_count=sum(1 for g in groups.values() if g.params["status"] == BatchStatus.SUSPICIOUS),
+        )
@@ -0,0 +1,189 @@
+"""Header resolution for spreadsheet imports.
+
+Exports from the feeding and herd systems label the same column in English
+or Turkish depending on the user's locale ("Total Cows" / "Toplam İnekler"),
+sometimes with stray punctuation or spacing, and carry Excel's placeholder
+columns ("Column32", "Sütun1"). `HeaderResolver` maps a header row onto a
+fixed set of fields through `HEADER_SYNONYMS`, falling back to fuzzy matching
+only for labels nothing matched exactly.
+
+Detection runs once per distinct header row: layouts are cached by the row's
+fingerprint (its folded labels) and compiled extractors by the resulting
+column positions, so files sharing a layout go straight to extraction.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from difflib import get_close_matches
+from functools import lru_cache
+from threading import Lock
+
+Extractor = Callable[[Sequence[object]], object]
+
+# canonical header -> other spellings seen in the exports
+HEADER_SYNONYMS: dict[str, tuple[str, ...]] = {
+    "Date": ("Tarih",),
+    "Group Number": ("Grup Numarası",),
+    "Total Cows": ("Toplam İnekler", "Milking Cow"),
+    "Avg. Yield Yesterday": ("Ort. Verim Dün", "Avg. Yield"),
+    "Parlour Name": ("Sağımhane Adı", "Parlor Name"),
+    "Session Number": ("Seans Sayısı",),
+    "Number of Batches": ("Yığın Numaraları",),
+    "Milk Start Time": ("Sağım Başlangıç Zamanı",),
+    "Milk End Time": ("Sağım Sonlandırma Zamanı",),
+    "Milk Session Duration": ("Sağma Seansı Süresi",),
+    "Avg. Milk Duration": ("Ort. Sağım Süresi",),
+    "Milk Yield": ("Süt Verimi",),
+    "Cows per Hour": ("Saat başına İnekler",),
+    "Total yield from unknown animals only": ("Sadece bilinmeyen hayvanlardan sağlanan toplam verim",),
+    "Number of Milk Weights": ("Süt Ağırlığı Numarası",),
+    "Unknown Milk Weights": ("Bilinmeyen Süt Ağırlıkları",),
+    "Milk Yield per Hour": ("Saat Başına Süt Verimi",),
+    "Milk Weights per Hour": ("Saat Başına Süt Ağırlıkları",),
+    "Milk Yield per Cow": ("İnek Başına Süt Verimi",),
+    "Cows Identified": ("Tanımlanan İnekler",),
+    "Cows Not Identified": ("Tanımlanmayan İnekler",),
+    "Transponders Identified": ("Tanımlanan Transponderler",),
+    "Unknown Transponders": ("Bilinmeyen Transponderler",),
+    "Start time": ("Başlangıç Zamanı",),
+    "End Time": ("Bitiş Zamanı",),
+    "Recipe Name": ("Reçete Adı",),
+    "Ingredient Id": ("Ingredient ID",),
+    "Ingredient Name": ("Malzeme Adı",),
+    "Target Weight": ("Hedef Ağırlık",),
+    "Loaded": ("Yüklenen",),
+    "Time": ("Saat",),
+    "Plate": ("Plaka", "Plate No"),
+    "Company": ("Firma", "Supplier", "Tedarikçi"),
+    "Material Code": ("Malzeme Kodu", "Product Code", "Ürün Kodu"),
+    "Net Weight": ("Net Ağırlık", "Net (kg)", "Net"),
+    "Note": ("Açıklama", "Not"),
+}
+
+# Excel placeholders for unnamed table columns and error literals such as #REF!
+IGNORED_HEADER = re.compile(r"^(column|sutun)\s*\d+$|^#", re.IGNORECASE)
+
+FUZZY_CUTOFF = 0.9
+LAYOUT_CACHE_LIMIT = 1_024
+
+_TURKISH_FOLD = str.maketrans("ıİşŞğĞüÜöÖçÇ", "iissgguuoocc")
+
+
+@lru_cache(maxsize=8_192)
+def fold_header(label: str) -> str:
+    """Case-, spacing- and Turkish-diacritic-insensitive form of a header label."""
+    return " ".join(label.translate(_TURKISH_FOLD).casefold().split())
+
+
+def header_fingerprint(row: Sequence[object]) -> tuple[str | None, ...]:
+    labels = [fold_header(v) if v.__class__ is str else None for v in row]
+    while labels and not labels[-1]:
+        labels.pop()
+    return tuple(labels)
+
+
+@dataclass(frozen=True, slots=True)
+class HeaderLayout:
+    """Fields found in one header row; ``unmapped`` labels matched no field."""
+
+    positions: Mapping[str, int]
+    unmapped: tuple[str, ...]
+    ignored: tuple[str, ...]
+    fuzzy: Mapping[str, str]
+
+
+class HeaderResolver:
+    """Resolves header rows onto ``fields`` (field -> canonical headers).
+
+    ``compile`` turns column positions into a row extractor; it is called once
+    per distinct set of positions.
+    """
+
+    def __init__(
+        self,
+        fields: Mapping[str, Iterable[str]],
+        compile: Callable[[Mapping[str, int]], Extractor],
+        *,
+        synonyms: Mapping[str, Sequence[str]] = HEADER_SYNONYMS,
+    ) -> None:
+        self._compile = compile
+        self._lookup: dict[str, str] = {}
+        for field, headers in fields.items():
+            for header in headers:
+                for label in (header, *synonyms.get(header, ())):
+                    self._lookup.setdefault(fold_header(label), field)
+        self._layouts: dict[tuple[str | None, ...], HeaderLayout] = {}
+        self._extractors: dict[tuple[tuple[str, int], ...], Extractor] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def labels_for(self, field: str) -> frozenset[str]:
+        """Folded labels that resolve to ``field``, for cheap header-row detection."""
+        return frozenset(label for label, f in self._lookup.items() if f == field)
+
+    def resolve(self, row: Sequence[object]) -> HeaderLayout:
+        fingerprint = header_fingerprint(row)
+        layout = self._layouts.get(fingerprint)
+        if layout is not None:
+            self.hits += 1
+            return layout
+        self.misses += 1
+        layout = self._detect(row)
+        with self._lock:
+            if len(self._layouts) >= LAYOUT_CACHE_LIMIT:
+                self._layouts.clear()
+            self._layouts[fingerprint] = layout
+        return layout
+
+    def extractor(self, positions: Mapping[str, int]) -> Extractor:
+        key = tuple(sorted(positions.items()))
+        extract = self._extractors.get(key)
+        if extract is None:
+            extract = self._compile(dict(positions))
+            with self._lock:
+                if len(self._extractors) >= LAYOUT_CACHE_LIMIT:
+                    self._extractors.clear()
+                self._extractors[key] = extract
+        return extract
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "layouts": len(self._layouts)}
+
+    def _detect(self, row: Sequence[object]) -> HeaderLayout:
+        positions: dict[str, int] = {}
+        pending: list[tuple[int, str, str]] = []
+        unmapped: list[str] = []
+        ignored: list[str] = []
+        for index, value in enumerate(row):
+            if value.__class__ is not str:
+                continue
+            label = value.strip()
+            if not label:
+                continue
+            if IGNORED_HEADER.match(label.translate(_TURKISH_FOLD)):
+                ignored.append(label)
+                continue
+            field = self._lookup.get(fold_header(label))
+            if field is None:
+                pending.append((index, label, fold_header(label)))
+            elif field in positions:
+                unmapped.append(label)  # a second column for the same field; the first one wins
+            else:
+                positions[field] = index
+
+        # fuzzy matching only for labels no exact synonym claimed, and only onto unclaimed fields
+        fuzzy: dict[str, str] = {}
+        for index, label, folded in pending:
+            candidates = [known for known, f in self._lookup.items() if f not in positions]
+            match = get_close_matches(folded, candidates, n=1, cutoff=FUZZY_CUTOFF)
+            if match:
+                field = self._lookup[match[0]]
+                positions[field] = index
+                fuzzy[label] = field
+            else:
+                unmapped.append(label)
+        return HeaderLayout(positions=positions, unmapped=tuple(unmapped), ignored=tuple(ignored), fuzzy=fuzzy)
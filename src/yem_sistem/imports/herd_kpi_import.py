@@ -0,0 +1,360 @@
+"""Herd KPI imports from parlour performance and group yield exports.
+
+The herd management system exports one sheet per KPI with the header row
+repeated above every day (or every few days) of data, and the column order
+of those header rows is not stable across a file. Each header row therefore
+re-maps the columns for the data rows that follow it. Labels missing from a
+repeated header keep the position of the last header that named them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+from functools import partial
+from io import BytesIO
+from itertools import chain, islice
+from pathlib import Path
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from yem_sistem.db.base import Base
+from yem_sistem.db.upsert import dialect_insert
+from yem_sistem.herd_kpis.models import GroupYield, ParlourSession
+from yem_sistem.imports.decoders import is_blank_row, to_decimal, to_opt_str, to_time
+from yem_sistem.imports.headers import HeaderResolver, fold_header
+from yem_sistem.imports.jobs import ImportJobService
+from yem_sistem.imports.models import ImportJob
+
+KpiDecoder = Callable[[object], object]
+
+
+class HerdKpiImportError(ValueError):
+    """Herd KPI import validation error."""
+
+
+@dataclass(slots=True)
+class HerdKpiImportSummary:
+    rows_processed: int
+    rows_skipped: int
+    unmapped_columns: list[str] = field(default_factory=list)
+
+
+def _is_error_cell(value: object) -> bool:
+    """Excel error literals such as ``#REF!`` and ``#VALUE!``."""
+    return value.__class__ is str and value.lstrip().startswith("#")
+
+
+def kpi_int(value: object) -> int | None:
+    if value is None or _is_error_cell(value):
+        return None
+    if value.__class__ is int:
+        return value
+    if isinstance(value, float):
+        return int(round(value))
+    s = str(value).strip().replace(",", ".")
+    try:
+        return int(float(s)) if s else None
+    except ValueError:
+        return None
+
+
+def kpi_decimal(value: object) -> Decimal | None:
+    if value is None or _is_error_cell(value):
+        return None
+    try:
+        return to_decimal(value)
+    except InvalidOperation:
+        return None
+
+
+def kpi_date(value: object) -> date | None:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    s = to_opt_str(value)
+    if s is None:
+        return None
+    try:
+        return datetime.fromisoformat(s).date()
+    except ValueError:
+        return None
+
+
+def kpi_time(value: object) -> time | None:
+    if _is_error_cell(value) or isinstance(value, (int, float)):
+        return None
+    return to_time(value)
+
+
+def kpi_duration_seconds(value: object) -> int | None:
+    """Durations stored as Excel times (h:mm:ss) or fractions of a day."""
+    if isinstance(value, time):
+        return value.hour * 3600 + value.minute * 60 + value.second
+    if isinstance(value, timedelta):
+        return int(value.total_seconds())
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return round(value * 86_400)
+    return None
+
+
+def kpi_minute_duration_seconds(value: object) -> int | None:
+    """Per-cow durations the herd system writes as ``m:ss`` into an ``h:mm`` cell."""
+    if isinstance(value, time):
+        return value.hour * 60 + value.minute
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return round(value * 1_440)
+    return None
+
+
+@dataclass(frozen=True, slots=True)
+class KpiColumn:
+    field: str
+    headers: tuple[str, ...]
+    decode: KpiDecoder
+
+
+@dataclass(frozen=True, slots=True)
+class KpiSheetSpec:
+    """How one export sheet maps onto a KPI table.
+
+    ``headers`` are canonical labels; their Turkish and alternative spellings
+    come from `HEADER_SYNONYMS`. ``key`` is both the upsert conflict key and
+    the set of fields a data row must have; a row holding one of the anchor
+    column's labels is a header row.
+    """
+
+    source_name: str
+    label: str
+    model: type[Base]
+    columns: tuple[KpiColumn, ...]
+    key: tuple[str, ...]
+    anchor: str
+
+    def column(self, field: str) -> KpiColumn:
+        return next(c for c in self.columns if c.field == field)
+
+
+PARLOUR_SESSIONS = KpiSheetSpec(
+    source_name="HERD_PARLOUR_SESSIONS",
+    label="parlour sessions",
+    model=ParlourSession,
+    columns=(
+        KpiColumn("parlour_name", ("Parlour Name",), to_opt_str),
+        KpiColumn("session_number", ("Session Number",), kpi_int),
+        KpiColumn("session_date", ("Date",), kpi_date),
+        KpiColumn("number_of_batches", ("Number of Batches",), kpi_int),
+        KpiColumn("milk_start_time", ("Milk Start Time",), kpi_time),
+        KpiColumn("milk_end_time", ("Milk End Time",), kpi_time),
+        KpiColumn("session_duration_seconds", ("Milk Session Duration",), kpi_duration_seconds),
+        KpiColumn("avg_milk_duration_seconds", ("Avg. Milk Duration",), kpi_minute_duration_seconds),
+        KpiColumn("total_cows", ("Total Cows",), kpi_int),
+        KpiColumn("milk_yield", ("Milk Yield",), kpi_decimal),
+        KpiColumn("cows_per_hour", ("Cows per Hour",), kpi_decimal),
+        KpiColumn("milk_yield_per_hour", ("Milk Yield per Hour",), kpi_decimal),
+        KpiColumn("milk_yield_per_cow", ("Milk Yield per Cow",), kpi_decimal),
+        KpiColumn("unknown_animals_yield", ("Total yield from unknown animals only",), kpi_decimal),
+        KpiColumn("milk_weights", ("Number of Milk Weights",), kpi_int),
+        KpiColumn("unknown_milk_weights", ("Unknown Milk Weights",), kpi_int),
+        KpiColumn("milk_weights_per_hour", ("Milk Weights per Hour",), kpi_decimal),
+        KpiColumn("cows_identified", ("Cows Identified",), kpi_int),
+        KpiColumn("cows_not_identified", ("Cows Not Identified",), kpi_int),
+        KpiColumn("transponders_identified", ("Transponders Identified",), kpi_int),
+        KpiColumn("unknown_transponders", ("Unknown Transponders",), kpi_int),
+    ),
+    key=("session_date", "parlour_name", "session_number"),
+    anchor="parlour_name",
+)
+
+GROUP_YIELDS = KpiSheetSpec(
+    source_name="HERD_GROUP_YIELDS",
+    label="group yields",
+    model=GroupYield,
+    columns=(
+        KpiColumn("group_number", ("Group Number",), kpi_int),
+        KpiColumn("total_cows", ("Total Cows",), kpi_int),
+        KpiColumn("avg_yield", ("Avg. Yield Yesterday",), kpi_decimal),
+        KpiColumn("yield_difference", ("Yield Difference",), kpi_decimal),
+        KpiColumn("herd_avg_yield", ("Avg Yield",), kpi_decimal),
+        KpiColumn("yield_date", ("Date",), kpi_date),
+    ),
+    key=("yield_date", "group_number"),
+    anchor="group_number",
+)
+
+KPI_SHEETS: dict[str, KpiSheetSpec] = {
+    "parlour-sessions": PARLOUR_SESSIONS,
+    "group-yields": GROUP_YIELDS,
+}
+
+
+def _compile_extractor(spec: KpiSheetSpec, positions: Mapping[str, int]) -> Callable[[Sequence[object]], dict[str, object]]:
+    plan = [(c.field, positions.get(c.field), c.decode) for c in spec.columns]
+
+    def extract(row: Sequence[object]) -> dict[str, object]:
+        width = len(row)
+        return {
+            field: decode(row[index]) if index is not None and index < width else None
+            for field, index, decode in plan
+        }
+
+    return extract
+
+
+_RESOLVERS: dict[str, HeaderResolver] = {}
+
+
+def header_resolver(spec: KpiSheetSpec) -> HeaderResolver:
+    """Process-wide resolver per spec, so its layout cache spans files and jobs."""
+    resolver = _RESOLVERS.get(spec.source_name)
+    if resolver is None:
+        resolver = _RESOLVERS.setdefault(
+            spec.source_name,
+            HeaderResolver({c.field: c.headers for c in spec.columns}, partial(_compile_extractor, spec)),
+        )
+    return resolver
+
+
+def iter_kpi_records(
+    spec: KpiSheetSpec, values: Iterable[Sequence[object]], unmapped: set[str] | None = None
+) -> Iterator[dict[str, object]]:
+    """Decode data rows into column dicts, re-mapping columns at every header row.
+
+    Header labels that match no column are added to ``unmapped``.
+    """
+    resolver = header_resolver(spec)
+    anchors = resolver.labels_for(spec.anchor)
+    positions: dict[str, int] = {}
+    extract = None
+
+    for row in values:
+        if is_blank_row(row):
+            continue
+        if any(v.__class__ is str and fold_header(v) in anchors for v in row):
+            layout = resolver.resolve(row)
+            positions.update(layout.positions)
+            extract = resolver.extractor(positions)
+            if unmapped is not None:
+                unmapped.update(layout.unmapped)
+            continue
+        if extract is not None:
+            yield extract(row)
+
+
+class HerdKpiImportService(ImportJobService):
+    """Imports one kind of herd KPI export (see `KPI_SHEETS`) into its table.
+
+    Rows are upserted on the spec key, so overlapping exports (a yearly file
+    after the monthly ones) update the stored values; a column the newer file
+    lacks keeps its stored value.
+    """
+
+    JOB_LABEL = "herd KPI exports"
+    ALLOWED_EXTENSIONS = (".xlsx",)
+    ERROR = HerdKpiImportError
+    INSERT_CHUNK_ROWS = 1_000
+    HEADER_SCAN_ROWS = 10
+
+    def __init__(self, session: Session, spec: KpiSheetSpec) -> None:
+        super().__init__(session)
+        self.spec = spec
+        self.SOURCE_NAME = spec.source_name
+
+    @classmethod
+    def for_kind(cls, session: Session, kind: str) -> HerdKpiImportService:
+        spec = KPI_SHEETS.get(kind)
+        if spec is None:
+            raise HerdKpiImportError(f"Unknown herd KPI export {kind!r}; expected one of {sorted(KPI_SHEETS)}")
+        return cls(session, spec)
+
+    def import_file(self, file_name: str, content: bytes, actor_role: str) -> HerdKpiImportSummary:
+        """Import an export synchronously; see `create_job` and `run_job`."""
+        import_job = self.create_job(file_name, hashlib.sha256(content).hexdigest(), actor_role)
+        return self.run_job(import_job.id, content)
+
+    def run_job(self, job_id: int, content: bytes | Path) -> HerdKpiImportSummary:
+        """Parse and upsert the file (bytes or stored path) of a PENDING job in one transaction.
+
+        Header labels that match no column are listed on the summary and in the job message.
+        """
+        with self.job_scope():
+            import_job = self._start_job(job_id)
+            with self._heartbeat(job_id):
+                try:
+                    unmapped: set[str] = set()
+                    summary = self._write_records(import_job, self._parse_sheet(import_job.file_name, content, unmapped))
+                    if summary.rows_processed == 0:
+                        raise HerdKpiImportError(f"No {self.spec.label} rows found in {import_job.file_name}")
+                    summary.unmapped_columns = sorted(unmapped)
+                    import_job.rows_done = summary.rows_processed
+                    message = f"rows_processed={summary.rows_processed}, rows_skipped={summary.rows_skipped}"
+                    if summary.unmapped_columns:
+                        message += f", unmapped_columns={summary.unmapped_columns}"
+                    self._finish_job(import_job, message)
+                    return summary
+                except Exception as exc:
+                    self.session.rollback()
+                    self.fail_job(job_id, str(exc))
+                    raise
+
+    def _parse_sheet(
+        self, file_name: str, content: bytes | Path, unmapped: set[str] | None = None
+    ) -> Iterator[dict[str, object]]:
+        """Stream the first sheet whose header names the spec anchor, in openpyxl read-only mode."""
+        try:
+            from openpyxl import load_workbook
+        except ModuleNotFoundError as exc:
+            raise HerdKpiImportError("openpyxl is required for .xlsx import") from exc
+
+        anchors = header_resolver(self.spec).labels_for(self.spec.anchor)
+        wb = load_workbook(filename=content if isinstance(content, Path) else BytesIO(content), read_only=True, data_only=True)
+        try:
+            for ws in wb.worksheets:
+                rows = ws.iter_rows(values_only=True)
+                head = list(islice(rows, self.HEADER_SCAN_ROWS))
+                if any(v.__class__ is str and fold_header(v) in anchors for row in head for v in row):
+                    yield from iter_kpi_records(self.spec, chain(head, rows), unmapped)
+                    return
+        finally:
+            wb.close()
+        raise HerdKpiImportError(f"No sheet with {self.spec.label} headers in {file_name}")
+
+    def _write_records(self, import_job: ImportJob, records: Iterable[dict[str, object]]) -> HerdKpiImportSummary:
+        key_fields = self.spec.key
+        pending: dict[tuple, dict[str, object]] = {}
+        processed = skipped = 0
+        for record in records:
+            key = tuple(record[f] for f in key_fields)
+            if None in key:
+                skipped += 1
+                continue
+            record["import_id"] = import_job.id
+            pending[key] = record
+            processed += 1
+            if len(pending) >= self.INSERT_CHUNK_ROWS:
+                self._upsert(list(pending.values()))
+                pending.clear()
+        if pending:
+            self._upsert(list(pending.values()))
+        return HerdKpiImportSummary(rows_processed=processed, rows_skipped=skipped)
+
+    def _upsert(self, records: list[dict[str, object]]) -> None:
+        t = self.spec.model.__table__
+        stmt = dialect_insert(self.session, t)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[t.c[f] for f in self.spec.key],
+            set_={
+                **{
+                    c.field: func.coalesce(stmt.excluded[c.field], t.c[c.field])
+                    for c in self.spec.columns
+                    if c.field not in self.spec.key
+                },
+                "import_id": stmt.excluded.import_id,
+            },
+        )
+        self.session.execute(stmt, records)
@@ -0,0 +1,194 @@
+"""Shared `ImportJob` lifecycle for file import services."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from yem_sistem.db.instrumentation import QueryScope, current_query_scope, query_scope
+from yem_sistem.imports.models import ImportJob, ImportStatus
+
+logger = logging.getLogger(__name__)
+
+
+class ImportJobService:
+    """Hash-deduplicated, resumable import jobs for one ``SOURCE_NAME``.
+
+    Subclasses set ``SOURCE_NAME``, ``JOB_LABEL`` (used in the permission
+    message), ``ALLOWED_EXTENSIONS`` and ``ERROR`` (the ValueError subclass
+    raised for rejected uploads).
+    """
+
+    SOURCE_NAME: str
+    JOB_LABEL: str = "files"
+    ALLOWED_EXTENSIONS: tuple[str, ...] = (".xls", ".xlsx")
+    ERROR: type[ValueError] = ValueError
+    STALE_JOB_AFTER = timedelta(minutes=15)
+    HEARTBEAT_EVERY = timedelta(seconds=30)
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    def create_job(
+        self,
+        file_name: str,
+        file_hash: str,
+        actor_role: str,
+        *,
+        chunk_size: int | None = None,
+    ) -> ImportJob:
+        """Validate an upload and commit its `ImportJob` in PENDING.
+
+        A FAILED job, or a RUNNING one whose heartbeat stopped, for the same
+        file hash is reset so the next run resumes from its checkpoint. The
+        reset is a guarded UPDATE, so of two concurrent uploads only one gets
+        the job; a PENDING job is never handed out twice.
+        """
+        if actor_role.upper() != "ADMIN":
+            raise PermissionError(f"Only ADMIN can import {self.JOB_LABEL}.")
+        if not file_name.lower().endswith(self.ALLOWED_EXTENSIONS):
+            raise self.ERROR(f"Only {'/'.join(self.ALLOWED_EXTENSIONS)} files are allowed")
+        if chunk_size is not None and chunk_size < 1:
+            raise self.ERROR("chunk_size must be at least 1")
+
+        import_job = self.session.scalars(
+            select(ImportJob).where(ImportJob.source_name == self.SOURCE_NAME, ImportJob.file_hash == file_hash)
+        ).first()
+        if import_job is None:
+            import_job = ImportJob(
+                source_name=self.SOURCE_NAME,
+                file_name=file_name,
+                file_hash=file_hash,
+                status=ImportStatus.PENDING,
+                rows_done=0,
+                batches_done=0,
+                movements_done=0,
+                suspicious_batches_done=0,
+                db_statements=0,
+                db_seconds=0.0,
+            )
+            self.session.add(import_job)
+            self.session.commit()
+            return import_job
+
+        if import_job.status == ImportStatus.SUCCESS:
+            raise self.ERROR("This file is already imported (hash duplicate).")
+        stale_before = datetime.now(timezone.utc) - self.STALE_JOB_AFTER
+        reset = self.session.execute(
+            update(ImportJob)
+            .where(
+                ImportJob.id == import_job.id,
+                or_(
+                    ImportJob.status == ImportStatus.FAILED,
+                    and_(ImportJob.status == ImportStatus.RUNNING, ImportJob.updated_at < stale_before),
+                ),
+            )
+            .values(status=ImportStatus.PENDING, message=None, started_at=None, finished_at=None)
+            .returning(ImportJob.id)
+            .execution_options(synchronize_session="fetch")
+        ).first()
+        self.session.commit()
+        if reset is None:
+            raise self.ERROR("This file is already queued or being imported.")
+        return import_job
+
+    def fail_job(self, job_id: int, message: str) -> None:
+        """Mark a job FAILED in its own commit; a later upload of the same file resumes it."""
+        failed = self.session.get(ImportJob, job_id)
+        failed.status = ImportStatus.FAILED
+        failed.message = message
+        failed.finished_at = datetime.now(timezone.utc)
+        self._record_query_cost(failed)
+        self.session.commit()
+
+    @contextmanager
+    def job_scope(self) -> Iterator[QueryScope]:
+        """Charge the SQL of a job run to ``import:<SOURCE_NAME>``; `_finish_job`/`fail_job` store it on the job."""
+        with query_scope(f"import:{self.SOURCE_NAME}") as scope:
+            yield scope
+
+    def _record_query_cost(self, import_job: ImportJob) -> None:
+        scope = current_query_scope()
+        if scope is None or scope.label != f"import:{self.SOURCE_NAME}":
+            return
+        # totals accumulate over resumed runs of the same job
+        import_job.db_statements = (import_job.db_statements or 0) + scope.statements
+        import_job.db_seconds = (import_job.db_seconds or 0.0) + scope.db_seconds
+
+    def _get_job(self, job_id: int) -> ImportJob:
+        import_job = self.session.get(ImportJob, job_id)
+        if import_job is None:
+            raise self.ERROR(f"Import job {job_id} not found")
+        return import_job
+
+    def _start_job(self, job_id: int) -> ImportJob:
+        """Claim a PENDING or FAILED job for this run by moving it to RUNNING.
+
+        The claim is a single conditional UPDATE, so when two workers pick up
+        the same job only one of them runs it; the other gets ``ERROR``
+        without touching the job.
+        """
+        claimed = self.session.execute(
+            update(ImportJob)
+            .where(ImportJob.id == job_id, ImportJob.status.in_((ImportStatus.PENDING, ImportStatus.FAILED)))
+            .values(status=ImportStatus.RUNNING, started_at=datetime.now(timezone.utc))
+            .returning(ImportJob.id)
+            .execution_options(synchronize_session="fetch")
+        ).first()
+        self.session.commit()
+        import_job = self._get_job(job_id)
+        if claimed is None:
+            raise self.ERROR(f"Import job {job_id} is already {import_job.status.value.lower()}")
+        return import_job
+
+    @contextmanager
+    def _heartbeat(self, job_id: int) -> Iterator[None]:
+        """Touch the RUNNING job's ``updated_at`` every ``HEARTBEAT_EVERY`` while the body runs.
+
+        Beats commit on their own connection, independent of the data
+        transaction, so a long single-transaction import does not look dead
+        to `create_job`. A shared single-connection pool (``StaticPool``) has
+        no second connection to beat on and is skipped.
+        """
+        engine = self.session.get_bind()
+        if isinstance(engine.pool, StaticPool):
+            yield
+            return
+        beat = (
+            update(ImportJob)
+            .where(ImportJob.id == job_id, ImportJob.status == ImportStatus.RUNNING)
+            .values(updated_at=func.now())
+        )
+        stopped = threading.Event()
+
+        def run() -> None:
+            while not stopped.wait(self.HEARTBEAT_EVERY.total_seconds()):
+                try:
+                    with engine.begin() as connection:
+                        connection.execute(beat)
+                except SQLAlchemyError:
+                    # a missed beat is harmless as long as the next ones land before STALE_JOB_AFTER
+                    logger.warning("Heartbeat of import job %s failed", job_id, exc_info=True)
+
+        thread = threading.Thread(target=run, name=f"import-heartbeat-{job_id}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stopped.set()
+            thread.join()
+
+    def _finish_job(self, import_job: ImportJob, message: str) -> None:
+        import_job.status = ImportStatus.SUCCESS
+        import_job.message = message
+        import_job.finished_at = datetime.now(timezone.utc)
+        self._record_query_cost(import_job)
+        self.session.commit()
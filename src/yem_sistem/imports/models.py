@@ -5,7 +5,7 @@ from __future__ import annotations
 import enum
 from datetime import datetime
 
-from sqlalchemy import DateTime, Enum, String, Text, UniqueConstraint, func
+from sqlalchemy import DateTime, Enum, Float, Integer, String, Text, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from yem_sistem.db.base import Base
@@ -13,6 +13,7 @@ from yem_sistem.db.base import Base
 
 class ImportStatus(str, enum.Enum):
     PENDING = "PENDING"
+    RUNNING = "RUNNING"
     SUCCESS = "SUCCESS"
     FAILED = "FAILED"
 
@@ -31,4 +32,16 @@ class ImportJob(Base):
     file_hash: Mapped[str] = mapped_column(String(64), nullable=False)
     status: Mapped[ImportStatus] = mapped_column(Enum(ImportStatus, name="import_status"), nullable=False, default=ImportStatus.PENDING)
     message: Mapped[str | None] = mapped_column(Text, nullable=True)
+    rows_done: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    batches_done: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    movements_done: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    suspicious_batches_done: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_batch_key: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    db_statements: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    db_seconds: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
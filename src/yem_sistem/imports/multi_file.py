@@ -0,0 +1,222 @@
+"""Parallel parsing and ordered writing of many DTM exports."""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import pickle
+import tempfile
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, time
+from decimal import Decimal
+from itertools import islice
+from pathlib import Path
+
+from sqlalchemy.orm import Session
+
+from yem_sistem.db.session import SessionLocal
+from yem_sistem.imports.dtm_batch_import import DtmBatchImportService, DtmImportError, DtmImportSummary, LoadRow
+from yem_sistem.imports.uploads import UPLOAD_DIR, StagedUpload, stage_path
+
+DTM_SUFFIXES = (".xlsx", ".xls")
+SPILL_CHUNK_ROWS = 10_000
+
+
+@dataclass(slots=True)
+class QueuedDtmFile:
+    job_id: int
+    file_name: str
+    path: Path
+
+
+@dataclass(slots=True)
+class ParsedDtmFile:
+    """Picklable header of one file parsed in a worker process.
+
+    The rows themselves are spilled to ``rows_path`` (see `iter_spilled_rows`),
+    so the parent only holds what it needs to order the files.
+    """
+
+    job_id: int
+    file_name: str
+    rows_path: Path | None
+    first_at: datetime | None
+    last_at: datetime | None = None
+    error: str | None = None
+
+
+@dataclass(slots=True)
+class DtmFileResult:
+    file_name: str
+    job_id: int | None
+    status: str
+    message: str | None = None
+    summary: DtmImportSummary | None = None
+
+
+def parse_dtm_file(queued: QueuedDtmFile) -> ParsedDtmFile:
+    """Parse and check one export; runs in a worker process so it must stay module-level.
+
+    Rows are pickled to a spill file in ``SPILL_CHUNK_ROWS`` chunks as they
+    are parsed, so neither the worker nor the parent holds a whole file.
+    """
+    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".rows")
+    spill = Path(name)
+    try:
+        first_at: datetime | None = None
+        last_at: datetime | None = None
+        rows = DtmBatchImportService._parse_load_sheet(queued.file_name, queued.path)
+        with os.fdopen(fd, "wb") as out:
+            while chunk := list(islice(rows, SPILL_CHUNK_ROWS)):
+                for r in chunk:
+                    if r.loaded is None or r.loaded < Decimal("0.000"):
+                        raise DtmImportError("Loaded value cannot be null or negative")
+                    started = datetime.combine(r.date, r.start_time or time(0, 0))
+                    if first_at is None or started < first_at:
+                        first_at = started
+                    if last_at is None or started > last_at:
+                        last_at = started
+                pickle.dump(chunk, out, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as exc:
+        spill.unlink(missing_ok=True)
+        return ParsedDtmFile(job_id=queued.job_id, file_name=queued.file_name, rows_path=None, first_at=None, error=str(exc))
+    return ParsedDtmFile(
+        job_id=queued.job_id, file_name=queued.file_name, rows_path=spill, first_at=first_at, last_at=last_at
+    )
+
+
+def iter_spilled_rows(path: Path) -> Iterator[LoadRow]:
+    """Read back the rows `parse_dtm_file` spilled, one chunk in memory at a time."""
+    with path.open("rb") as fh:
+        while True:
+            try:
+                chunk = pickle.load(fh)
+            except EOFError:
+                return
+            yield from chunk
+
+
+def order_parsed_files(parsed: list[ParsedDtmFile]) -> list[ParsedDtmFile]:
+    """Sort files by earliest batch start and fail those that start inside an earlier file's range.
+
+    Each file is written whole as its own job, so two exports whose batch
+    ranges overlap cannot be applied in chronological order; the later one
+    gets an error instead, which stops the run at that file.
+    """
+    ordered = sorted(parsed, key=lambda f: (f.first_at is None, f.first_at or datetime.min, f.file_name))
+    covering: ParsedDtmFile | None = None
+    for current in ordered:
+        if current.error is not None or current.first_at is None:
+            continue
+        if covering is not None and current.first_at < covering.last_at:
+            current.error = (
+                f"Batches from {current.first_at:%Y-%m-%d %H:%M} to {current.last_at:%Y-%m-%d %H:%M} overlap "
+                f"{covering.file_name} ({covering.first_at:%Y-%m-%d %H:%M} to {covering.last_at:%Y-%m-%d %H:%M}); "
+                "overlapping exports cannot be imported in chronological order"
+            )
+            continue
+        if covering is None or current.last_at > covering.last_at:
+            covering = current
+    return ordered
+
+
+def collect_dtm_paths(paths: Iterable[Path]) -> list[Path]:
+    """Expand directories into the DTM exports they contain, sorted by name."""
+    found: list[Path] = []
+    for path in paths:
+        if path.is_dir():
+            found.extend(sorted(p for p in path.iterdir() if p.is_file() and p.suffix.lower() in DTM_SUFFIXES))
+        else:
+            found.append(path)
+    return found
+
+
+class MultiFileDtmImporter:
+    """Imports many DTM exports: parsing fans out to processes, writing stays serial.
+
+    Files are written one after another in order of their earliest batch
+    start, so the negative-stock checks in `StockService` see the ledger in
+    chronological order; a file whose batches overlap an earlier file's fails
+    (see `order_parsed_files`). The first failing file stops the run; the
+    remaining jobs are marked FAILED so they resume when uploaded again.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, *, max_workers: int | None = None) -> None:
+        self.session_factory = session_factory
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def import_paths(
+        self,
+        paths: Iterable[Path],
+        actor_role: str,
+        *,
+        chunk_size: int | None = None,
+    ) -> list[DtmFileResult]:
+        staged = [stage_path(p) for p in collect_dtm_paths(paths)]
+        queued, results = self.create_jobs(staged, actor_role, chunk_size=chunk_size)
+        return results + self.run_jobs(queued, chunk_size=chunk_size)
+
+    def create_jobs(
+        self,
+        files: list[StagedUpload],
+        actor_role: str,
+        *,
+        chunk_size: int | None = None,
+    ) -> tuple[list[QueuedDtmFile], list[DtmFileResult]]:
+        """Create a PENDING job per staged file; duplicates are reported, not queued."""
+        queued: list[QueuedDtmFile] = []
+        results: list[DtmFileResult] = []
+        with self.session_factory() as session:
+            service = DtmBatchImportService(session)
+            for staged in files:
+                try:
+                    job = service.create_job(staged.file_name, staged.file_hash, actor_role, chunk_size=chunk_size)
+                except DtmImportError as exc:
+                    results.append(DtmFileResult(file_name=staged.file_name, job_id=None, status="REJECTED", message=str(exc)))
+                    continue
+                queued.append(QueuedDtmFile(job_id=job.id, file_name=staged.file_name, path=staged.path))
+        return queued, results
+
+    def run_jobs(self, queued: list[QueuedDtmFile], *, chunk_size: int | None = None) -> list[DtmFileResult]:
+        if not queued:
+            return []
+        workers = min(self.max_workers, len(queued))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            parsed = order_parsed_files(list(pool.map(parse_dtm_file, queued)))
+
+        try:
+            return self._write_in_order(parsed, chunk_size)
+        finally:
+            for current in parsed:
+                if current.rows_path is not None:
+                    current.rows_path.unlink(missing_ok=True)
+
+    def _write_in_order(self, parsed: list[ParsedDtmFile], chunk_size: int | None) -> list[DtmFileResult]:
+        results: list[DtmFileResult] = []
+        with self.session_factory() as session:
+            service = DtmBatchImportService(session)
+            for position, current in enumerate(parsed):
+                if current.error is not None:
+                    service.fail_job(current.job_id, current.error)
+                    failure = current.error
+                else:
+                    try:
+                        summary = service.run_job_rows(
+                            current.job_id, iter_spilled_rows(current.rows_path), chunk_size=chunk_size
+                        )
+                    except Exception as exc:
+                        failure = str(exc)
+                    else:
+                        results.append(DtmFileResult(file_name=current.file_name, job_id=current.job_id, status="SUCCESS", summary=summary))
+                        continue
+
+                results.append(DtmFileResult(file_name=current.file_name, job_id=current.job_id, status="FAILED", message=failure))
+                for skipped in parsed[position + 1 :]:
+                    message = f"Skipped because {current.file_name} failed"
+                    service.fail_job(skipped.job_id, message)
+                    results.append(DtmFileResult(file_name=skipped.file_name, job_id=skipped.job_id, status="SKIPPED", message=message))
+                break
+        return results
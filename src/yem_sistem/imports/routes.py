@@ -2,30 +2,182 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, File, Header, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
+from yem_sistem.acceptance.service import AcceptanceAuthorizationError
 from yem_sistem.db.session import get_session
 from yem_sistem.imports.dtm_batch_import import DtmBatchImportService, DtmImportError
+from yem_sistem.imports.herd_kpi_import import KPI_SHEETS, HerdKpiImportError, HerdKpiImportService
+from yem_sistem.imports.models import ImportJob
+from yem_sistem.imports.multi_file import DtmFileResult, MultiFileDtmImporter, QueuedDtmFile
+from yem_sistem.imports.uploads import StagedUpload, stage_upload
+from yem_sistem.imports.weighbridge_import import WeighbridgeImportError, WeighbridgeImportService
+from yem_sistem.imports.worker import import_workers
 
 router = APIRouter(tags=["imports"])
 
 
-@router.post("/imports/dtm/batch")
+def _enqueue_dtm_upload(session: Session, staged: StagedUpload, actor_role: str, chunk_size: int | None) -> ImportJob:
+    try:
+        job = DtmBatchImportService(session).create_job(
+            staged.file_name, staged.file_hash, actor_role, chunk_size=chunk_size
+        )
+    except Exception:
+        staged.path.unlink(missing_ok=True)
+        raise
+    import_workers.submit_dtm_import(job.id, staged.path, chunk_size)
+    return job
+
+
+@router.post("/imports/dtm/batch", status_code=202)
 async def import_dtm_batch(
     file: UploadFile = File(...),
+    chunk_size: int | None = Query(default=None, ge=1),
     x_role: str = Header(default="", alias="X-Role"),
     session: Session = Depends(get_session),
-) -> dict:
-    service = DtmBatchImportService(session)
+) -> JSONResponse:
+    staged = await run_in_threadpool(stage_upload, file.file, file.filename or "")
     try:
-        summary = service.import_file(file_name=file.filename or "", content=await file.read(), actor_role=x_role)
-        return {
-            "rows_processed": summary.rows_processed,
-            "movements_created": summary.movements_created,
-            "suspicious_batches_count": summary.suspicious_batches_count,
-        }
+        job = await run_in_threadpool(_enqueue_dtm_upload, session, staged, x_role, chunk_size)
     except PermissionError as exc:
         raise HTTPException(status_code=403, detail=str(exc)) from exc
     except DtmImportError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job.id, "status": job.status.value, "status_url": f"/imports/{job.id}"},
+    )
+
+
+def _enqueue_dtm_uploads(
+    session_factory, staged: list[StagedUpload], actor_role: str, chunk_size: int | None
+) -> tuple[list[QueuedDtmFile], list[DtmFileResult]]:
+    importer = MultiFileDtmImporter(session_factory)
+    try:
+        queued, rejected = importer.create_jobs(staged, actor_role, chunk_size=chunk_size)
+    except Exception:
+        for item in staged:
+            item.path.unlink(missing_ok=True)
+        raise
+    queued_paths = {item.path for item in queued}
+    for item in staged:
+        if item.path not in queued_paths:
+            item.path.unlink(missing_ok=True)
+    if queued:
+        import_workers.submit_dtm_files(queued, chunk_size)
+    return queued, rejected
+
+
+@router.post("/imports/dtm/batches", status_code=202)
+async def import_dtm_batches(
+    files: list[UploadFile] = File(...),
+    chunk_size: int | None = Query(default=None, ge=1),
+    x_role: str = Header(default="", alias="X-Role"),
+) -> JSONResponse:
+    staged = [await run_in_threadpool(stage_upload, f.file, f.filename or "") for f in files]
+    try:
+        queued, rejected = await run_in_threadpool(
+            _enqueue_dtm_uploads, import_workers.session_factory, staged, x_role, chunk_size
+        )
+    except PermissionError as exc:
+        raise HTTPException(status_code=403, detail=str(exc)) from exc
+    return JSONResponse(
+        status_code=202,
+        content={
+            "jobs": [{"job_id": q.job_id, "file_name": q.file_name, "status_url": f"/imports/{q.job_id}"} for q in queued],
+            "rejected": [{"file_name": r.file_name, "message": r.message} for r in rejected],
+        },
+    )
+
+
+def _enqueue_herd_kpi_upload(session: Session, kind: str, staged: StagedUpload, actor_role: str) -> ImportJob:
+    try:
+        job = HerdKpiImportService.for_kind(session, kind).create_job(staged.file_name, staged.file_hash, actor_role)
+    except Exception:
+        staged.path.unlink(missing_ok=True)
+        raise
+    import_workers.submit_herd_kpi_import(kind, job.id, staged.path)
+    return job
+
+
+@router.post("/imports/herd/{kind}", status_code=202)
+async def import_herd_kpis(
+    kind: str,
+    file: UploadFile = File(...),
+    x_role: str = Header(default="", alias="X-Role"),
+    session: Session = Depends(get_session),
+) -> JSONResponse:
+    if kind not in KPI_SHEETS:
+        raise HTTPException(status_code=404, detail=f"Unknown herd KPI export {kind!r}")
+    staged = await run_in_threadpool(stage_upload, file.file, file.filename or "")
+    try:
+        job = await run_in_threadpool(_enqueue_herd_kpi_upload, session, kind, staged, x_role)
+    except PermissionError as exc:
+        raise HTTPException(status_code=403, detail=str(exc)) from exc
+    except HerdKpiImportError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job.id, "status": job.status.value, "status_url": f"/imports/{job.id}"},
+    )
+
+
+@router.post("/imports/acceptance")
+async def import_acceptance(
+    file: UploadFile = File(...),
+    x_role: str = Header(default="", alias="X-Role"),
+    session: Session = Depends(get_session),
+) -> dict:
+    """Weighbridge export -> acceptances, synchronously; every row gets an accepted/duplicate/rejected result."""
+    staged = await run_in_threadpool(stage_upload, file.file, file.filename or "")
+    try:
+        summary = await run_in_threadpool(
+            WeighbridgeImportService(session).import_file, staged.file_name, staged.path, x_role
+        )
+    except AcceptanceAuthorizationError as exc:
+        raise HTTPException(status_code=403, detail=str(exc)) from exc
+    except WeighbridgeImportError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    finally:
+        staged.path.unlink(missing_ok=True)
+    return {
+        "accepted": summary.accepted,
+        "duplicates": summary.duplicates,
+        "rejected": summary.rejected,
+        "rows": [
+            {"line": r.line, "status": r.status, "message": r.message, "acceptance_id": r.acceptance_id}
+            for r in summary.results
+        ],
+    }
+
+
+@router.get("/imports/{job_id}")
+def import_job_status(job_id: int, session: Session = Depends(get_session)) -> dict:
+    job = session.get(ImportJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+
+    duration_seconds = None
+    if job.started_at is not None and job.finished_at is not None:
+        duration_seconds = (job.finished_at - job.started_at).total_seconds()
+    return {
+        "job_id": job.id,
+        "source_name": job.source_name,
+        "file_name": job.file_name,
+        "status": job.status.value,
+        "message": job.message,
+        "rows_done": job.rows_done,
+        "batches_done": job.batches_done,
+        "movements_done": job.movements_done,
+        "suspicious_batches_done": job.suspicious_batches_done,
+        "last_batch_key": job.last_batch_key,
+        "db_statements": job.db_statements,
+        "db_seconds": job.db_seconds,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "duration_seconds": duration_seconds,
+    }
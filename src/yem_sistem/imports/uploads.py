@@ -0,0 +1,49 @@
+"""Staging of uploaded import files on disk."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+UPLOAD_DIR = Path(os.getenv("IMPORT_UPLOAD_DIR", str(Path(tempfile.gettempdir()) / "yem_sistem_uploads")))
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass(slots=True)
+class StagedUpload:
+    file_name: str
+    path: Path
+    file_hash: str
+
+
+def stage_upload(fileobj: BinaryIO, file_name: str) -> StagedUpload:
+    """Copy an upload to `UPLOAD_DIR` in fixed-size chunks, hashing it on the way.
+
+    Only one chunk is held in memory, and the SHA-256 is ready for the
+    duplicate check before anything parses the workbook.
+    """
+    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    fd, name = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=Path(file_name).suffix.lower())
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := fileobj.read(COPY_CHUNK_SIZE):
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        Path(name).unlink(missing_ok=True)
+        raise
+    return StagedUpload(file_name=file_name, path=Path(name), file_hash=digest.hexdigest())
+
+
+def stage_path(path: Path) -> StagedUpload:
+    """Hash a file that is already on disk (CLI imports) without copying it."""
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        while chunk := fh.read(COPY_CHUNK_SIZE):
+            digest.update(chunk)
+    return StagedUpload(file_name=path.name, path=path, file_hash=digest.hexdigest())
@@ -0,0 +1,347 @@
+"""Bulk goods-in import from the weighbridge's daily export.
+
+The weighbridge writes one row per truck (date and time, plate, material
+code, net weight, optionally company and note) to Excel or CSV. The file is
+turned into acceptances in one transaction with a fixed number of statements:
+materials are resolved by code through the material index, acceptances are
+inserted in bulk with ``ON CONFLICT DO NOTHING`` on `uq_acceptance_duplicate`,
+and IN movements and audit entries are written for the rows that went in.
+Every row gets its own outcome, so a re-sent file, or one racing another
+upload of the same trucks, reports duplicates instead of failing.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timezone
+from decimal import Decimal, InvalidOperation
+from itertools import chain, islice
+from pathlib import Path
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from yem_sistem.acceptance.models import Acceptance
+from yem_sistem.acceptance.service import AcceptanceAuthorizationError, AcceptanceService
+from yem_sistem.audit_logs.models import AuditLog
+from yem_sistem.db.upsert import dialect_insert
+from yem_sistem.imports.decoders import is_blank_row, to_decimal, to_opt_str, to_time
+from yem_sistem.imports.headers import HeaderResolver, fold_header
+from yem_sistem.materials.index import material_index
+from yem_sistem.stock_movements.models import MovementReason, MovementType
+from yem_sistem.stock_movements.service import StockService
+from yem_sistem.stock_movements.version import mark_ledger_changed
+
+ACCEPTED = "accepted"
+DUPLICATE = "duplicate"
+REJECTED = "rejected"
+
+WEIGHBRIDGE_FIELDS: dict[str, tuple[str, ...]] = {
+    "date": ("Date",),
+    "time": ("Time",),
+    "plate": ("Plate",),
+    "company": ("Company",),
+    "material_code": ("Material Code",),
+    "quantity": ("Net Weight",),
+    "note": ("Note",),
+}
+REQUIRED_FIELDS = ("date", "plate", "material_code", "quantity")
+DATETIME_FORMATS = ("%d.%m.%Y %H:%M:%S", "%d.%m.%Y %H:%M", "%d.%m.%Y", "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y")
+HEADER_SCAN_ROWS = 10
+QUANTITY_STEP = Decimal("0.001")
+TEXT_LIMITS = {"plate": 30, "company": 150, "note": 500}
+
+
+class WeighbridgeImportError(ValueError):
+    """The file cannot be read as a weighbridge export."""
+
+
+@dataclass(slots=True)
+class WeighbridgeRowResult:
+    line: int
+    status: str
+    message: str | None = None
+    acceptance_id: int | None = None
+
+
+@dataclass(slots=True)
+class WeighbridgeImportSummary:
+    accepted: int
+    duplicates: int
+    rejected: int
+    results: list[WeighbridgeRowResult] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class _Truck:
+    line: int
+    accepted_at: datetime
+    plate: str
+    material_id: int
+    quantity: Decimal
+    company: str | None
+    note: str | None
+
+    @property
+    def key(self) -> tuple[datetime, str, int, Decimal]:
+        return self.accepted_at, self.plate, self.material_id, self.quantity
+
+
+def _compile_extractor(positions: Mapping[str, int]):
+    plan = [(name, positions.get(name)) for name in WEIGHBRIDGE_FIELDS]
+
+    def extract(row: Sequence[object]) -> dict[str, object]:
+        width = len(row)
+        return {name: row[index] if index is not None and index < width else None for name, index in plan}
+
+    return extract
+
+
+_resolver = HeaderResolver(WEIGHBRIDGE_FIELDS, _compile_extractor)
+
+
+def parse_accepted_at(day: object, at: object = None) -> datetime:
+    """Combine the date cell (datetime, date or text) with an optional time cell; naive values are UTC."""
+    if isinstance(day, datetime):
+        value = day
+    elif isinstance(day, date):
+        value = datetime.combine(day, time(0, 0))
+    else:
+        text = str(day).strip()
+        try:
+            value = datetime.fromisoformat(text)
+        except ValueError:
+            for fmt in DATETIME_FORMATS:
+                try:
+                    value = datetime.strptime(text, fmt)
+                    break
+                except ValueError:
+                    pass
+            else:
+                raise ValueError(f"invalid date {text!r}") from None
+    if to_opt_str(at) is not None:
+        clock = to_time(at)
+        if clock is None:
+            raise ValueError(f"invalid time {at!r}")
+        value = datetime.combine(value.date(), clock, tzinfo=value.tzinfo)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite hands timestamps back naive
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+class WeighbridgeImportService:
+    ALLOWED_EXTENSIONS = (".xlsx", ".csv")
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+        self.stock_service = StockService(session)
+
+    def import_file(self, file_name: str, content: bytes | Path, actor_role: str) -> WeighbridgeImportSummary:
+        """Parse and write a weighbridge export in one transaction; see `import_records`."""
+        role = self._check_role(actor_role)
+        if not file_name.lower().endswith(self.ALLOWED_EXTENSIONS):
+            raise WeighbridgeImportError(f"Only {'/'.join(self.ALLOWED_EXTENSIONS)} files are allowed")
+        return self._import(self._parse(file_name, content), role)
+
+    def import_records(self, records: Iterable[tuple[int, Mapping[str, object]]], actor_role: str) -> WeighbridgeImportSummary:
+        """Write ``(line, record)`` pairs whose keys are the `WEIGHBRIDGE_FIELDS` names."""
+        return self._import(records, self._check_role(actor_role))
+
+    @staticmethod
+    def _check_role(actor_role: str) -> str:
+        role = (actor_role or "").upper()
+        if role not in AcceptanceService.ALLOWED_CREATE_ROLES:
+            raise AcceptanceAuthorizationError("Only ACCEPTANCE and ADMIN can create acceptance.")
+        return role
+
+    def _import(self, records: Iterable[tuple[int, Mapping[str, object]]], role: str) -> WeighbridgeImportSummary:
+        results: list[WeighbridgeRowResult] = []
+        trucks: list[_Truck] = []
+        seen: dict[tuple, int] = {}
+        for line, record in records:
+            try:
+                truck = self._decode(line, record)
+            except ValueError as exc:
+                results.append(WeighbridgeRowResult(line, REJECTED, str(exc)))
+                continue
+            first = seen.setdefault(truck.key, line)
+            if first != line:
+                results.append(WeighbridgeRowResult(line, DUPLICATE, f"same truck as line {first}"))
+                continue
+            trucks.append(truck)
+
+        if not results and not trucks:
+            raise WeighbridgeImportError("No weighbridge rows found")
+
+        inserted = self._write(trucks, role) if trucks else {}
+        for truck in trucks:
+            acceptance_id = inserted.get(self._key(truck.accepted_at, truck.plate, truck.material_id, truck.quantity))
+            if acceptance_id is None:
+                results.append(WeighbridgeRowResult(truck.line, DUPLICATE, "already accepted"))
+            else:
+                results.append(WeighbridgeRowResult(truck.line, ACCEPTED, acceptance_id=acceptance_id))
+        self.session.commit()
+
+        results.sort(key=lambda r: r.line)
+        duplicates = sum(1 for r in results if r.status == DUPLICATE)
+        return WeighbridgeImportSummary(
+            accepted=len(inserted),
+            duplicates=duplicates,
+            rejected=len(results) - len(inserted) - duplicates,
+            results=results,
+        )
+
+    def _decode(self, line: int, record: Mapping[str, object]) -> _Truck:
+        missing = [name for name in REQUIRED_FIELDS if to_opt_str(record.get(name)) is None]
+        if missing:
+            raise ValueError(f"missing {', '.join(missing)}")
+        accepted_at = parse_accepted_at(record["date"], record.get("time"))
+        code = to_opt_str(record["material_code"])
+        material_id = material_index.resolve(self.session, code, None)
+        if material_id is None:
+            raise ValueError(f"unknown material code {code!r}")
+        try:
+            quantity = to_decimal(record["quantity"]).quantize(QUANTITY_STEP)
+        except InvalidOperation:
+            raise ValueError(f"invalid net weight {record['quantity']!r}") from None
+        if quantity <= 0:
+            raise ValueError("quantity must be greater than 0")
+        truck = _Truck(
+            line=line,
+            accepted_at=accepted_at,
+            plate=to_opt_str(record["plate"]),
+            material_id=material_id,
+            quantity=quantity,
+            company=to_opt_str(record.get("company")),
+            note=to_opt_str(record.get("note")),
+        )
+        for name, limit in TEXT_LIMITS.items():
+            value = getattr(truck, name)
+            if value is not None and len(value) > limit:
+                raise ValueError(f"{name} longer than {limit} characters")
+        return truck
+
+    @staticmethod
+    def _key(accepted_at: datetime, plate: str, material_id: int, quantity: Decimal) -> tuple:
+        return _utc(accepted_at), plate, material_id, quantity
+
+    def _write(self, trucks: list[_Truck], role: str) -> dict[tuple, int]:
+        """Insert the acceptances that `uq_acceptance_duplicate` lets through; returns their ids by key.
+
+        Movements and audit entries are written only for those rows, so a
+        truck another upload stored first is left to that upload.
+        """
+        table = Acceptance.__table__
+        key_columns = [table.c.accepted_at, table.c.plate, table.c.material_id, table.c.quantity]
+        stmt = dialect_insert(self.session, table).on_conflict_do_nothing(index_elements=key_columns)
+        returned = self.session.execute(
+            stmt.returning(table.c.id, *key_columns),
+            [
+                {
+                    "accepted_at": t.accepted_at,
+                    "company": t.company,
+                    "plate": t.plate,
+                    "material_id": t.material_id,
+                    "quantity": t.quantity,
+                    "note": t.note,
+                }
+                for t in trucks
+            ],
+        ).all()
+        inserted = {self._key(*key): acceptance_id for acceptance_id, *key in returned}
+        written = [
+            (t, inserted[key])
+            for t in trucks
+            if (key := self._key(t.accepted_at, t.plate, t.material_id, t.quantity)) in inserted
+        ]
+        if not written:
+            return inserted
+        # Core inserts bypass the flush hook that versions cached pages
+        mark_ledger_changed(self.session)
+        self.stock_service.record_movement_rows(
+            [
+                {
+                    "material_id": t.material_id,
+                    "movement_type": MovementType.IN,
+                    "reason": MovementReason.MATERIAL_ACCEPTANCE,
+                    "quantity": t.quantity,
+                    "movement_at": t.accepted_at,
+                    "reference_type": "acceptance",
+                    "reference_id": acceptance_id,
+                    "note": t.note,
+                }
+                for t, acceptance_id in written
+            ]
+        )
+        self.session.execute(
+            insert(AuditLog),
+            [
+                {
+                    "entity_name": "acceptance",
+                    "entity_id": str(acceptance_id),
+                    "action": "INSERT",
+                    "actor": role,
+                    "payload": (
+                        f"accepted_at={t.accepted_at.isoformat()} plate={t.plate} "
+                        f"material_id={t.material_id} quantity={t.quantity}"
+                    ),
+                }
+                for t, acceptance_id in written
+            ],
+        )
+        return inserted
+
+    def _parse(self, file_name: str, content: bytes | Path) -> Iterator[tuple[int, dict[str, object]]]:
+        if file_name.lower().endswith(".csv"):
+            return self._records(self._csv_rows(content))
+        return self._records(self._xlsx_rows(content))
+
+    @staticmethod
+    def _records(rows: Iterator[Sequence[object]]) -> Iterator[tuple[int, dict[str, object]]]:
+        """``(line, record)`` for the data rows below the header row (1-based spreadsheet lines)."""
+        anchors = _resolver.labels_for("plate")
+        head = list(islice(rows, HEADER_SCAN_ROWS))
+        for offset, row in enumerate(head):
+            if any(v.__class__ is str and fold_header(v) in anchors for v in row):
+                break
+        else:
+            raise WeighbridgeImportError("No weighbridge header row (Plate / Plaka) found")
+        layout = _resolver.resolve(head[offset])
+        missing = [name for name in REQUIRED_FIELDS if name not in layout.positions]
+        if missing:
+            raise WeighbridgeImportError(f"Missing weighbridge columns: {', '.join(missing)}")
+        extract = _resolver.extractor(layout.positions)
+        for line, row in enumerate(chain(head[offset + 1 :], rows), start=offset + 2):
+            if not is_blank_row(row):
+                yield line, extract(row)
+
+    @staticmethod
+    def _csv_rows(content: bytes | Path) -> Iterator[list[str]]:
+        data = content.read_bytes() if isinstance(content, Path) else content
+        text = data.decode("utf-8-sig", errors="replace")
+        try:
+            dialect = csv.Sniffer().sniff(text[:4096], delimiters=";,\t")
+        except csv.Error:
+            dialect = csv.excel
+        yield from csv.reader(io.StringIO(text), dialect)
+
+    @staticmethod
+    def _xlsx_rows(content: bytes | Path) -> Iterator[tuple[object, ...]]:
+        try:
+            from openpyxl import load_workbook
+        except ModuleNotFoundError as exc:
+            raise WeighbridgeImportError("openpyxl is required for .xlsx import") from exc
+
+        wb = load_workbook(filename=content if isinstance(content, Path) else io.BytesIO(content), read_only=True, data_only=True)
+        try:
+            yield from wb.worksheets[0].iter_rows(values_only=True)
+        finally:
+            wb.close()
@@ -0,0 +1,81 @@
+"""Background execution of uploaded import jobs."""
+
+from __future__ import annotations
+
+import logging
+import os
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from sqlalchemy.orm import Session
+
+from yem_sistem.db.session import SessionLocal
+from yem_sistem.imports.dtm_batch_import import DtmBatchImportService
+from yem_sistem.imports.herd_kpi_import import HerdKpiImportService
+from yem_sistem.imports.multi_file import MultiFileDtmImporter, QueuedDtmFile
+
+logger = logging.getLogger(__name__)
+
+
+class ImportWorkerPool:
+    """Bounded thread pool that runs import jobs outside the request cycle.
+
+    Each job opens its own session, so a slow import never holds an HTTP
+    request or the event loop.
+    """
+
+    def __init__(self, max_workers: int, session_factory: Callable[[], Session] = SessionLocal) -> None:
+        self.max_workers = max_workers
+        self.session_factory = session_factory
+        self._executor: ThreadPoolExecutor | None = None
+
+    def submit(self, fn: Callable[..., object], *args: object) -> Future:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="import-worker")
+        return self._executor.submit(fn, *args)
+
+    def submit_dtm_import(self, job_id: int, path: Path, chunk_size: int | None = None) -> Future:
+        return self.submit(self._run_dtm_import, job_id, path, chunk_size)
+
+    def submit_dtm_files(self, queued: list[QueuedDtmFile], chunk_size: int | None = None) -> Future:
+        return self.submit(self._run_dtm_files, queued, chunk_size)
+
+    def submit_herd_kpi_import(self, kind: str, job_id: int, path: Path) -> Future:
+        return self.submit(self._run_herd_kpi_import, kind, job_id, path)
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def _run_dtm_import(self, job_id: int, path: Path, chunk_size: int | None) -> None:
+        try:
+            with self.session_factory() as session:
+                DtmBatchImportService(session).run_job(job_id, path, chunk_size=chunk_size)
+        except Exception:
+            # the failure is already recorded on the ImportJob row
+            logger.exception("DTM import job %s failed", job_id)
+        finally:
+            path.unlink(missing_ok=True)
+
+    def _run_herd_kpi_import(self, kind: str, job_id: int, path: Path) -> None:
+        try:
+            with self.session_factory() as session:
+                HerdKpiImportService.for_kind(session, kind).run_job(job_id, path)
+        except Exception:
+            logger.exception("Herd KPI import job %s failed", job_id)
+        finally:
+            path.unlink(missing_ok=True)
+
+    def _run_dtm_files(self, queued: list[QueuedDtmFile], chunk_size: int | None) -> None:
+        try:
+            MultiFileDtmImporter(self.session_factory).run_jobs(queued, chunk_size=chunk_size)
+        except Exception:
+            logger.exception("DTM multi-file import of %s job(s) failed", len(queued))
+        finally:
+            for item in queued:
+                item.path.unlink(missing_ok=True)
+
+
+import_workers = ImportWorkerPool(max_workers=int(os.getenv("IMPORT_WORKER_CONCURRENCY", "2")))
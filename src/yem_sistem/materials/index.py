@@ -0,0 +1,190 @@
+"""Process-wide material lookup index shared by imports and acceptance."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from itertools import chain
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from yem_sistem.materials.models import Material, MaterialAlias
+
+
+def normalize_key(value: str) -> str:
+    return value.strip().upper()
+
+
+@dataclass(slots=True)
+class _Snapshot:
+    by_code: dict[str, int]
+    by_name: dict[str, int]
+    by_alias: dict[str, int]
+    ids: frozenset[int]
+    watermark: tuple
+    local_version: int
+    checked_at: float
+
+
+class MaterialIndex:
+    """Resolves materials by normalized code, name or alias without a query per lookup.
+
+    The snapshot is rebuilt when this process commits a material change
+    (tracked by a local version counter) or, at most every
+    ``refresh_interval`` seconds, when the ``materials``/``material_aliases``
+    watermark (row counts, latest ``updated_at``/alias id) has moved because
+    another process changed them. A miss checks the watermark right away
+    (at most every ``miss_recheck_interval`` seconds), so a material created
+    elsewhere a moment ago is found instead of reported as unknown.
+    """
+
+    def __init__(self, refresh_interval: float = 30.0, miss_recheck_interval: float = 1.0) -> None:
+        self.refresh_interval = refresh_interval
+        self.miss_recheck_interval = miss_recheck_interval
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self._local_version = 0
+        self._snapshot: _Snapshot | None = None
+        self._lock = threading.Lock()
+
+    def resolve(self, session: Session, code: str | None, name: str | None) -> int | None:
+        """Material id for a code, then a name; either may also match an alias."""
+        material_id = self._lookup(self._current(session), code, name)
+        if material_id is None and (fresh := self._recheck(session)) is not None:
+            material_id = self._lookup(fresh, code, name)
+        if material_id is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return material_id
+
+    def contains(self, session: Session, material_id: int) -> bool:
+        found = material_id in self._current(session).ids
+        if not found and (fresh := self._recheck(session)) is not None:
+            found = material_id in fresh.ids
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return found
+
+    @staticmethod
+    def _lookup(snapshot: _Snapshot, code: str | None, name: str | None) -> int | None:
+        for key, primary in ((code, snapshot.by_code), (name, snapshot.by_name)):
+            if not key:
+                continue
+            normalized = normalize_key(key)
+            material_id = primary.get(normalized) or snapshot.by_alias.get(normalized)
+            if material_id is not None:
+                return material_id
+        return None
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._local_version += 1
+
+    def stats(self) -> dict[str, int | float | None]:
+        snapshot = self._snapshot
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "reloads": self.reloads,
+            "version": self._local_version,
+            "materials": len(snapshot.ids) if snapshot else 0,
+            "aliases": len(snapshot.by_alias) if snapshot else 0,
+        }
+
+    def _current(self, session: Session) -> _Snapshot:
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is not None and snapshot.local_version == self._local_version and now - snapshot.checked_at < self.refresh_interval:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.local_version == self._local_version:
+                if now - snapshot.checked_at < self.refresh_interval:
+                    return snapshot
+                if self._watermark(session) == snapshot.watermark:
+                    snapshot.checked_at = now
+                    return snapshot
+            self._snapshot = self._load(session, now)
+            self.reloads += 1
+            return self._snapshot
+
+    def _recheck(self, session: Session) -> _Snapshot | None:
+        """After a miss: a reloaded snapshot if the watermark moved, else None (the miss stands)."""
+        now = time.monotonic()
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.local_version == self._local_version:
+                if now - snapshot.checked_at < self.miss_recheck_interval:
+                    return None
+                if self._watermark(session) == snapshot.watermark:
+                    snapshot.checked_at = now
+                    return None
+            self._snapshot = self._load(session, now)
+            self.reloads += 1
+            return self._snapshot
+
+    def _load(self, session: Session, now: float) -> _Snapshot:
+        watermark = self._watermark(session)
+        by_code: dict[str, int] = {}
+        by_name: dict[str, int] = {}
+        ids: set[int] = set()
+        for material_id, code, name in session.execute(select(Material.id, Material.code, Material.name)):
+            by_code.setdefault(normalize_key(code), material_id)
+            by_name.setdefault(normalize_key(name), material_id)
+            ids.add(material_id)
+        by_alias = {
+            normalize_key(alias): material_id
+            for material_id, alias in session.execute(select(MaterialAlias.material_id, MaterialAlias.alias))
+        }
+        return _Snapshot(
+            by_code=by_code,
+            by_name=by_name,
+            by_alias=by_alias,
+            ids=frozenset(ids),
+            watermark=watermark,
+            local_version=self._local_version,
+            checked_at=now,
+        )
+
+    @staticmethod
+    def _watermark(session: Session) -> tuple:
+        return tuple(
+            session.execute(
+                select(
+                    select(func.count(Material.id)).scalar_subquery(),
+                    select(func.max(Material.updated_at)).scalar_subquery(),
+                    select(func.count(MaterialAlias.id)).scalar_subquery(),
+                    select(func.max(MaterialAlias.id)).scalar_subquery(),
+                )
+            ).one()
+        )
+
+
+material_index = MaterialIndex(refresh_interval=float(os.getenv("MATERIAL_INDEX_REFRESH_SECONDS", "30")))
+
+
+@event.listens_for(Session, "after_flush")
+def _track_material_changes(session: Session, _flush_context) -> None:
+    if any(isinstance(obj, (Material, MaterialAlias)) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info["material_index_dirty"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    if session.info.pop("material_index_dirty", False):
+        material_index.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop("material_index_dirty", None)
@@ -5,11 +5,11 @@ from __future__ import annotations
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import Boolean, DateTime, String, UniqueConstraint, func
+from sqlalchemy import Boolean, DateTime, ForeignKey, String, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from yem_sistem.db.base import Base
-from yem_sistem.db.types import QUANTITY_TYPE
+from yem_sistem.db.types import QUANTITY_TYPE, RATIO_TYPE
 
 
 class Material(Base):
@@ -23,9 +23,28 @@ class Material(Base):
     name: Mapped[str] = mapped_column(String(150), nullable=False)
     unit: Mapped[str] = mapped_column(String(20), nullable=False, default="kg")
     min_stock_level: Mapped[Decimal] = mapped_column(QUANTITY_TYPE, nullable=False, default=Decimal("0.000"))
+    dry_matter_ratio: Mapped[Decimal | None] = mapped_column(RATIO_TYPE, nullable=True)
     is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
 
     stock_movements = relationship("StockMovement", back_populates="material")
     batch_items = relationship("BatchItem", back_populates="material")
     monthly_prices = relationship("MonthlyPrice", back_populates="material")
+    aliases = relationship("MaterialAlias", back_populates="material", cascade="all, delete-orphan")
+
+
+class MaterialAlias(Base):
+    """Alternative spelling of a material used by external sources (e.g. DTM ingredient names)."""
+
+    __tablename__ = "material_aliases"
+    __table_args__ = (UniqueConstraint("alias", name="uq_material_aliases_alias"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    material_id: Mapped[int] = mapped_column(ForeignKey("materials.id", ondelete="CASCADE"), nullable=False)
+    alias: Mapped[str] = mapped_column(String(150), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    material = relationship("Material", back_populates="aliases")
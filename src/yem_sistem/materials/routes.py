@@ -0,0 +1,14 @@
+"""Material HTTP routes."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter
+
+from yem_sistem.materials.index import material_index
+
+router = APIRouter(tags=["materials"])
+
+
+@router.get("/materials/index/stats")
+def material_index_stats() -> dict:
+    return material_index.stats()
@@ -1,23 +1,36 @@
 """Model registry for metadata discovery and migrations."""
 
 from yem_sistem.acceptance.models import Acceptance
+from yem_sistem.anomalies.models import LoadStatistic
 from yem_sistem.audit_logs.models import AuditLog
 from yem_sistem.batch_items.models import BatchItem
+from yem_sistem.daily_flows.models import DailyMaterialFlow
+from yem_sistem.herd_kpis.models import GroupYield, ParlourSession, PenGroup
 from yem_sistem.imports.models import ImportJob
-from yem_sistem.materials.models import Material
+from yem_sistem.materials.models import Material, MaterialAlias
 from yem_sistem.monthly_prices.models import MonthlyPrice
 from yem_sistem.pen_daily.models import PenDaily
 from yem_sistem.production_batches.models import ProductionBatch
+from yem_sistem.stock_balances.models import StockBalance
 from yem_sistem.stock_movements.models import StockMovement
+from yem_sistem.stock_snapshots.models import StockSnapshot
 
 __all__ = [
     "Acceptance",
     "AuditLog",
     "BatchItem",
+    "DailyMaterialFlow",
+    "GroupYield",
     "ImportJob",
+    "LoadStatistic",
     "Material",
+    "MaterialAlias",
     "MonthlyPrice",
+    "ParlourSession",
     "PenDaily",
+    "PenGroup",
     "ProductionBatch",
+    "StockBalance",
     "StockMovement",
+    "StockSnapshot",
 ]
@@ -0,0 +1,236 @@
+"""Monthly stock and valuation export for accounting.
+
+One statement computes every ``material x month`` row: movements are summed
+per month by joining them to a VALUES list of month boundaries, the opening
+stock is the pre-period balance plus a running window sum, and the month's
+`MonthlyPrice` values the closing stock and the consumption. Rows are read
+with ``yield_per`` and written as they arrive, so the export size does not
+affect memory use.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import TextIO
+
+from sqlalchemy import Date, DateTime, and_, case, column, func, literal, select, type_coerce, values
+from sqlalchemy.orm import Session
+
+from yem_sistem.db.types import PRICE_TYPE, QUANTITY_TYPE
+from yem_sistem.materials.models import Material
+from yem_sistem.monthly_prices.models import MonthlyPrice
+from yem_sistem.stock_movements.models import MovementType, StockMovement
+
+EXPORT_COLUMNS = (
+    "month",
+    "material_code",
+    "material_name",
+    "opening_kg",
+    "in_kg",
+    "out_production_kg",
+    "out_correction_kg",
+    "closing_kg",
+    "unit_price",
+    "closing_value",
+    "consumption_value",
+)
+
+YIELD_PER = 1_000
+
+
+@dataclass(slots=True)
+class MonthlyAccountingRow:
+    month: str
+    material_code: str
+    material_name: str
+    opening_kg: Decimal
+    in_kg: Decimal
+    out_production_kg: Decimal
+    out_correction_kg: Decimal
+    closing_kg: Decimal
+    unit_price: Decimal | None
+    closing_value: Decimal | None
+    consumption_value: Decimal | None
+
+    def as_tuple(self) -> tuple:
+        return tuple(getattr(self, name) for name in EXPORT_COLUMNS)
+
+
+def parse_month(value: str) -> date:
+    """``YYYY-MM`` -> first day of that month."""
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except ValueError as exc:
+        raise ValueError(f"Invalid month {value!r}; expected YYYY-MM") from exc
+
+
+def _next_month(d: date) -> date:
+    return date(d.year + d.month // 12, d.month % 12 + 1, 1)
+
+
+def _month_bounds(first: date, last: date) -> list[tuple[date, date, datetime, datetime]]:
+    """``(first_day, next_first_day, start, end)`` for every month from ``first`` to ``last``."""
+    bounds = []
+    month = first
+    while month <= last:
+        following = _next_month(month)
+        bounds.append(
+            (
+                month,
+                following,
+                datetime.combine(month, datetime.min.time(), tzinfo=timezone.utc),
+                datetime.combine(following, datetime.min.time(), tzinfo=timezone.utc),
+            )
+        )
+        month = following
+    return bounds
+
+
+class MonthlyAccountingExport:
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    def statement(self, first_month: date, last_month: date):
+        """Set-based ``material x month`` aggregation for ``first_month..last_month`` (inclusive)."""
+        if last_month < first_month:
+            raise ValueError("last month must not be before the first month")
+        bounds = _month_bounds(first_month, last_month)
+        period_start, period_end = bounds[0][2], bounds[-1][3]
+
+        months = (
+            values(
+                column("first_day", Date),
+                column("next_first_day", Date),
+                column("starts_at", DateTime(timezone=True)),
+                column("ends_at", DateTime(timezone=True)),
+                name="months",
+            )
+            .data(bounds)
+            .cte("months")
+        )
+        sm = StockMovement
+
+        def type_sum(*types: MovementType):
+            return type_coerce(func.sum(case((sm.movement_type.in_(types), sm.quantity), else_=0)), QUANTITY_TYPE)
+
+        monthly = (
+            select(
+                sm.material_id,
+                months.c.first_day,
+                type_sum(MovementType.IN).label("in_kg"),
+                type_sum(MovementType.OUT_PRODUCTION).label("out_production_kg"),
+                type_sum(MovementType.OUT_CORRECTION).label("out_correction_kg"),
+            )
+            .join(months, and_(sm.movement_at >= months.c.starts_at, sm.movement_at < months.c.ends_at))
+            .group_by(sm.material_id, months.c.first_day)
+            .cte("monthly")
+        )
+        signed = case(
+            (sm.movement_type == MovementType.IN, sm.quantity),
+            (sm.movement_type.in_((MovementType.OUT_PRODUCTION, MovementType.OUT_CORRECTION)), -sm.quantity),
+            else_=0,
+        )
+        opening = (
+            select(sm.material_id, type_coerce(func.sum(signed), QUANTITY_TYPE).label("quantity"))
+            .where(sm.movement_at < period_start)
+            .group_by(sm.material_id)
+            .cte("opening")
+        )
+        materials = (
+            select(Material.id, Material.code, Material.name)
+            .where(Material.id.in_(select(sm.material_id).where(sm.movement_at < period_end).distinct()))
+            .cte("exported_materials")
+        )
+
+        zero = literal(Decimal("0.000"), QUANTITY_TYPE)
+        in_kg = func.coalesce(monthly.c.in_kg, zero)
+        out_production_kg = func.coalesce(monthly.c.out_production_kg, zero)
+        out_correction_kg = func.coalesce(monthly.c.out_correction_kg, zero)
+        net = in_kg - out_production_kg - out_correction_kg
+        running = func.sum(net).over(partition_by=materials.c.id, order_by=months.c.first_day)
+        opening_kg = type_coerce(func.coalesce(opening.c.quantity, zero) + running - net, QUANTITY_TYPE)
+        closing_kg = type_coerce(func.coalesce(opening.c.quantity, zero) + running, QUANTITY_TYPE)
+
+        return (
+            select(
+                months.c.first_day,
+                materials.c.code,
+                materials.c.name,
+                opening_kg.label("opening_kg"),
+                type_coerce(in_kg, QUANTITY_TYPE).label("in_kg"),
+                type_coerce(out_production_kg, QUANTITY_TYPE).label("out_production_kg"),
+                type_coerce(out_correction_kg, QUANTITY_TYPE).label("out_correction_kg"),
+                closing_kg.label("closing_kg"),
+                type_coerce(MonthlyPrice.unit_price, PRICE_TYPE).label("unit_price"),
+            )
+            .select_from(materials)
+            .join(months, literal(True))
+            .outerjoin(monthly, and_(monthly.c.material_id == materials.c.id, monthly.c.first_day == months.c.first_day))
+            .outerjoin(opening, opening.c.material_id == materials.c.id)
+            .outerjoin(
+                MonthlyPrice,
+                and_(
+                    MonthlyPrice.material_id == materials.c.id,
+                    MonthlyPrice.price_month >= months.c.first_day,
+                    MonthlyPrice.price_month < months.c.next_first_day,
+                ),
+            )
+            .order_by(materials.c.code, months.c.first_day)
+        )
+
+    def iter_rows(self, first_month: date, last_month: date) -> Iterator[MonthlyAccountingRow]:
+        result = self.session.execute(
+            self.statement(first_month, last_month), execution_options={"yield_per": YIELD_PER}
+        )
+        for first_day, code, name, opening_kg, in_kg, out_production_kg, out_correction_kg, closing_kg, unit_price in result:
+            yield MonthlyAccountingRow(
+                month=_month_label(first_day),
+                material_code=code,
+                material_name=name,
+                opening_kg=opening_kg,
+                in_kg=in_kg,
+                out_production_kg=out_production_kg,
+                out_correction_kg=out_correction_kg,
+                closing_kg=closing_kg,
+                unit_price=unit_price,
+                closing_value=None if unit_price is None else (closing_kg * unit_price).quantize(Decimal("0.01")),
+                consumption_value=None if unit_price is None else (out_production_kg * unit_price).quantize(Decimal("0.01")),
+            )
+
+    def iter_csv(self, first_month: date, last_month: date) -> Iterator[str]:
+        """CSV text in chunks of ``YIELD_PER`` rows, header first."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        for index, row in enumerate(self.iter_rows(first_month, last_month), start=1):
+            writer.writerow(row.as_tuple())
+            if index % YIELD_PER == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    def write_csv(self, first_month: date, last_month: date, fh: TextIO) -> None:
+        for chunk in self.iter_csv(first_month, last_month):
+            fh.write(chunk)
+
+    def write_xlsx(self, first_month: date, last_month: date, path: Path) -> None:
+        from openpyxl import Workbook
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Aylık Stok")
+        ws.append(EXPORT_COLUMNS)
+        for row in self.iter_rows(first_month, last_month):
+            ws.append(row.as_tuple())
+        wb.save(path)
+
+
+def _month_label(value: date | str) -> str:
+    # SQLite hands VALUES dates back as text
+    return value[:7] if isinstance(value, str) else value.strftime("%Y-%m")
@@ -0,0 +1,76 @@
+"""Monthly accounting export routes."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from collections.abc import Iterator
+from datetime import date
+from pathlib import Path
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+
+from yem_sistem.db.session import SessionLocal
+from yem_sistem.monthly_prices.export import MonthlyAccountingExport, parse_month
+
+router = APIRouter(tags=["exports"])
+
+MAX_RANGE_MONTHS = 120
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _month_range(start: str, end: str) -> tuple[date, date]:
+    try:
+        first, last = parse_month(start), parse_month(end)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    months = (last.year - first.year) * 12 + last.month - first.month + 1
+    if not 1 <= months <= MAX_RANGE_MONTHS:
+        raise HTTPException(status_code=400, detail=f"Month range must be 1..{MAX_RANGE_MONTHS} months")
+    return first, last
+
+
+def _csv_stream(first: date, last: date) -> Iterator[str]:
+    # the response outlives request dependencies, so the stream owns its session
+    with SessionLocal() as session:
+        yield from MonthlyAccountingExport(session).iter_csv(first, last)
+
+
+def _write_xlsx(first: date, last: date) -> Path:
+    fd, name = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    path = Path(name)
+    try:
+        with SessionLocal() as session:
+            MonthlyAccountingExport(session).write_xlsx(first, last, path)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return path
+
+
+@router.get("/exports/monthly-accounting")
+async def monthly_accounting_export(
+    start: str = Query(..., description="First month, YYYY-MM"),
+    end: str = Query(..., description="Last month, YYYY-MM"),
+    format: str = Query(default="csv", pattern="^(csv|xlsx)$"),
+):
+    """Opening/closing stock, movements and valuation per material and month."""
+    first, last = _month_range(start, end)
+    file_name = f"monthly-accounting-{start}-{end}.{format}"
+    if format == "csv":
+        return StreamingResponse(
+            _csv_stream(first, last),
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": f'attachment; filename="{file_name}"'},
+        )
+    path = await run_in_threadpool(_write_xlsx, first, last)
+    return FileResponse(
+        path,
+        media_type=XLSX_MEDIA_TYPE,
+        filename=file_name,
+        background=BackgroundTask(path.unlink, missing_ok=True),
+    )
@@ -3,6 +3,8 @@
 from yem_sistem.production_batches.models import BatchStatus, ProductionBatch
 from yem_sistem.production_batches.service import (
     BatchFixAuthorizationError,
+    BatchFixEntry,
+    BatchFixSummary,
     BatchFixValidationError,
     ProductionBatchService,
 )
@@ -11,6 +13,8 @@ __all__ = [
     "BatchStatus",
     "ProductionBatch",
     "BatchFixAuthorizationError",
+    "BatchFixEntry",
+    "BatchFixSummary",
     "BatchFixValidationError",
     "ProductionBatchService",
 ]
@@ -5,7 +5,7 @@ from __future__ import annotations
 import enum
 from datetime import date, datetime, time
 
-from sqlalchemy import Date, DateTime, Enum, Integer, String, Text, Time, func
+from sqlalchemy import Date, DateTime, Enum, Index, Integer, String, Text, Time, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from yem_sistem.db.base import Base
@@ -23,6 +23,11 @@ class ProductionBatch(Base):
     """Represents a DTM production event."""
 
     __tablename__ = "production_batches"
+    __table_args__ = (
+        # keyset pagination: newest first, optionally per status
+        Index("ix_production_batches_date_id", "date", "id"),
+        Index("ix_production_batches_status_date_id", "status", "date", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     id_batch: Mapped[str] = mapped_column(String(80), nullable=False)
@@ -37,5 +42,8 @@ class ProductionBatch(Base):
     suspicious_count_zero: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     suspicious_reason: Mapped[str | None] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
 
     items = relationship("BatchItem", back_populates="production_batch", cascade="all, delete-orphan")
@@ -2,122 +2,202 @@
 
 from __future__ import annotations
 
+from datetime import date
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, Form, Header, HTTPException
+from fastapi import APIRouter, Depends, Form, Header, HTTPException, Query, Request
 from fastapi.responses import HTMLResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from yem_sistem.db.session import get_session
+from yem_sistem.db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorError
+from yem_sistem.db.session import get_async_session, get_session
+from yem_sistem.production_batches.models import BatchStatus, ProductionBatch
 from yem_sistem.production_batches.service import (
     BatchFixAuthorizationError,
+    BatchFixEntry,
     BatchFixValidationError,
     ProductionBatchService,
 )
+from yem_sistem.web.streaming import stream_csv, stream_template
+from yem_sistem.web.templating import templates
 
 router = APIRouter(tags=["batches"])
 
+BULK_FIX_PAGE_ITEMS = 500
+HISTORY_COLUMNS = (
+    "id",
+    "id_batch",
+    "batch_name",
+    "date",
+    "start_time",
+    "end_time",
+    "feeder",
+    "recipe_id",
+    "recipe_name",
+    "status",
+    "suspicious_count_zero",
+    "suspicious_reason",
+)
+
 
 def _require_admin(x_role: str) -> None:
     if (x_role or "").upper() != "ADMIN":
         raise HTTPException(status_code=403, detail="Only ADMIN can access this endpoint")
 
 
-@router.get("/batches/suspicious", response_class=HTMLResponse)
-def suspicious_batches_page(
+def _batch_json(batch: ProductionBatch) -> dict:
+    return {
+        "id": batch.id,
+        "id_batch": batch.id_batch,
+        "batch_name": batch.batch_name,
+        "date": batch.date.isoformat(),
+        "start_time": batch.start_time.isoformat() if batch.start_time else None,
+        "recipe_id": batch.recipe_id,
+        "recipe_name": batch.recipe_name,
+        "status": batch.status.value,
+        "suspicious_count_zero": batch.suspicious_count_zero,
+        "suspicious_reason": batch.suspicious_reason,
+    }
+
+
+@router.get("/batches")
+async def list_batches(
+    status: BatchStatus | None = Query(default=None),
+    start: date | None = Query(default=None),
+    end: date | None = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None),
     x_role: str = Header(default="", alias="X-Role"),
-    session: Session = Depends(get_session),
-) -> str:
+    session: AsyncSession = Depends(get_async_session),
+) -> dict:
+    """Production batches newest first; pass ``next_cursor`` back as ``cursor`` for the following page."""
     _require_admin(x_role)
-    service = ProductionBatchService(session)
-    batches = service.list_suspicious_batches(limit=100)
+    try:
+        page = await session.run_sync(
+            lambda s: ProductionBatchService(s).list_page(status=status, start=start, end=end, limit=limit, cursor=cursor)
+        )
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {"items": [_batch_json(b) for b in page.items], "next_cursor": page.next_cursor}
+
+
+@router.get("/batches/history")
+async def batch_history(
+    request: Request,
+    status: BatchStatus | None = Query(default=None),
+    start: date | None = Query(default=None),
+    end: date | None = Query(default=None),
+    format: str = Query(default="html", pattern="^(html|csv)$"),
+    x_role: str = Header(default="", alias="X-Role"),
+):
+    """Every (filtered) batch newest first, streamed as an HTML table or a CSV download."""
+    _require_admin(x_role)
+
+    def rows(session: Session):
+        return ProductionBatchService(session).iter_history(status=status, start=start, end=end)
+
+    if format == "csv":
+        return stream_csv("batch-history.csv", HISTORY_COLUMNS, rows)
+    context = {
+        "request": request,
+        "page_title": "Batch History",
+        "csv_url": str(request.url.include_query_params(format="csv")),
+    }
+    return stream_template("batch_history.html", context, rows)
+
+
+@router.get("/batches/suspicious", response_class=HTMLResponse)
+async def suspicious_batches_page(
+    request: Request,
+    cursor: str | None = Query(default=None),
+    x_role: str = Header(default="", alias="X-Role"),
+    session: AsyncSession = Depends(get_async_session),
+) -> HTMLResponse:
+    page = await list_batches(
+        status=BatchStatus.SUSPICIOUS, start=None, end=None, limit=100, cursor=cursor, x_role=x_role, session=session
+    )
+    next_url = None
+    if page["next_cursor"]:
+        next_url = str(request.url.include_query_params(cursor=page["next_cursor"]))
+    return templates.TemplateResponse(
+        "suspicious_batches.html",
+        {
+            "request": request,
+            "page_title": "Suspicious Batches",
+            "batches": page["items"],
+            "next_url": next_url,
+            "first_url": None if cursor is None else str(request.url.remove_query_params("cursor")),
+        },
+    )
+
 
-    rows = "".join(
-        f"<tr><td>{b.id}</td><td>{b.id_batch}</td><td>{b.batch_name}</td><td>{b.date}</td><td>{b.suspicious_count_zero}</td>"
-        f"<td>{b.suspicious_reason or ''}</td><td><a class='btn btn-sm btn-primary' href='/batches/{b.id}/fix'>Fix</a></td></tr>"
-        for b in batches
+@router.get("/batches/fix-items", response_class=HTMLResponse)
+async def bulk_fix_page(
+    request: Request,
+    x_role: str = Header(default="", alias="X-Role"),
+    session: AsyncSession = Depends(get_async_session),
+) -> HTMLResponse:
+    _require_admin(x_role)
+    rows = await session.run_sync(lambda s: ProductionBatchService(s).list_unfixed_zero_items(limit=BULK_FIX_PAGE_ITEMS))
+    return templates.TemplateResponse(
+        "batch_bulk_fix.html",
+        {"request": request, "page_title": "Bulk Fix", "rows": rows, "limit": BULK_FIX_PAGE_ITEMS},
     )
 
-    return f"""
-<!doctype html>
-<html lang='en'>
-<head>
-  <meta charset='utf-8'>
-  <meta name='viewport' content='width=device-width, initial-scale=1'>
-  <title>Suspicious Batches</title>
-  <link href='https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css' rel='stylesheet'>
-</head>
-<body class='bg-light'>
-<div class='container py-4'>
-  <h1 class='mb-3'>Suspicious Batches</h1>
-  <div class='table-responsive card shadow-sm'>
-    <table class='table table-striped mb-0'>
-      <thead><tr><th>ID</th><th>ID Batch</th><th>Batch</th><th>Date</th><th>Zero Count</th><th>Reason</th><th></th></tr></thead>
-      <tbody>{rows}</tbody>
-    </table>
-  </div>
-</div>
-</body>
-</html>
-"""
+
+@router.post("/batches/fix-items")
+def fix_batch_items(
+    batch_item_id: list[int] = Form(...),
+    corrected_weight: list[str] = Form(...),
+    correction_note: list[str] = Form(default=[]),
+    default_note: str = Form(default=""),
+    x_role: str = Header(default="", alias="X-Role"),
+    session: Session = Depends(get_session),
+) -> dict:
+    """Fix many zero-loaded items at once; rows with an empty weight are skipped, empty notes take ``default_note``."""
+    if len(corrected_weight) != len(batch_item_id) or len(correction_note) not in (0, len(batch_item_id)):
+        raise HTTPException(status_code=400, detail="batch_item_id, corrected_weight and correction_note must align")
+    notes = correction_note or [""] * len(batch_item_id)
+    try:
+        entries = [
+            BatchFixEntry(item_id, Decimal(weight), note.strip() or default_note)
+            for item_id, weight, note in zip(batch_item_id, corrected_weight, notes)
+            if weight.strip()
+        ]
+    except ArithmeticError as exc:
+        raise HTTPException(status_code=400, detail="corrected_weight must be a number") from exc
+    try:
+        summary = ProductionBatchService(session).fix_items(entries, actor_role=x_role)
+    except BatchFixAuthorizationError as exc:
+        raise HTTPException(status_code=403, detail=str(exc)) from exc
+    except BatchFixValidationError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {
+        "status": "fixed",
+        "items_fixed": summary.items_fixed,
+        "batches_touched": summary.batches_touched,
+        "batches_fixed": summary.batches_fixed,
+    }
 
 
 @router.get("/batches/{batch_id}/fix", response_class=HTMLResponse)
-def fix_batch_page(
+async def fix_batch_page(
+    request: Request,
     batch_id: int,
     x_role: str = Header(default="", alias="X-Role"),
-    session: Session = Depends(get_session),
-) -> str:
+    session: AsyncSession = Depends(get_async_session),
+) -> HTMLResponse:
     _require_admin(x_role)
-    service = ProductionBatchService(session)
     try:
-        batch, items = service.get_zero_loaded_items(batch_id)
+        batch, items = await session.run_sync(lambda s: ProductionBatchService(s).get_zero_loaded_items(batch_id))
     except BatchFixValidationError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
-
-    item_rows = "".join(
-        f"<tr><td>{i.id}</td><td>{i.material_id}</td><td>{i.target_weight}</td><td>{i.loaded_weight}</td><td>{i.corrected_weight or ''}</td><td>{i.correction_note or ''}</td></tr>"
-        for i in items
+    return templates.TemplateResponse(
+        "batch_fix.html",
+        {"request": request, "page_title": f"Fix Batch #{batch.id}", "batch": batch, "items": items},
     )
 
-    return f"""
-<!doctype html>
-<html lang='en'>
-<head>
-  <meta charset='utf-8'>
-  <meta name='viewport' content='width=device-width, initial-scale=1'>
-  <title>Fix Batch #{batch.id}</title>
-  <link href='https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css' rel='stylesheet'>
-</head>
-<body class='bg-light'>
-<div class='container py-4'>
-  <h1 class='mb-1'>Fix Batch #{batch.id} ({batch.id_batch})</h1>
-  <p class='text-muted'>Only zero-loaded items are shown.</p>
-
-  <div class='card shadow-sm mb-4'>
-    <div class='card-body'>
-      <form method='post' action='/batches/{batch.id}/fix-item'>
-        <div class='row g-3'>
-          <div class='col-md-3'><label class='form-label'>Batch Item ID</label><input name='batch_item_id' type='number' class='form-control' required></div>
-          <div class='col-md-3'><label class='form-label'>Corrected Weight</label><input name='corrected_weight' type='number' step='0.001' class='form-control' required></div>
-          <div class='col-md-6'><label class='form-label'>Correction Note (min 15)</label><input name='correction_note' class='form-control' required></div>
-        </div>
-        <button type='submit' class='btn btn-primary mt-3'>Fix Item</button>
-      </form>
-    </div>
-  </div>
-
-  <div class='table-responsive card shadow-sm'>
-    <table class='table table-striped mb-0'>
-      <thead><tr><th>Item ID</th><th>Material ID</th><th>Target</th><th>Loaded</th><th>Corrected</th><th>Note</th></tr></thead>
-      <tbody>{item_rows}</tbody>
-    </table>
-  </div>
-</div>
-</body>
-</html>
-"""
-
 
 @router.post("/batches/{batch_id}/fix-item")
 def fix_batch_item(
@@ -2,16 +2,34 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
 from decimal import Decimal
 
-from sqlalchemy import select
+from sqlalchemy import Row, bindparam, insert, select, update
 from sqlalchemy.orm import Session
 
 from yem_sistem.audit_logs.models import AuditLog
 from yem_sistem.batch_items.models import BatchItem
+from yem_sistem.db.pagination import DEFAULT_PAGE_SIZE, Page, keyset_page
 from yem_sistem.production_batches.models import BatchStatus, ProductionBatch
-from yem_sistem.stock_movements.models import MovementReason, MovementType, StockMovement
+from yem_sistem.stock_movements.models import MovementReason, MovementType
 from yem_sistem.stock_movements.service import NegativeStockError, StockService
+from yem_sistem.stock_movements.version import mark_ledger_changed
+
+YIELD_PER = 1_000
+
+
+def _batch_filters(status: BatchStatus | None, start: date | None, end: date | None) -> list:
+    conditions = []
+    if status is not None:
+        conditions.append(ProductionBatch.status == status)
+    if start is not None:
+        conditions.append(ProductionBatch.date >= start)
+    if end is not None:
+        conditions.append(ProductionBatch.date <= end)
+    return conditions
 
 
 class BatchFixValidationError(ValueError):
@@ -22,6 +40,21 @@ class BatchFixAuthorizationError(PermissionError):
     """Raised when actor role is not allowed to fix suspicious batches."""
 
 
+@dataclass(slots=True)
+class BatchFixEntry:
+    batch_item_id: int
+    corrected_weight: Decimal
+    correction_note: str
+    batch_id: int | None = None
+
+
+@dataclass(slots=True)
+class BatchFixSummary:
+    items_fixed: int
+    batches_touched: int
+    batches_fixed: int
+
+
 class ProductionBatchService:
     """Application service for suspicious batch listing and correction."""
 
@@ -30,13 +63,49 @@ class ProductionBatchService:
         self.stock_service = StockService(session)
 
     def list_suspicious_batches(self, limit: int = 100) -> list[ProductionBatch]:
+        return self.list_page(status=BatchStatus.SUSPICIOUS, limit=limit).items
+
+    def list_page(
+        self,
+        *,
+        status: BatchStatus | None = None,
+        start: date | None = None,
+        end: date | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+    ) -> Page[ProductionBatch]:
+        """Batches newest first by ``(date, id)``; ``start``/``end`` are inclusive."""
+        stmt = select(ProductionBatch).where(*_batch_filters(status, start, end))
+        return keyset_page(self.session, stmt, (ProductionBatch.date, ProductionBatch.id), limit=limit, cursor=cursor)
+
+    def iter_history(
+        self,
+        *,
+        status: BatchStatus | None = None,
+        start: date | None = None,
+        end: date | None = None,
+    ) -> Iterator[Row]:
+        """Every matching batch newest first, as plain rows read ``YIELD_PER`` at a time from a server-side cursor."""
+        pb = ProductionBatch
         stmt = (
-            select(ProductionBatch)
-            .where(ProductionBatch.status == BatchStatus.SUSPICIOUS)
-            .order_by(ProductionBatch.date.desc(), ProductionBatch.id.desc())
-            .limit(limit)
+            select(
+                pb.id,
+                pb.id_batch,
+                pb.batch_name,
+                pb.date,
+                pb.start_time,
+                pb.end_time,
+                pb.feeder,
+                pb.recipe_id,
+                pb.recipe_name,
+                pb.status,
+                pb.suspicious_count_zero,
+                pb.suspicious_reason,
+            )
+            .where(*_batch_filters(status, start, end))
+            .order_by(pb.date.desc(), pb.id.desc())
         )
-        return list(self.session.scalars(stmt).all())
+        yield from self.session.execute(stmt, execution_options={"yield_per": YIELD_PER})
 
     def get_zero_loaded_items(self, batch_id: int) -> tuple[ProductionBatch, list[BatchItem]]:
         batch = self.session.get(ProductionBatch, batch_id)
@@ -50,6 +119,21 @@ class ProductionBatchService:
         items = list(self.session.scalars(items_stmt).all())
         return batch, items
 
+    def list_unfixed_zero_items(self, limit: int = 500) -> list[tuple[BatchItem, ProductionBatch]]:
+        """Zero-loaded items still awaiting a correction in suspicious batches, oldest batch first."""
+        stmt = (
+            select(BatchItem, ProductionBatch)
+            .join(ProductionBatch, ProductionBatch.id == BatchItem.production_batch_id)
+            .where(
+                ProductionBatch.status == BatchStatus.SUSPICIOUS,
+                BatchItem.is_zero_loaded.is_(True),
+                BatchItem.corrected_weight.is_(None),
+            )
+            .order_by(ProductionBatch.date, ProductionBatch.id, BatchItem.id)
+            .limit(limit)
+        )
+        return [(item, batch) for item, batch in self.session.execute(stmt)]
+
     def fix_item(
         self,
         *,
@@ -59,70 +143,145 @@ class ProductionBatchService:
         correction_note: str,
         actor_role: str,
     ) -> BatchItem:
+        self.fix_items(
+            [BatchFixEntry(batch_item_id, corrected_weight, correction_note, batch_id=batch_id)], actor_role=actor_role
+        )
+        return self.session.get(BatchItem, batch_item_id)
+
+    def fix_items(self, entries: list[BatchFixEntry], *, actor_role: str) -> BatchFixSummary:
+        """Correct many zero-loaded items, across batches, in one transaction.
+
+        The items are locked while they are validated, so an item is corrected
+        at most once. Every entry is validated before anything is written; the
+        OUT_CORRECTION movements are checked against one locked balance read
+        per material and inserted in bulk with their audit rows, and batches
+        left without unfixed zero-loaded items are marked FIXED by a single UPDATE.
+        """
         role = (actor_role or "").upper()
         if role != "ADMIN":
             raise BatchFixAuthorizationError("Only ADMIN can fix suspicious batches.")
+        if not entries:
+            raise BatchFixValidationError("No items to fix")
 
-        note = (correction_note or "").strip()
-        if len(note) < 15:
-            raise BatchFixValidationError("correction_note is required and must be at least 15 characters")
-        if corrected_weight <= Decimal("0.000"):
-            raise BatchFixValidationError("corrected_weight must be greater than 0")
+        errors: list[str] = []
+        seen: set[int] = set()
+        for entry in entries:
+            entry.correction_note = (entry.correction_note or "").strip()
+            if entry.batch_item_id in seen:
+                errors.append(f"item {entry.batch_item_id}: listed more than once")
+            seen.add(entry.batch_item_id)
+            if len(entry.correction_note) < 15:
+                errors.append(f"item {entry.batch_item_id}: correction_note is required and must be at least 15 characters")
+            if entry.corrected_weight <= Decimal("0.000"):
+                errors.append(f"item {entry.batch_item_id}: corrected_weight must be greater than 0")
 
-        batch = self.session.get(ProductionBatch, batch_id)
-        if batch is None:
-            raise BatchFixValidationError("Batch not found")
+        items = {
+            item_id: (batch_id, material_id, is_zero_loaded, corrected_weight, created_at)
+            for item_id, batch_id, material_id, is_zero_loaded, corrected_weight, created_at in self.session.execute(
+                select(
+                    BatchItem.id,
+                    BatchItem.production_batch_id,
+                    BatchItem.material_id,
+                    BatchItem.is_zero_loaded,
+                    BatchItem.corrected_weight,
+                    ProductionBatch.created_at,
+                )
+                .join(ProductionBatch, ProductionBatch.id == BatchItem.production_batch_id)
+                .where(BatchItem.id.in_(seen))
+                .order_by(BatchItem.id)
+                # a concurrent fix of the same items waits here and then sees them corrected
+                .with_for_update(of=BatchItem)
+            )
+        }
+        for entry in entries:
+            found = items.get(entry.batch_item_id)
+            if found is None or (entry.batch_id is not None and found[0] != entry.batch_id):
+                errors.append(f"item {entry.batch_item_id}: batch item not found" + (" in given batch" if entry.batch_id else ""))
+            elif not found[2]:
+                errors.append(f"item {entry.batch_item_id}: only zero-loaded items can be fixed")
+            elif found[3] is not None:
+                errors.append(f"item {entry.batch_item_id}: already corrected")
+        if errors:
+            self.session.rollback()
+            raise BatchFixValidationError("; ".join(errors))
 
-        item = self.session.get(BatchItem, batch_item_id)
-        if item is None or item.production_batch_id != batch_id:
-            raise BatchFixValidationError("Batch item not found in given batch")
-        if not item.is_zero_loaded:
-            raise BatchFixValidationError("Only zero-loaded items can be fixed")
-
-        movement = StockMovement(
-            material_id=item.material_id,
-            movement_type=MovementType.OUT_CORRECTION,
-            reason=MovementReason.ADJUSTMENT,
-            quantity=corrected_weight,
-            movement_at=batch.created_at,
-            reference_type="DTM_BATCH_FIX",
-            reference_id=batch.id,
-            note=note,
-        )
+        now = datetime.now(timezone.utc)
+        movement_rows = []
+        item_rows = []
+        audit_rows = []
+        for entry in entries:
+            batch_id, material_id, _, _, created_at = items[entry.batch_item_id]
+            movement_rows.append(
+                {
+                    "material_id": material_id,
+                    "movement_type": MovementType.OUT_CORRECTION,
+                    "reason": MovementReason.ADJUSTMENT,
+                    "quantity": entry.corrected_weight,
+                    "movement_at": created_at,
+                    "reference_type": "DTM_BATCH_FIX",
+                    "reference_id": batch_id,
+                    "note": entry.correction_note,
+                }
+            )
+            item_rows.append(
+                {
+                    "b_id": entry.batch_item_id,
+                    "corrected_weight": entry.corrected_weight,
+                    "correction_note": entry.correction_note,
+                    "corrected_by_user_id": 0,
+                    "corrected_at": now,
+                }
+            )
+            audit_rows.append(
+                {
+                    "entity_name": "batch_item_fix",
+                    "entity_id": str(entry.batch_item_id),
+                    "action": "FIX",
+                    "actor": role,
+                    "payload": (
+                        f"batch_id={batch_id} batch_item_id={entry.batch_item_id} material_id={material_id} "
+                        f"corrected_weight={entry.corrected_weight} note={entry.correction_note}"
+                    ),
+                }
+            )
 
         try:
-            self.stock_service.add_movement(movement)
+            self.stock_service.record_movement_rows(movement_rows)
         except NegativeStockError as exc:
+            self.session.rollback()
             raise BatchFixValidationError(str(exc)) from exc
 
-        item.corrected_weight = corrected_weight
-        item.correction_note = note
-        item.corrected_by_user_id = 0
-        from datetime import datetime, timezone
-
-        item.corrected_at = datetime.now(timezone.utc)
-
-        self.session.add(
-            AuditLog(
-                entity_name="batch_item_fix",
-                entity_id=str(item.id),
-                action="FIX",
-                actor=role,
-                payload=(
-                    f"batch_id={batch.id} batch_item_id={item.id} material_id={item.material_id} "
-                    f"corrected_weight={corrected_weight} note={note}"
-                ),
-            )
+        items_table = BatchItem.__table__
+        self.session.execute(
+            update(items_table)
+            .where(items_table.c.id == bindparam("b_id"))
+            .values(
+                corrected_weight=bindparam("corrected_weight"),
+                correction_note=bindparam("correction_note"),
+                corrected_by_user_id=bindparam("corrected_by_user_id"),
+                corrected_at=bindparam("corrected_at"),
+            ),
+            item_rows,
         )
+        self.session.execute(insert(AuditLog), audit_rows)
 
-        remaining_zero_unfixed_stmt = select(BatchItem.id).where(
-            BatchItem.production_batch_id == batch_id,
-            BatchItem.is_zero_loaded.is_(True),
-            BatchItem.corrected_weight.is_(None),
+        batch_ids = sorted({items[entry.batch_item_id][0] for entry in entries})
+        unfixed = (
+            select(BatchItem.id)
+            .where(
+                BatchItem.production_batch_id == ProductionBatch.id,
+                BatchItem.is_zero_loaded.is_(True),
+                BatchItem.corrected_weight.is_(None),
+            )
+            .exists()
         )
-        remaining = self.session.execute(remaining_zero_unfixed_stmt).first()
-        if remaining is None:
-            batch.status = BatchStatus.FIXED
-
+        mark_ledger_changed(self.session)
+        fixed_batches = self.session.execute(
+            update(ProductionBatch)
+            .where(ProductionBatch.id.in_(batch_ids), ~unfixed)
+            .values(status=BatchStatus.FIXED)
+            .execution_options(synchronize_session=False)
+        ).rowcount
         self.session.commit()
-        return item
+        self.session.expire_all()
+        return BatchFixSummary(items_fixed=len(entries), batches_touched=len(batch_ids), batches_fixed=fixed_batches)
@@ -0,0 +1,6 @@
+"""Materialized stock balance module."""
+
+from yem_sistem.stock_balances.models import StockBalance
+from yem_sistem.stock_balances.service import BalanceDrift, StockBalanceService
+
+__all__ = ["BalanceDrift", "StockBalance", "StockBalanceService"]
@@ -0,0 +1,24 @@
+"""Materialized per-material stock balance models."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DateTime, ForeignKey, Integer, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from yem_sistem.db.base import Base
+from yem_sistem.db.types import QUANTITY_TYPE
+
+
+class StockBalance(Base):
+    """Current stock of a material, maintained with every stock movement write."""
+
+    __tablename__ = "stock_balances"
+
+    material_id: Mapped[int] = mapped_column(ForeignKey("materials.id", ondelete="RESTRICT"), primary_key=True)
+    quantity: Mapped[Decimal] = mapped_column(QUANTITY_TYPE, nullable=False, default=Decimal("0.000"))
+    last_movement_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,166 @@
+"""Incremental maintenance and verification of the stock balance table."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import case, delete, func, insert, select, text, update
+from sqlalchemy.orm import Session
+
+from yem_sistem.db.upsert import dialect_insert
+from yem_sistem.stock_balances.models import StockBalance
+from yem_sistem.stock_movements.models import MovementType, StockMovement
+
+OUT_TYPES = (MovementType.OUT_PRODUCTION, MovementType.OUT_CORRECTION)
+
+
+@dataclass(slots=True)
+class BalanceDrift:
+    material_id: int
+    stored: Decimal | None
+    ledger: Decimal
+
+
+def signed_quantity(movement_type: MovementType, quantity: Decimal) -> Decimal:
+    """Quantity as it affects stock: IN adds, OUT types subtract, ADJUSTMENT is neutral."""
+    if movement_type == MovementType.IN:
+        return quantity
+    if movement_type in OUT_TYPES:
+        return -quantity
+    return Decimal("0.000")
+
+
+class StockBalanceService:
+    """Reads and updates `stock_balances` in the caller's transaction."""
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+        self.table = StockBalance.__table__
+
+    def get(self, material_id: int) -> Decimal:
+        result = self.session.execute(select(self.table.c.quantity).where(self.table.c.material_id == material_id)).scalar()
+        return Decimal(result) if result is not None else Decimal("0.000")
+
+    def get_many(self, material_ids: Iterable[int], *, lock: bool = False) -> dict[int, Decimal]:
+        """Balances of the given materials; ``lock`` takes row locks until the transaction ends."""
+        ids = sorted(set(material_ids))
+        if not ids:
+            return {}
+        stmt = select(self.table.c.material_id, self.table.c.quantity).where(self.table.c.material_id.in_(ids))
+        if lock:
+            stmt = stmt.with_for_update()
+        balances = {material_id: Decimal("0.000") for material_id in ids}
+        for material_id, quantity in self.session.execute(stmt):
+            balances[material_id] = Decimal(quantity)
+        return balances
+
+    def try_withdraw(self, material_id: int, quantity: Decimal, movement_at: datetime) -> Decimal | None:
+        """Atomically subtract ``quantity`` if enough stock exists; returns the new balance or None."""
+        t = self.table
+        stmt = (
+            update(t)
+            .where(t.c.material_id == material_id, t.c.quantity >= quantity)
+            .values(
+                quantity=t.c.quantity - quantity,
+                last_movement_at=self._latest(t.c.last_movement_at, movement_at),
+                version=t.c.version + 1,
+                updated_at=func.now(),
+            )
+            .returning(t.c.quantity)
+        )
+        result = self.session.execute(stmt).scalar()
+        return Decimal(result) if result is not None else None
+
+    def apply(self, deltas: dict[int, tuple[Decimal, datetime]]) -> None:
+        """Add signed quantity totals per material, creating missing balance rows."""
+        if not deltas:
+            return
+        t = self.table
+        stmt = dialect_insert(self.session, t)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[t.c.material_id],
+            set_={
+                "quantity": t.c.quantity + stmt.excluded.quantity,
+                "last_movement_at": self._latest(t.c.last_movement_at, stmt.excluded.last_movement_at),
+                "version": t.c.version + 1,
+                "updated_at": func.now(),
+            },
+        )
+        self.session.execute(
+            stmt,
+            [
+                {"material_id": material_id, "quantity": delta, "last_movement_at": movement_at, "version": 1}
+                for material_id, (delta, movement_at) in sorted(deltas.items())
+            ],
+        )
+
+    def apply_movements(self, entries: Iterable[tuple[int, MovementType, Decimal, datetime]]) -> None:
+        """Fold ``(material_id, movement_type, quantity, movement_at)`` entries into `apply`."""
+        deltas: dict[int, tuple[Decimal, datetime]] = {}
+        for material_id, movement_type, quantity, movement_at in entries:
+            delta, latest = deltas.get(material_id, (Decimal("0.000"), movement_at))
+            deltas[material_id] = (delta + signed_quantity(movement_type, quantity), max(latest, movement_at))
+        self.apply(deltas)
+
+    def ledger_balances(self) -> dict[int, tuple[Decimal, datetime | None]]:
+        """Recompute every material balance from the full `stock_movements` history."""
+        incoming = case((StockMovement.movement_type == MovementType.IN, StockMovement.quantity), else_=Decimal("0.000"))
+        outgoing = case((StockMovement.movement_type.in_(OUT_TYPES), StockMovement.quantity), else_=Decimal("0.000"))
+        stmt = select(
+            StockMovement.material_id,
+            func.coalesce(func.sum(incoming), Decimal("0.000")) - func.coalesce(func.sum(outgoing), Decimal("0.000")),
+            func.max(StockMovement.movement_at),
+        ).group_by(StockMovement.material_id)
+        return {material_id: (Decimal(balance), last_at) for material_id, balance, last_at in self.session.execute(stmt)}
+
+    def verify(self) -> list[BalanceDrift]:
+        """Compare stored balances with the ledger and return every mismatch."""
+        return self._drift(self.ledger_balances())
+
+    def rebuild(self) -> list[BalanceDrift]:
+        """Replace the table contents with ledger totals; returns the drift that was corrected.
+
+        On PostgreSQL the table is locked in EXCLUSIVE mode first, so no
+        movement can change a balance between reading the ledger and writing
+        it back; reads still go through.
+        """
+        if self.session.get_bind().dialect.name == "postgresql":
+            self.session.execute(text(f"LOCK TABLE {self.table.name} IN EXCLUSIVE MODE"))
+        ledger = self.ledger_balances()
+        drift = self._drift(ledger)
+        self.session.execute(delete(self.table))
+        if ledger:
+            self.session.execute(
+                insert(self.table),
+                [
+                    {"material_id": material_id, "quantity": balance, "last_movement_at": last_at, "version": 1}
+                    for material_id, (balance, last_at) in sorted(ledger.items())
+                ],
+            )
+        return drift
+
+    def _drift(self, ledger: dict[int, tuple[Decimal, datetime | None]]) -> list[BalanceDrift]:
+        stored = {
+            material_id: Decimal(quantity)
+            for material_id, quantity in self.session.execute(select(self.table.c.material_id, self.table.c.quantity))
+        }
+        drift: list[BalanceDrift] = []
+        for material_id in sorted(ledger.keys() | stored.keys()):
+            expected = ledger.get(material_id, (Decimal("0.000"), None))[0]
+            actual = stored.get(material_id)
+            if actual is None and expected == Decimal("0.000"):
+                continue
+            if actual != expected:
+                drift.append(BalanceDrift(material_id=material_id, stored=actual, ledger=expected))
+        return drift
+
+    @staticmethod
+    def _latest(current, candidate):
+        return case(
+            (current.is_(None), candidate),
+            (candidate > current, candidate),
+            else_=current,
+        )
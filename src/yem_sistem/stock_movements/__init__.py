@@ -1,7 +1,7 @@
 """Stock movement domain module."""
 
 from yem_sistem.stock_movements.models import MovementReason, MovementType, StockMovement
-from yem_sistem.stock_movements.service import NegativeStockError, StockService
+from yem_sistem.stock_movements.service import NegativeStockError, StockService, StockShortfall
 
 __all__ = [
     "MovementReason",
@@ -9,4 +9,5 @@ __all__ = [
     "StockMovement",
     "NegativeStockError",
     "StockService",
+    "StockShortfall",
 ]
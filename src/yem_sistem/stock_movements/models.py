@@ -37,6 +37,8 @@ class StockMovement(Base):
     __table_args__ = (
         CheckConstraint("quantity > 0", name="ck_stock_movements_quantity_positive"),
         Index("ix_stock_movements_material_movement_at", "material_id", "movement_at"),
+        # keyset pagination of the whole ledger, newest first
+        Index("ix_stock_movements_movement_at_id", "movement_at", "id"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
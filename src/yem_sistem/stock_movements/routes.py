@@ -0,0 +1,88 @@
+"""Stock movement ledger routes."""
+
+from __future__ import annotations
+
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+
+from yem_sistem.db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorError
+from yem_sistem.db.session import get_session
+from yem_sistem.stock_movements.models import MovementType, StockMovement
+from yem_sistem.stock_movements.service import StockService
+from yem_sistem.web.streaming import stream_csv, stream_template
+
+router = APIRouter(tags=["stock-movements"])
+
+LEDGER_COLUMNS = (
+    "id",
+    "movement_at",
+    "material_id",
+    "material_code",
+    "material_name",
+    "movement_type",
+    "reason",
+    "quantity",
+    "reference_type",
+    "reference_id",
+    "note",
+)
+
+
+def _movement_json(movement: StockMovement) -> dict:
+    return {
+        "id": movement.id,
+        "material_id": movement.material_id,
+        "movement_type": movement.movement_type.value,
+        "reason": movement.reason.value,
+        "quantity": str(movement.quantity),
+        "movement_at": movement.movement_at.isoformat(),
+        "reference_type": movement.reference_type,
+        "reference_id": movement.reference_id,
+        "note": movement.note,
+    }
+
+
+@router.get("/stock-movements")
+def list_stock_movements(
+    material_id: int | None = Query(default=None),
+    movement_type: MovementType | None = Query(default=None),
+    start: date | None = Query(default=None),
+    end: date | None = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None),
+    session: Session = Depends(get_session),
+) -> dict:
+    """Ledger entries newest first; pass ``next_cursor`` back as ``cursor`` for the following page."""
+    try:
+        page = StockService(session).list_movements(
+            material_id=material_id, movement_type=movement_type, start=start, end=end, limit=limit, cursor=cursor
+        )
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {"items": [_movement_json(m) for m in page.items], "next_cursor": page.next_cursor}
+
+
+@router.get("/stock-movements/ledger")
+async def movement_ledger(
+    request: Request,
+    material_id: int | None = Query(default=None),
+    movement_type: MovementType | None = Query(default=None),
+    start: date | None = Query(default=None),
+    end: date | None = Query(default=None),
+    format: str = Query(default="html", pattern="^(html|csv)$"),
+):
+    """The whole (filtered) ledger newest first, streamed as an HTML table or a CSV download."""
+
+    def rows(session: Session):
+        return StockService(session).iter_ledger(material_id=material_id, movement_type=movement_type, start=start, end=end)
+
+    if format == "csv":
+        return stream_csv("stock-movements.csv", LEDGER_COLUMNS, rows)
+    context = {
+        "request": request,
+        "page_title": "Ledger",
+        "csv_url": str(request.url.include_query_params(format="csv")),
+    }
+    return stream_template("movement_ledger.html", context, rows)
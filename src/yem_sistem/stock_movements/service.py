@@ -2,17 +2,54 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from datetime import date, datetime
 from decimal import Decimal
 
-from sqlalchemy import Select, case, func, select
+from sqlalchemy import Row, insert, select
 from sqlalchemy.orm import Session
 
+from yem_sistem.daily_flows.service import DailyFlowService
+from yem_sistem.db.pagination import DEFAULT_PAGE_SIZE, Page, keyset_page, utc_day_range
+from yem_sistem.materials.models import Material
+from yem_sistem.stock_balances.service import StockBalanceService
 from yem_sistem.stock_movements.models import MovementType, StockMovement
+from yem_sistem.stock_movements.version import mark_ledger_changed
+from yem_sistem.stock_snapshots.service import StockSnapshotService
+
+YIELD_PER = 1_000
+
+
+def _movement_filters(
+    material_id: int | None, movement_type: MovementType | None, start: date | None, end: date | None
+) -> list:
+    conditions = utc_day_range(StockMovement.movement_at, start, end)
+    if material_id is not None:
+        conditions.append(StockMovement.material_id == material_id)
+    if movement_type is not None:
+        conditions.append(StockMovement.movement_type == movement_type)
+    return conditions
+
+
+@dataclass(slots=True)
+class StockShortfall:
+    """Lowest projected balance reached by a material during a batch validation."""
+
+    material_id: int
+    current: Decimal
+    out_total: Decimal
+    projected: Decimal
+    first_negative_at: datetime
 
 
 class NegativeStockError(ValueError):
     """Raised when an OUT movement would cause stock to go below zero."""
 
+    def __init__(self, message: str, shortfalls: list[StockShortfall] | None = None) -> None:
+        super().__init__(message)
+        self.shortfalls = shortfalls or []
+
 
 class StockService:
     """Application service for stock movement operations."""
@@ -21,29 +58,160 @@ class StockService:
 
     def __init__(self, session: Session) -> None:
         self.session = session
+        self.balances = StockBalanceService(session)
+        self.snapshots = StockSnapshotService(session)
+        self.flows = DailyFlowService(session)
 
     def get_current_stock(self, material_id: int) -> Decimal:
-        """Calculate current stock from persisted IN/OUT movements."""
-        incoming = case((StockMovement.movement_type == MovementType.IN, StockMovement.quantity), else_=Decimal("0.000"))
-        outgoing = case((StockMovement.movement_type.in_(self.OUT_TYPES), StockMovement.quantity), else_=Decimal("0.000"))
+        """Read current stock from the incrementally maintained balance row."""
+        return self.balances.get(material_id)
+
+    def get_current_stocks(self, material_ids: Iterable[int], *, lock: bool = False) -> dict[int, Decimal]:
+        """Current stock of every given material with a single query."""
+        return self.balances.get_many(material_ids, lock=lock)
+
+    def get_stock_at(self, material_id: int, at: datetime) -> Decimal:
+        """Historical stock from the nearest snapshot plus the movements after it."""
+        return self.snapshots.get_stock_at(material_id, at)
 
-        stmt: Select[tuple[Decimal | None]] = select(
-            (func.coalesce(func.sum(incoming), Decimal("0.000")) - func.coalesce(func.sum(outgoing), Decimal("0.000")))
-        ).where(StockMovement.material_id == material_id)
+    def list_movements(
+        self,
+        *,
+        material_id: int | None = None,
+        movement_type: MovementType | None = None,
+        start: date | None = None,
+        end: date | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+    ) -> Page[StockMovement]:
+        """Ledger entries newest first by ``(movement_at, id)``; ``start``/``end`` are inclusive UTC days."""
+        stmt = select(StockMovement).where(*_movement_filters(material_id, movement_type, start, end))
+        return keyset_page(self.session, stmt, (StockMovement.movement_at, StockMovement.id), limit=limit, cursor=cursor)
 
-        result = self.session.execute(stmt).scalar_one()
-        return Decimal(result)
+    def iter_ledger(
+        self,
+        *,
+        material_id: int | None = None,
+        movement_type: MovementType | None = None,
+        start: date | None = None,
+        end: date | None = None,
+    ) -> Iterator[Row]:
+        """Every matching ledger entry newest first, as plain rows read ``YIELD_PER`` at a time from a server-side cursor."""
+        sm = StockMovement
+        stmt = (
+            select(
+                sm.id,
+                sm.movement_at,
+                sm.material_id,
+                Material.code.label("material_code"),
+                Material.name.label("material_name"),
+                sm.movement_type,
+                sm.reason,
+                sm.quantity,
+                sm.reference_type,
+                sm.reference_id,
+                sm.note,
+            )
+            .join(Material, Material.id == sm.material_id)
+            .where(*_movement_filters(material_id, movement_type, start, end))
+            .order_by(sm.movement_at.desc(), sm.id.desc())
+        )
+        yield from self.session.execute(stmt, execution_options={"yield_per": YIELD_PER})
 
     def add_movement(self, movement: StockMovement) -> StockMovement:
         """Persist movement after validating negative stock for OUT transactions."""
+        entries = [(movement.material_id, movement.movement_type, movement.quantity, movement.movement_at)]
         if movement.movement_type in self.OUT_TYPES:
-            current_stock = self.get_current_stock(movement.material_id)
-            projected_stock = current_stock - movement.quantity
-            if projected_stock < Decimal("0.000"):
+            projected_stock = self.balances.try_withdraw(movement.material_id, movement.quantity, movement.movement_at)
+            if projected_stock is None:
+                current_stock = self.balances.get(movement.material_id)
                 raise NegativeStockError(
                     f"Negative stock blocked for material_id={movement.material_id}: "
-                    f"current={current_stock}, out={movement.quantity}, projected={projected_stock}"
+                    f"current={current_stock}, out={movement.quantity}, projected={current_stock - movement.quantity}"
                 )
+        else:
+            self.balances.apply_movements(entries)
 
+        self._apply_derived(entries)
         self.session.add(movement)
         return movement
+
+    def add_movements(self, movements: list[StockMovement]) -> list[StockMovement]:
+        """Persist many movements after validating them together with `validate_movements`."""
+        self.validate_movements(movements)
+        entries = [(m.material_id, m.movement_type, m.quantity, m.movement_at) for m in movements]
+        self.balances.apply_movements(entries)
+        self._apply_derived(entries)
+        self.session.add_all(movements)
+        return movements
+
+    def record_movement_rows(self, rows: list[Mapping[str, object]]) -> None:
+        """Validate and bulk insert movement parameter dicts, keeping balances in step."""
+        self.validate_movement_rows(rows)
+        if not rows:
+            return
+        entries = [(r["material_id"], r["movement_type"], r["quantity"], r["movement_at"]) for r in rows]
+        self.balances.apply_movements(entries)
+        self._apply_derived(entries)
+        self.session.execute(insert(StockMovement), rows)
+
+    def _apply_derived(self, entries: list[tuple[int, MovementType, Decimal, datetime | None]]) -> None:
+        """Keep the daily flow rollup, the stock snapshots and the ledger version in step with written movements."""
+        mark_ledger_changed(self.session)
+        self.flows.apply_movements(entries)
+        self.snapshots.invalidate((material_id, movement_at) for material_id, _, _, movement_at in entries)
+
+    def validate_movements(self, movements: Iterable[StockMovement]) -> None:
+        """Validate pending movements against current stock in one pass.
+
+        Raises a single `NegativeStockError` listing every material whose
+        balance would drop below zero at any point in ``movement_at`` order.
+        """
+        self._validate_entries((m.material_id, m.movement_type, m.quantity, m.movement_at) for m in movements)
+
+    def validate_movement_rows(self, rows: Iterable[Mapping[str, object]]) -> None:
+        """Same as `validate_movements` for bulk-insert parameter dicts."""
+        self._validate_entries((r["material_id"], r["movement_type"], r["quantity"], r["movement_at"]) for r in rows)
+
+    def _validate_entries(self, entries: Iterable[tuple[int, MovementType, Decimal, datetime]]) -> None:
+        pending = sorted(entries, key=lambda e: e[3])
+        touched = {material_id for material_id, movement_type, _, _ in pending if movement_type in self.OUT_TYPES}
+        if not touched:
+            return
+
+        current = self.get_current_stocks(touched, lock=True)
+        running = dict(current)
+        out_total = {material_id: Decimal("0.000") for material_id in touched}
+        shortfalls: dict[int, StockShortfall] = {}
+        for material_id, movement_type, quantity, movement_at in pending:
+            if material_id not in touched:
+                continue
+            if movement_type == MovementType.IN:
+                running[material_id] += quantity
+                continue
+            if movement_type not in self.OUT_TYPES:
+                continue
+            running[material_id] -= quantity
+            out_total[material_id] += quantity
+            projected = running[material_id]
+            if projected < Decimal("0.000"):
+                shortfall = shortfalls.get(material_id)
+                if shortfall is None:
+                    shortfalls[material_id] = StockShortfall(
+                        material_id=material_id,
+                        current=current[material_id],
+                        out_total=out_total[material_id],
+                        projected=projected,
+                        first_negative_at=movement_at,
+                    )
+                elif projected < shortfall.projected:
+                    shortfall.projected = projected
+                    shortfall.out_total = out_total[material_id]
+
+        if shortfalls:
+            ordered = [shortfalls[material_id] for material_id in sorted(shortfalls)]
+            details = "; ".join(
+                f"material_id={s.material_id}: current={s.current}, out={s.out_total}, projected={s.projected}"
+                for s in ordered
+            )
+            raise NegativeStockError(f"Negative stock blocked for {len(ordered)} material(s): {details}", ordered)
@@ -0,0 +1,102 @@
+"""Process-wide ledger version for caching pages derived from stock data.
+
+Every stock write bumps the ``version`` of the `StockBalance` rows it touches,
+so the sum of those counters changes with every committed write from any
+process; the count, last id and last ``updated_at`` of ``production_batches``
+cover batch writes that move no stock, such as fully zero-loaded imports.
+`LedgerVersion` combines that watermark, polled at most every
+``check_interval`` seconds, with a local counter bumped as soon as this
+process commits a stock write, so callers can compare versions without a
+query on most requests.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from itertools import chain
+
+from sqlalchemy import column, event, func, literal, select, table
+from sqlalchemy.orm import Session
+
+from yem_sistem.stock_balances.models import StockBalance
+
+_DIRTY_KEY = "ledger_dirty"
+# tables shown on stock pages whose rows can change without moving stock;
+# matched by name because their packages import this one
+_TRACKED_TABLES = frozenset({"materials", "material_aliases", "production_batches"})
+_BATCHES = table("production_batches", column("id"), column("updated_at"))
+
+
+def _watermark_statement():
+    balances = select(func.count().label("balances"), func.coalesce(func.sum(StockBalance.version), 0).label("versions")).subquery()
+    batches = select(
+        func.count().label("batches"),
+        func.max(_BATCHES.c.id).label("last_batch_id"),
+        func.max(_BATCHES.c.updated_at).label("batches_updated_at"),
+    ).subquery()
+    return select(balances, batches).select_from(balances.join(batches, literal(True)))
+
+
+def mark_ledger_changed(session: Session) -> None:
+    """Flag ``session`` so its next commit bumps the ledger version."""
+    session.info[_DIRTY_KEY] = True
+
+
+class LedgerVersion:
+    def __init__(self, check_interval: float = 5.0) -> None:
+        self.check_interval = check_interval
+        self.checks = 0
+        self._local = 0
+        self._watermark: tuple | None = None
+        self._checked_at = float("-inf")
+        self._changed_at = datetime.now(timezone.utc)
+        self._lock = threading.Lock()
+
+    def current(self, session: Session) -> tuple[int, tuple | None]:
+        """``(local, watermark)`` token; equal tokens mean no stock write committed in between."""
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            watermark = tuple(session.execute(_watermark_statement()).one())
+            with self._lock:
+                self.checks += 1
+                self._checked_at = time.monotonic()
+                if watermark != self._watermark:
+                    if self._watermark is not None:
+                        self._changed_at = datetime.now(timezone.utc)
+                    self._watermark = watermark
+        return self._local, self._watermark
+
+    @property
+    def changed_at(self) -> datetime:
+        """Wall-clock time the version last changed (or this process started)."""
+        return self._changed_at
+
+    def bump(self) -> None:
+        with self._lock:
+            self._local += 1
+            self._changed_at = datetime.now(timezone.utc)
+
+    def stats(self) -> dict[str, object]:
+        return {"local": self._local, "watermark": self._watermark, "checks": self.checks}
+
+
+ledger_version = LedgerVersion(check_interval=float(os.getenv("LEDGER_VERSION_CHECK_SECONDS", "5")))
+
+
+@event.listens_for(Session, "after_flush")
+def _track_page_changes(session: Session, _flush_context) -> None:
+    if any(getattr(obj, "__tablename__", None) in _TRACKED_TABLES for obj in chain(session.new, session.dirty, session.deleted)):
+        mark_ledger_changed(session)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_after_commit(session: Session) -> None:
+    if session.info.pop(_DIRTY_KEY, False):
+        ledger_version.bump()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_DIRTY_KEY, None)
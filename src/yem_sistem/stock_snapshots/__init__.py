@@ -0,0 +1,6 @@
+"""Point-in-time stock snapshot module."""
+
+from yem_sistem.stock_snapshots.models import StockSnapshot
+from yem_sistem.stock_snapshots.service import StockSnapshotService
+
+__all__ = ["StockSnapshot", "StockSnapshotService"]
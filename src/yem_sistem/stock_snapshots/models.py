@@ -0,0 +1,23 @@
+"""Periodic per-material stock snapshot models."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DateTime, ForeignKey, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from yem_sistem.db.base import Base
+from yem_sistem.db.types import QUANTITY_TYPE
+
+
+class StockSnapshot(Base):
+    """Stock of a material from every movement before ``as_of`` (a UTC midnight closing a day it moved)."""
+
+    __tablename__ = "stock_snapshots"
+
+    material_id: Mapped[int] = mapped_column(ForeignKey("materials.id", ondelete="RESTRICT"), primary_key=True)
+    as_of: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    quantity: Mapped[Decimal] = mapped_column(QUANTITY_TYPE, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
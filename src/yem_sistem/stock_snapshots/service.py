@@ -0,0 +1,142 @@
+"""Daily closing balances for point-in-time stock lookups.
+
+`refresh` appends a snapshot for every material and UTC day with movements,
+continuing from each material's latest snapshot, so a scheduled run only reads
+the movements since the previous one. Writing a movement dated before an
+existing snapshot deletes that material's snapshots from the movement onwards;
+the next refresh rebuilds them. `get_stock_at` adds the movements after the
+nearest snapshot to its quantity, which bounds the lookup by the refresh
+cadence instead of the length of the ledger.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import bindparam, case, delete, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from yem_sistem.stock_movements.models import MovementType, StockMovement
+from yem_sistem.stock_snapshots.models import StockSnapshot
+
+OUT_TYPES = (MovementType.OUT_PRODUCTION, MovementType.OUT_CORRECTION)
+INSERT_CHUNK_ROWS = 1_000
+YIELD_PER = 5_000
+
+_signed = case(
+    (StockMovement.movement_type == MovementType.IN, StockMovement.quantity),
+    (StockMovement.movement_type.in_(OUT_TYPES), -StockMovement.quantity),
+    else_=Decimal("0.000"),
+)
+
+
+def _utc(value: datetime) -> datetime:
+    """Timestamps without a zone are taken as UTC, the way they are stored."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _day_end(day: date) -> datetime:
+    return datetime.combine(day + timedelta(days=1), time(0, 0), tzinfo=timezone.utc)
+
+
+class StockSnapshotService:
+    """Maintains and reads `stock_snapshots` in the caller's transaction."""
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+        self.table = StockSnapshot.__table__
+
+    def get_stock_at(self, material_id: int, at: datetime) -> Decimal:
+        """Stock of ``material_id`` including every movement up to and including ``at``."""
+        t = self.table
+        at = _utc(at)
+        snapshot = self.session.execute(
+            select(t.c.as_of, t.c.quantity)
+            .where(t.c.material_id == material_id, t.c.as_of <= at)
+            .order_by(t.c.as_of.desc())
+            .limit(1)
+        ).first()
+        tail = select(func.sum(_signed)).where(StockMovement.material_id == material_id, StockMovement.movement_at <= at)
+        base = Decimal("0.000")
+        if snapshot is not None:
+            tail = tail.where(StockMovement.movement_at >= snapshot.as_of)
+            base = Decimal(snapshot.quantity)
+        delta = self.session.execute(tail).scalar()
+        return base + (Decimal(delta) if delta is not None else Decimal("0.000"))
+
+    def invalidate(self, entries: Iterable[tuple[int, datetime | None]]) -> None:
+        """Drop snapshots that ``(material_id, movement_at)`` entries fall before."""
+        earliest: dict[int, datetime] = {}
+        for material_id, movement_at in entries:
+            if movement_at is None:  # stamped by the database, i.e. now
+                continue
+            movement_at = _utc(movement_at)
+            if material_id not in earliest or movement_at < earliest[material_id]:
+                earliest[material_id] = movement_at
+        if not earliest:
+            return
+        t = self.table
+        self.session.execute(
+            delete(t).where(t.c.material_id == bindparam("m_id"), t.c.as_of > bindparam("m_at")),
+            [{"m_id": material_id, "m_at": movement_at} for material_id, movement_at in sorted(earliest.items())],
+        )
+
+    def refresh(self, through: date | None = None) -> int:
+        """Snapshot every day up to ``through`` (default: yesterday, UTC) not covered yet; returns rows written."""
+        if through is None:
+            through = datetime.now(timezone.utc).date() - timedelta(days=1)
+        t = self.table
+        latest = (
+            select(t.c.material_id, func.max(t.c.as_of).label("as_of")).group_by(t.c.material_id).subquery()
+        )
+        running = {
+            material_id: Decimal(quantity)
+            for material_id, quantity in self.session.execute(
+                select(t.c.material_id, t.c.quantity).join(
+                    latest, (latest.c.material_id == t.c.material_id) & (latest.c.as_of == t.c.as_of)
+                )
+            )
+        }
+        stmt = (
+            select(StockMovement.material_id, StockMovement.movement_at, _signed)
+            .outerjoin(latest, latest.c.material_id == StockMovement.material_id)
+            .where(
+                StockMovement.movement_at < _day_end(through),
+                or_(latest.c.as_of.is_(None), StockMovement.movement_at >= latest.c.as_of),
+            )
+            .order_by(StockMovement.material_id, StockMovement.movement_at)
+        )
+
+        written = 0
+        pending: list[dict[str, object]] = []
+        current: tuple[int, date] | None = None
+
+        def close(key: tuple[int, date]) -> None:
+            pending.append({"material_id": key[0], "as_of": _day_end(key[1]), "quantity": running[key[0]]})
+
+        for material_id, movement_at, signed in self.session.execute(stmt, execution_options={"yield_per": YIELD_PER}):
+            key = (material_id, _utc(movement_at).date())
+            if key != current:
+                if current is not None:
+                    close(current)
+                current = key
+            running[material_id] = running.get(material_id, Decimal("0.000")) + Decimal(signed)
+            if len(pending) >= INSERT_CHUNK_ROWS:
+                written += self._insert(pending)
+        if current is not None:
+            close(current)
+        return written + self._insert(pending)
+
+    def rebuild(self, through: date | None = None) -> int:
+        """Recompute every snapshot from the full ledger."""
+        self.session.execute(delete(self.table))
+        return self.refresh(through)
+
+    def _insert(self, rows: list[dict[str, object]]) -> int:
+        count = len(rows)
+        if rows:
+            self.session.execute(insert(self.table), rows)
+            rows.clear()
+        return count
@@ -1,15 +1,37 @@
 """Web application entrypoint."""
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from yem_sistem.acceptance.routes import router as acceptance_router
+from yem_sistem.analytics.routes import router as analytics_router
 from yem_sistem.imports.routes import router as imports_router
+from yem_sistem.imports.worker import import_workers
+from yem_sistem.materials.routes import router as materials_router
+from yem_sistem.monthly_prices.routes import router as monthly_prices_router
 from yem_sistem.production_batches.routes import router as production_batches_router
+from yem_sistem.stock_movements.routes import router as stock_movements_router
+from yem_sistem.web.metrics import MetricsMiddleware
+from yem_sistem.web.metrics import router as metrics_router
 from yem_sistem.web.routes import router as web_router
 
-app = FastAPI(title="yem_sistem")
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    yield
+    import_workers.shutdown(wait=True)
+
+
+app = FastAPI(title="yem_sistem", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 app.include_router(acceptance_router)
+app.include_router(analytics_router)
 app.include_router(imports_router)
+app.include_router(materials_router)
+app.include_router(metrics_router)
+app.include_router(monthly_prices_router)
 app.include_router(production_batches_router)
+app.include_router(stock_movements_router)
 
 app.include_router(web_router)
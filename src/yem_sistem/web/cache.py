@@ -0,0 +1,105 @@
+"""Rendered page cache keyed on the ledger version, with HTTP validators."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Mapping
+from dataclasses import dataclass
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+
+@dataclass(slots=True)
+class CachedPage:
+    body: bytes
+    etag: str
+    last_modified: datetime
+    stored_at: float
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {
+            "ETag": self.etag,
+            "Last-Modified": format_datetime(self.last_modified, usegmt=True),
+            # browsers must revalidate, which is a cheap 304 while the ledger is unchanged
+            "Cache-Control": "no-cache",
+        }
+
+    def not_modified(self, request_headers: Mapping[str, str]) -> bool:
+        """Conditional GET check; ``If-None-Match`` takes precedence over ``If-Modified-Since``."""
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return "*" in tags or self.etag in tags
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            return self.last_modified.replace(microsecond=0) <= since
+        return False
+
+
+class PageCache:
+    """LRU of rendered pages keyed on ``(key, version)``; entries expire after ``ttl`` seconds if set."""
+
+    def __init__(self, max_entries: int = 128, ttl: float | None = None) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[Hashable, Hashable], CachedPage] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: Hashable) -> CachedPage | None:
+        with self._lock:
+            page = self._entries.get((key, version))
+            if page is not None and self.ttl is not None and time.monotonic() - page.stored_at > self.ttl:
+                del self._entries[(key, version)]
+                page = None
+            if page is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((key, version))
+            self.hits += 1
+            return page
+
+    def put(self, key: Hashable, version: Hashable, body: str, last_modified: datetime) -> CachedPage:
+        encoded = body.encode("utf-8")
+        page = CachedPage(
+            body=encoded,
+            etag=f'"{hashlib.blake2b(encoded, digest_size=16).hexdigest()}"',
+            last_modified=last_modified,
+            stored_at=time.monotonic(),
+        )
+        with self._lock:
+            self._entries[(key, version)] = page
+            self._entries.move_to_end((key, version))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return page
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int | float | None]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "entries": len(self._entries),
+        }
+
+
+_ttl = os.getenv("PAGE_CACHE_TTL_SECONDS")
+page_cache = PageCache(
+    max_entries=int(os.getenv("PAGE_CACHE_SIZE", "128")),
+    ttl=float(_ttl) if _ttl else None,
+)
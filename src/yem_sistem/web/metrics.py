@@ -0,0 +1,66 @@
+"""Request metrics middleware and the Prometheus ``/metrics`` endpoint."""
+
+from __future__ import annotations
+
+import time
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from yem_sistem.db.instrumentation import query_scope
+from yem_sistem.metrics import COUNT_BUCKETS, registry
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+http_requests = registry.counter("yem_http_requests_total", "HTTP requests served", ("method", "route", "status"))
+http_duration = registry.histogram("yem_http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+http_db_seconds = registry.histogram("yem_http_request_db_seconds", "SQL time per HTTP request", ("method", "route"))
+http_statements = registry.histogram(
+    "yem_http_request_statements", "SQL statements per HTTP request", ("method", "route"), COUNT_BUCKETS
+)
+
+router = APIRouter(tags=["metrics"])
+
+
+class MetricsMiddleware:
+    """Times every HTTP request and charges its SQL to a `QueryScope` labelled ``METHOD /route/{template}``.
+
+    A plain ASGI middleware, so streamed bodies and background tasks are
+    inside the measurement.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        with query_scope(f"{method} {scope['path']}") as queries:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                # the router records the matched route on the scope; templates keep label cardinality bounded
+                route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+                queries.label = f"{method} {route}"
+                labels = (method, route)
+                http_requests.inc((method, route, str(status)))
+                http_duration.observe(labels, time.perf_counter() - started)
+                http_db_seconds.observe(labels, queries.db_seconds)
+                http_statements.observe(labels, queries.statements)
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
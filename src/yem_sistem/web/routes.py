@@ -2,113 +2,125 @@
 
 from __future__ import annotations
 
-from datetime import date
+from collections.abc import Awaitable, Callable, Hashable
+from datetime import timedelta
 from decimal import Decimal
-from pathlib import Path
 
-from fastapi import APIRouter, Depends, Request
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import case, cast, Date, func, select
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import HTMLResponse, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from yem_sistem.db.session import get_session
+from yem_sistem.daily_flows.service import DailyFlowService, utc_today
+from yem_sistem.db.session import get_async_session, read_concurrently
 from yem_sistem.materials.models import Material
 from yem_sistem.production_batches.models import BatchStatus, ProductionBatch
-from yem_sistem.stock_movements.models import MovementType, StockMovement
+from yem_sistem.stock_balances.models import StockBalance
+from yem_sistem.stock_movements.version import ledger_version
+from yem_sistem.web.cache import page_cache
+from yem_sistem.web.templating import templates
 
 router = APIRouter(tags=["web"])
-templates = Jinja2Templates(directory=str(Path(__file__).parent / "templates"))
+
+FLOW_WINDOWS = (30, 90, 365)
 
 
 def _stock_subquery():
-    incoming = case((StockMovement.movement_type == MovementType.IN, StockMovement.quantity), else_=Decimal("0.000"))
-    outgoing = case(
-        (
-            StockMovement.movement_type.in_([MovementType.OUT_PRODUCTION, MovementType.OUT_CORRECTION]),
-            StockMovement.quantity,
-        ),
-        else_=Decimal("0.000"),
-    )
-
-    return (
-        select(
-            StockMovement.material_id.label("material_id"),
-            (func.coalesce(func.sum(incoming), Decimal("0.000")) - func.coalesce(func.sum(outgoing), Decimal("0.000"))).label(
-                "current_stock_kg"
-            ),
-            func.max(StockMovement.movement_at).label("last_movement_at"),
-        )
-        .group_by(StockMovement.material_id)
-        .subquery()
-    )
+    return select(
+        StockBalance.material_id.label("material_id"),
+        StockBalance.quantity.label("current_stock_kg"),
+        StockBalance.last_movement_at.label("last_movement_at"),
+    ).subquery()
 
 
-@router.get("/dashboard", response_class=HTMLResponse)
-def dashboard_page(request: Request, session: Session = Depends(get_session)) -> HTMLResponse:
+def _stock_rows(session: Session, *columns) -> list:
     stock_sq = _stock_subquery()
-
-    stock_by_material = session.execute(
+    return session.execute(
         select(
             Material.name.label("material_name"),
             func.coalesce(stock_sq.c.current_stock_kg, Decimal("0.000")).label("current_stock_kg"),
+            *(getattr(stock_sq.c, name) for name in columns),
         )
         .outerjoin(stock_sq, stock_sq.c.material_id == Material.id)
         .order_by(Material.name.asc())
     ).all()
 
-    total_stock_kg = sum((row.current_stock_kg for row in stock_by_material), Decimal("0.000"))
-
-    today = date.today()
-    today_in_kg = session.execute(
-        select(func.coalesce(func.sum(StockMovement.quantity), Decimal("0.000"))).where(
-            StockMovement.movement_type == MovementType.IN,
-            cast(StockMovement.movement_at, Date) == today,
-        )
-    ).scalar_one()
-
-    today_out_production_kg = session.execute(
-        select(func.coalesce(func.sum(StockMovement.quantity), Decimal("0.000"))).where(
-            StockMovement.movement_type == MovementType.OUT_PRODUCTION,
-            cast(StockMovement.movement_at, Date) == today,
-        )
-    ).scalar_one()
 
-    suspicious_batches_count = session.execute(
+def _suspicious_batches_count(session: Session) -> int:
+    return session.execute(
         select(func.count(ProductionBatch.id)).where(ProductionBatch.status == BatchStatus.SUSPICIOUS)
     ).scalar_one()
 
-    context = {
-        "request": request,
-        "page_title": "Dashboard",
-        "total_stock_kg": total_stock_kg,
-        "today_in_kg": today_in_kg,
-        "today_out_production_kg": today_out_production_kg,
-        "suspicious_batches_count": suspicious_batches_count,
-        "stock_by_material": stock_by_material,
-    }
-    return templates.TemplateResponse("dashboard.html", context)
 
+async def _cached_page(
+    request: Request,
+    session: AsyncSession,
+    template: str,
+    build_context: Callable[[], Awaitable[dict]],
+    *,
+    vary: Hashable = None,
+) -> Response:
+    """Serve ``template`` from the page cache while the ledger version is unchanged, answering 304 to revalidations.
+
+    ``vary`` is part of the cache key for pages that also depend on something besides the ledger, such as the date.
+    """
+    version = await session.run_sync(ledger_version.current)
+    key = (request.url.path, request.url.query, vary)
+    page = page_cache.get(key, version)
+    if page is None:
+        context = await build_context()
+        body = templates.get_template(template).render({"request": request, **context})
+        page = page_cache.put(key, version, body, ledger_version.changed_at)
+    if page.not_modified(request.headers):
+        return Response(status_code=304, headers=page.headers)
+    return HTMLResponse(page.body, headers=page.headers)
 
-@router.get("/stocks", response_class=HTMLResponse)
-def stocks_page(request: Request, session: Session = Depends(get_session)) -> HTMLResponse:
-    stock_sq = _stock_subquery()
 
-    stocks = session.execute(
-        select(
-            Material.name.label("material_name"),
-            func.coalesce(stock_sq.c.current_stock_kg, Decimal("0.000")).label("current_stock_kg"),
-            stock_sq.c.last_movement_at,
+@router.get("/dashboard", response_class=HTMLResponse)
+async def dashboard_page(
+    request: Request,
+    days: int = Query(default=FLOW_WINDOWS[0]),
+    session: AsyncSession = Depends(get_async_session),
+) -> HTMLResponse:
+    if days not in FLOW_WINDOWS:
+        days = FLOW_WINDOWS[0]
+    today = utc_today()
+
+    async def build_context() -> dict:
+        # independent aggregates; each runs on its own connection
+        stock_by_material, flows, suspicious_batches_count = await read_concurrently(
+            session,
+            _stock_rows,
+            lambda s: DailyFlowService(s).totals(today - timedelta(days=days - 1), today),
+            _suspicious_batches_count,
         )
-        .outerjoin(stock_sq, stock_sq.c.material_id == Material.id)
-        .order_by(Material.name.asc())
-    ).all()
+        total_stock_kg = sum((row.current_stock_kg for row in stock_by_material), Decimal("0.000"))
+
+        return {
+            "page_title": "Dashboard",
+            "total_stock_kg": total_stock_kg,
+            "today_in_kg": flows[-1].in_kg,
+            "today_out_production_kg": flows[-1].out_production_kg,
+            "suspicious_batches_count": suspicious_batches_count,
+            "stock_by_material": stock_by_material,
+            "flow_days": days,
+            "flow_windows": FLOW_WINDOWS,
+            "flow_series": {
+                "dates": [p.flow_date.isoformat() for p in flows],
+                "in_kg": [float(p.in_kg) for p in flows],
+                "out_production_kg": [float(p.out_production_kg) for p in flows],
+                "out_correction_kg": [float(p.out_correction_kg) for p in flows],
+            },
+        }
+
+    return await _cached_page(request, session, "dashboard.html", build_context, vary=today)
+
+
+@router.get("/stocks", response_class=HTMLResponse)
+async def stocks_page(request: Request, session: AsyncSession = Depends(get_async_session)) -> HTMLResponse:
+    async def build_context() -> dict:
+        stocks = await session.run_sync(_stock_rows, "last_movement_at")
+        return {"page_title": "Stocks", "stocks": stocks}
 
-    return templates.TemplateResponse(
-        "stocks.html",
-        {
-            "request": request,
-            "page_title": "Stocks",
-            "stocks": stocks,
-        },
-    )
+    return await _cached_page(request, session, "stocks.html", build_context)
@@ -0,0 +1,76 @@
+"""Streaming HTML and CSV responses for listings too large to render at once.
+
+Rows come from a server-side cursor (``yield_per``) and are written through the
+page's compiled Jinja template, or the csv module, as they arrive. Output is
+sent in chunks of about ``STREAM_CHUNK_CHARS`` characters, so server memory
+stays flat however long the listing is, and the first bytes go out before the
+query has finished.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from enum import Enum
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from yem_sistem.db.session import SessionLocal
+from yem_sistem.web.templating import templates
+
+STREAM_CHUNK_CHARS = 64 * 1024
+
+RowSource = Callable[[Session], Iterable]
+
+
+def chunked(pieces: Iterable[str], size: int = STREAM_CHUNK_CHARS) -> Iterator[str]:
+    """Join small strings into chunks of at least ``size`` characters (the last may be shorter)."""
+    parts: list[str] = []
+    length = 0
+    for piece in pieces:
+        parts.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield "".join(parts)
+            parts.clear()
+            length = 0
+    if parts:
+        yield "".join(parts)
+
+
+def iter_csv(header: Sequence[str], rows: Iterable[Sequence]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow([value.value if isinstance(value, Enum) else value for value in row])
+        if buffer.tell() >= STREAM_CHUNK_CHARS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _with_session(render: Callable[[Session], Iterable[str]]) -> Iterator[str]:
+    # the response outlives request dependencies, so the stream owns its session
+    with SessionLocal() as session:
+        yield from render(session)
+
+
+def stream_template(template: str, context: dict, rows: RowSource) -> StreamingResponse:
+    """Render ``template`` with ``rows(session)`` as ``rows``; the template must only iterate them once."""
+    compiled = templates.get_template(template)
+    return StreamingResponse(
+        _with_session(lambda session: chunked(compiled.generate({**context, "rows": rows(session)}))),
+        media_type="text/html; charset=utf-8",
+    )
+
+
+def stream_csv(file_name: str, header: Sequence[str], rows: RowSource) -> StreamingResponse:
+    return StreamingResponse(
+        _with_session(lambda session: iter_csv(header, rows(session))),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{file_name}"'},
+    )
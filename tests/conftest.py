@@ -0,0 +1,75 @@
+"""Fixtures: a fresh in-memory SQLite database per test, with the full schema."""
+
+from __future__ import annotations
+
+import warnings
+from collections.abc import Callable, Iterator
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, exc as sa_exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+import yem_sistem.models  # noqa: F401  (registers every table on Base.metadata)
+from yem_sistem.db.base import Base
+from yem_sistem.materials.models import Material
+from yem_sistem.stock_movements.models import MovementReason, MovementType, StockMovement
+from yem_sistem.stock_movements.service import StockService
+
+OPENING_AT = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def engine() -> Iterator[Engine]:
+    # SQLite has no native Decimal; the warning is expected for every QUANTITY_TYPE column
+    warnings.filterwarnings("ignore", category=sa_exc.SAWarning)
+    # one shared connection so every session sees the same in-memory database
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session(engine: Engine) -> Iterator[Session]:
+    with Session(engine, autoflush=False, expire_on_commit=False) as session:
+        yield session
+
+
+@pytest.fixture
+def receive(session: Session) -> Callable[..., StockMovement]:
+    """Commit an IN movement of ``quantity`` kg for a material."""
+
+    def receive(material: Material, quantity: str, at: datetime = OPENING_AT) -> StockMovement:
+        movement = StockService(session).add_movement(
+            StockMovement(
+                material_id=material.id,
+                movement_type=MovementType.IN,
+                reason=MovementReason.MATERIAL_ACCEPTANCE,
+                quantity=Decimal(quantity),
+                movement_at=at,
+                reference_type="acceptance",
+            )
+        )
+        session.commit()
+        return movement
+
+    return receive
+
+
+@pytest.fixture
+def materials(session: Session, receive) -> list[Material]:
+    """Corn (1000 kg), soy (500 kg) and salt (no stock)."""
+    materials = [
+        Material(code="CORN", name="Corn", unit="kg"),
+        Material(code="SOY", name="Soybean meal", unit="kg"),
+        Material(code="SALT", name="Salt", unit="kg"),
+    ]
+    session.add_all(materials)
+    session.commit()
+    receive(materials[0], "1000.000")
+    receive(materials[1], "500.000")
+    return materials
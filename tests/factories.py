@@ -0,0 +1,49 @@
+"""Builders for movement rows and parsed import rows."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from yem_sistem.imports.dtm_batch_import import LoadRow
+from yem_sistem.stock_movements.models import MovementReason, MovementType
+
+
+def out_row(material_id: int, quantity: str, at: datetime) -> dict:
+    """`StockService.record_movement_rows` parameters for one DTM consumption."""
+    return {
+        "material_id": material_id,
+        "movement_type": MovementType.OUT_PRODUCTION,
+        "reason": MovementReason.DTM_CONSUMPTION,
+        "quantity": Decimal(quantity),
+        "movement_at": at,
+        "reference_type": "DTM_BATCH",
+    }
+
+
+def load_row(
+    id_batch: str,
+    ingredient: str,
+    loaded: str,
+    *,
+    target: str = "100.000",
+    day: date = date(2024, 3, 1),
+    start: time | None = time(8, 0),
+    recipe: str = "Dairy TMR",
+) -> LoadRow:
+    """One Load sheet line for material code ``ingredient``."""
+    return LoadRow(
+        id_batch=id_batch,
+        batch=f"Batch {id_batch}",
+        date=day,
+        start_time=start,
+        end_time=None,
+        feeder="Feeder 1",
+        recipe_id=recipe,
+        recipe_name=recipe,
+        ingredient_id=ingredient,
+        ingredient_name=None,
+        target_weight=Decimal(target),
+        loaded=Decimal(loaded),
+        error_percent=None,
+    )
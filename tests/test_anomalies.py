@@ -0,0 +1,92 @@
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+
+from yem_sistem.anomalies.models import LoadStatistic
+from yem_sistem.anomalies.service import MIN_HISTORY, SAMPLE_DTYPE, LoadAnomalyService, LoadSample
+from yem_sistem.imports.dtm_batch_import import DtmBatchImportService
+from yem_sistem.production_batches.models import BatchStatus, ProductionBatch
+from yem_sistem.production_batches.service import BatchFixEntry, ProductionBatchService
+
+from tests.factories import load_row
+
+
+def sample(material_id: int, loaded: list[float], errors: list[float] | None = None, recipe: str = "Dairy TMR") -> LoadSample:
+    errors = errors or [np.nan] * len(loaded)
+    rows = np.array([(0, material_id, 10.0, x, e) for x, e in zip(loaded, errors)], dtype=SAMPLE_DTYPE)
+    return LoadSample(recipes=[recipe], rows=rows)
+
+
+def test_z_scores_need_enough_history_and_a_real_deviation():
+    values = np.array([1.5, 1.5, 1.01, np.nan])
+    key_idx = np.array([0, 1, 0, 0])
+    count = np.array([MIN_HISTORY, MIN_HISTORY - 1], dtype=float)
+    mean = np.array([1.0, 1.0])
+    m2 = np.array([0.01 * (MIN_HISTORY - 1), 0.0])  # variance 0.01
+
+    z = LoadAnomalyService._z_scores(values, key_idx, count, mean, m2, 0.05)
+
+    np.testing.assert_allclose(z, [5.0, 0.0, 0.0, 0.0])
+
+
+def test_learning_merges_imports_like_one_pass(session, materials):
+    corn = materials[0]
+    first = [9.0, 10.0, 11.0, 10.5]
+    second = [9.5, 12.0, 0.0]  # zero loads are not learned
+    service = LoadAnomalyService(session)
+    service.score_and_learn(sample(corn.id, first, errors=[1.0, -2.0, 0.5, 3.0]))
+    service.score_and_learn(sample(corn.id, second))
+
+    stats = session.scalars(select(LoadStatistic)).one()
+    ratios = np.array(first + second[:2]) / 10.0
+    assert (stats.recipe_key, stats.ratio_count, stats.error_count) == ("Dairy TMR", 6, 4)
+    assert stats.ratio_mean == pytest.approx(ratios.mean())
+    assert stats.ratio_m2 == pytest.approx(((ratios - ratios.mean()) ** 2).sum())
+    assert stats.error_mean == pytest.approx(0.625)
+
+
+def test_outliers_are_described_and_kept_out_of_the_history(session, materials):
+    corn = materials[0]
+    service = LoadAnomalyService(session)
+    history = [9.8, 10.2] * (MIN_HISTORY // 2)
+    service.score_and_learn(sample(corn.id, history))
+
+    reasons = service.score_and_learn(sample(corn.id, [10.0, 30.0, 3.0]))
+
+    assert reasons[0] is None
+    assert reasons[1].startswith("overload 30.0/10.0 kg (z=+")
+    assert reasons[2].startswith("underload 3.0/10.0 kg (z=-")
+    assert session.scalars(select(LoadStatistic)).one().ratio_count == MIN_HISTORY + 1
+
+
+@pytest.mark.parametrize("bulk", [True, False], ids=["bulk", "orm"])
+def test_anomalous_loads_do_not_hold_a_batch_suspicious(session, materials, bulk):
+    service = DtmBatchImportService(session, bulk=bulk)
+    history = service.create_job("history.xlsx", "history", "ADMIN")
+    service.run_job_rows(
+        history.id, [load_row(f"H{i:02}", "SOY", ("9.800", "10.200")[i % 2], target="10.000") for i in range(MIN_HISTORY)]
+    )
+    job = service.create_job("load.xlsx", "anomalies", "ADMIN")
+    summary = service.run_job_rows(
+        job.id,
+        [
+            load_row("B1", "CORN", "0", start=None),
+            load_row("B1", "SOY", "30.000", target="10.000", start=None),
+            load_row("B2", "SOY", "30.000", target="10.000", start=None),
+        ],
+    )
+    batches = {b.id_batch: b for b in session.scalars(select(ProductionBatch).where(ProductionBatch.id_batch.in_(["B1", "B2"])))}
+
+    assert summary.suspicious_batches_count == 1
+    assert batches["B2"].status == BatchStatus.OK
+    assert batches["B2"].suspicious_reason.startswith("Load anomalies: SOY: overload 30.0/10.0 kg")
+    assert batches["B1"].status == BatchStatus.SUSPICIOUS
+    assert "Load anomalies" in batches["B1"].suspicious_reason
+
+    fixes = ProductionBatchService(session)
+    _, items = fixes.get_zero_loaded_items(batches["B1"].id)
+    assert len(items) == 1
+    fixes.fix_items([BatchFixEntry(items[0].id, Decimal("12.000"), "scale restarted, weighed by hand")], actor_role="ADMIN")
+    assert session.get(ProductionBatch, batches["B1"].id).status == BatchStatus.FIXED
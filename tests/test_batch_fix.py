@@ -0,0 +1,148 @@
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.dialects import postgresql
+
+from yem_sistem.audit_logs.models import AuditLog
+from yem_sistem.batch_items.models import BatchItem
+from yem_sistem.imports.dtm_batch_import import DtmBatchImportService
+from yem_sistem.materials.models import Material
+from yem_sistem.production_batches.models import BatchStatus, ProductionBatch
+from yem_sistem.production_batches.service import (
+    BatchFixAuthorizationError,
+    BatchFixEntry,
+    BatchFixValidationError,
+    ProductionBatchService,
+)
+from yem_sistem.stock_movements.models import MovementType, StockMovement
+from yem_sistem.stock_movements.service import StockService
+
+from tests.factories import load_row
+
+NOTE = "scale restarted, weighed by hand"
+
+
+@pytest.fixture
+def batches(session, materials):
+    """B1 with zero-loaded corn and soy, B2 with zero-loaded corn and a loaded soy line."""
+    service = DtmBatchImportService(session)
+    job = service.create_job("load.xlsx", "fix-fixture", "ADMIN")
+    service.run_job_rows(
+        job.id,
+        [
+            load_row("B1", "CORN", "0"),
+            load_row("B1", "SOY", "0"),
+            load_row("B2", "CORN", "0"),
+            load_row("B2", "SOY", "40.000"),
+        ],
+    )
+    return {
+        (id_batch, code): item
+        for item, id_batch, code in session.execute(
+            select(BatchItem, ProductionBatch.id_batch, Material.code)
+            .join(ProductionBatch, ProductionBatch.id == BatchItem.production_batch_id)
+            .join(Material, Material.id == BatchItem.material_id)
+        )
+    }
+
+
+def _corrections(session) -> int:
+    return session.scalar(
+        select(func.count()).select_from(StockMovement).where(StockMovement.movement_type == MovementType.OUT_CORRECTION)
+    )
+
+
+def test_only_admin_can_fix(session, batches):
+    item = batches["B1", "CORN"]
+    with pytest.raises(BatchFixAuthorizationError):
+        ProductionBatchService(session).fix_items(
+            [BatchFixEntry(item.id, Decimal("10.000"), NOTE)], actor_role="ACCEPTANCE"
+        )
+
+
+def test_every_invalid_entry_is_reported_and_nothing_is_written(session, batches):
+    zero, loaded, other_batch = batches["B1", "CORN"], batches["B2", "SOY"], batches["B2", "CORN"]
+    entries = [
+        BatchFixEntry(zero.id, Decimal("10.000"), "too short"),
+        BatchFixEntry(zero.id, Decimal("0.000"), NOTE),
+        BatchFixEntry(loaded.id, Decimal("10.000"), NOTE),
+        BatchFixEntry(other_batch.id, Decimal("10.000"), NOTE, batch_id=zero.production_batch_id),
+        BatchFixEntry(999_999, Decimal("10.000"), NOTE),
+    ]
+    with pytest.raises(BatchFixValidationError) as raised:
+        ProductionBatchService(session).fix_items(entries, actor_role="ADMIN")
+
+    message = str(raised.value)
+    assert f"item {zero.id}: correction_note is required" in message
+    assert f"item {zero.id}: listed more than once" in message
+    assert f"item {zero.id}: corrected_weight must be greater than 0" in message
+    assert f"item {loaded.id}: only zero-loaded items can be fixed" in message
+    assert f"item {other_batch.id}: batch item not found in given batch" in message
+    assert "item 999999: batch item not found" in message
+    assert _corrections(session) == 0
+    assert session.scalar(select(func.count()).select_from(AuditLog).where(AuditLog.action == "FIX")) == 0
+
+
+def test_empty_fix_is_rejected(session, batches):
+    with pytest.raises(BatchFixValidationError, match="No items to fix"):
+        ProductionBatchService(session).fix_items([], actor_role="ADMIN")
+
+
+def test_fix_writes_corrections_and_closes_fully_fixed_batches(session, materials, batches):
+    corn = materials[0]
+    b1_corn, b1_soy, b2_corn = batches["B1", "CORN"], batches["B1", "SOY"], batches["B2", "CORN"]
+    service = ProductionBatchService(session)
+
+    summary = service.fix_items(
+        [
+            BatchFixEntry(b1_corn.id, Decimal("25.000"), NOTE),
+            BatchFixEntry(b1_soy.id, Decimal("5.000"), NOTE),
+            BatchFixEntry(b2_corn.id, Decimal("30.000"), NOTE),
+        ],
+        actor_role="admin",
+    )
+
+    assert (summary.items_fixed, summary.batches_touched) == (3, 2)
+    statuses = dict(session.execute(select(ProductionBatch.id_batch, ProductionBatch.status)).all())
+    # B2 keeps its loaded soy line but has no unfixed zero-loaded item left
+    assert statuses == {"B1": BatchStatus.FIXED, "B2": BatchStatus.FIXED}
+    assert session.get(BatchItem, b1_corn.id).corrected_weight == Decimal("25.000")
+    assert _corrections(session) == 3
+    assert StockService(session).get_current_stock(corn.id) == Decimal("945.000")
+
+
+def test_partially_fixed_batch_stays_suspicious(session, batches):
+    ProductionBatchService(session).fix_item(
+        batch_id=batches["B1", "CORN"].production_batch_id,
+        batch_item_id=batches["B1", "CORN"].id,
+        corrected_weight=Decimal("25.000"),
+        correction_note=NOTE,
+        actor_role="ADMIN",
+    )
+    status = session.scalar(select(ProductionBatch.status).where(ProductionBatch.id_batch == "B1"))
+    assert status == BatchStatus.SUSPICIOUS
+
+    with pytest.raises(BatchFixValidationError, match="already corrected"):
+        ProductionBatchService(session).fix_items(
+            [BatchFixEntry(batches["B1", "CORN"].id, Decimal("25.000"), NOTE)], actor_role="ADMIN"
+        )
+
+
+def test_items_are_locked_before_the_already_corrected_check(session, batches):
+    selects = []
+    event.listen(session, "do_orm_execute", lambda state: selects.append(state.statement) if state.is_select else None)
+    ProductionBatchService(session).fix_items(
+        [BatchFixEntry(batches["B1", "CORN"].id, Decimal("25.000"), NOTE)], actor_role="ADMIN"
+    )
+    item_read = next(str(s.compile(dialect=postgresql.dialect())) for s in selects if "batch_items" in str(s))
+    assert item_read.endswith("FOR UPDATE OF batch_items")
+
+
+def test_fix_beyond_stock_is_a_validation_error(session, batches):
+    with pytest.raises(BatchFixValidationError, match="Negative stock blocked"):
+        ProductionBatchService(session).fix_items(
+            [BatchFixEntry(batches["B1", "SOY"].id, Decimal("461.000"), NOTE)], actor_role="ADMIN"
+        )
+    assert _corrections(session) == 0
+    assert session.get(BatchItem, batches["B1", "SOY"].id).corrected_weight is None
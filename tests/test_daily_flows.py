@@ -0,0 +1,52 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from yem_sistem.daily_flows.models import DailyMaterialFlow
+from yem_sistem.daily_flows.service import DailyFlowService
+from yem_sistem.stock_movements.models import MovementReason, MovementType
+from yem_sistem.stock_movements.service import StockService
+
+from tests.factories import out_row
+
+
+def flow_rows(session) -> list[tuple]:
+    t = DailyMaterialFlow
+    return session.execute(
+        select(t.flow_date, t.material_id, t.in_kg, t.out_production_kg, t.out_correction_kg, t.movement_count).order_by(
+            t.flow_date, t.material_id
+        )
+    ).all()
+
+
+def test_incremental_rollup_matches_rebuild(session, materials, receive):
+    corn, soy = materials[0], materials[1]
+    receive(corn, "100.000", at=datetime(2024, 1, 2, 23, 30, tzinfo=timezone.utc))
+    StockService(session).record_movement_rows(
+        [
+            out_row(corn.id, "30.000", datetime(2024, 1, 2, 8, tzinfo=timezone.utc)),
+            out_row(corn.id, "20.000", datetime(2024, 1, 2, 9, tzinfo=timezone.utc)),
+            out_row(soy.id, "15.000", datetime(2024, 1, 3, tzinfo=timezone.utc)),
+            {
+                **out_row(soy.id, "5.000", datetime(2024, 1, 3, 1, tzinfo=timezone.utc)),
+                "movement_type": MovementType.OUT_CORRECTION,
+                "reason": MovementReason.ADJUSTMENT,
+            },
+        ]
+    )
+    session.commit()
+    incremental = flow_rows(session)
+    assert (date(2024, 1, 2), corn.id, Decimal("100.000"), Decimal("50.000"), Decimal("0.000"), 3) in incremental
+
+    assert DailyFlowService(session).rebuild() == len(incremental)
+    assert flow_rows(session) == incremental
+
+
+def test_totals_fill_quiet_days_with_zero(session, materials, receive):
+    receive(materials[0], "100.000", at=datetime(2024, 1, 3, tzinfo=timezone.utc))
+    points = DailyFlowService(session).totals(date(2024, 1, 1), date(2024, 1, 4))
+
+    assert [p.flow_date.day for p in points] == [1, 2, 3, 4]
+    assert [p.in_kg for p in points] == [Decimal("1500.000"), 0, Decimal("100.000"), 0]
+    assert [p.movement_count for p in points] == [2, 0, 1, 0]
@@ -0,0 +1,12 @@
+from yem_sistem.imports.decoders import required_text_decoder, text_decoder
+
+
+def test_text_cache_tells_equal_numbers_of_different_types_apart():
+    decode = text_decoder()
+    assert [decode(v) for v in (1, 1.0, True, "1", 1)] == ["1", "1.0", "True", "1", "1"]
+
+
+def test_blank_text_decodes_to_the_empty_value():
+    assert text_decoder()("  ") is None
+    assert required_text_decoder()(None) == ""
+    assert required_text_decoder()(" A1 ") == "A1"
@@ -0,0 +1,66 @@
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from yem_sistem.analytics.feed_efficiency import FeedEfficiencyService, rolling_ratio
+from yem_sistem.herd_kpis.models import GroupYield, PenGroup
+from yem_sistem.imports.dtm_batch_import import DtmBatchImportService
+from yem_sistem.monthly_prices.models import MonthlyPrice
+from yem_sistem.pen_daily.models import PenDaily
+
+from tests.factories import load_row
+
+DAY1, DAY2 = date(2024, 3, 1), date(2024, 3, 2)
+
+
+def test_rolling_ratio_sums_trailing_windows_and_skips_empty_days():
+    num = np.array([[1.0, np.nan, 3.0, 4.0]])
+    den = np.array([[2.0, 0.0, 2.0, 0.0]])
+    np.testing.assert_allclose(rolling_ratio(num, den, 2), [[0.5, 0.5, 1.5, 3.5]])
+    assert np.isnan(rolling_ratio(np.array([1.0]), np.array([0.0]), 3)[0])
+
+
+@pytest.fixture
+def herd(session, materials):
+    corn = materials[0]
+    corn.dry_matter_ratio = Decimal("0.5000")
+    session.add_all(
+        [
+            PenGroup(pen_code="P1", group_number=1, recipe_id="R1"),
+            PenDaily(record_date=DAY1, pen_code="P1", material_id=corn.id, consumed_quantity=Decimal("100.000")),
+            MonthlyPrice(material_id=corn.id, price_month=date(2024, 3, 1), unit_price=Decimal("2.0000")),
+            GroupYield(yield_date=DAY1, group_number=1, total_cows=10, avg_yield=Decimal("30.000")),
+            GroupYield(yield_date=DAY2, group_number=1, total_cows=10, avg_yield=Decimal("30.000")),
+        ]
+    )
+    session.commit()
+    service = DtmBatchImportService(session)
+    job = service.create_job("load.xlsx", "feed", "ADMIN")
+    # day 1 is measured at the pen, so its DTM load must not count
+    service.run_job_rows(
+        job.id,
+        [load_row("B1", "CORN", "70.000", day=DAY1, recipe="R1"), load_row("B2", "CORN", "80.000", day=DAY2, recipe="R1")],
+    )
+    return corn
+
+
+def test_group_day_grid_prefers_pen_records_over_dtm_loads(session, herd):
+    grid = FeedEfficiencyService(session).compute(DAY1, DAY2, milk_price=Decimal("1.5"))
+
+    assert grid.groups.tolist() == [1]
+    np.testing.assert_allclose(grid.feed_kg, [[100.0, 80.0]])
+    np.testing.assert_allclose(grid.dm_kg, [[50.0, 40.0]])
+    np.testing.assert_allclose(grid.milk_kg, [[300.0, 300.0]])
+    np.testing.assert_allclose(grid.feed_cost, [[200.0, 160.0]])
+    np.testing.assert_allclose(grid.dm_per_milk, [[50 / 300, 40 / 300]])
+    np.testing.assert_allclose(grid.iofc, [[250.0, 290.0]])
+    np.testing.assert_allclose(grid.trends[7], [[50 / 300, 90 / 600]])
+
+
+def test_income_over_feed_cost_needs_a_milk_price(session, herd):
+    grid = FeedEfficiencyService(session).compute(DAY1, DAY2)
+    assert np.isnan(grid.iofc).all()
+    with pytest.raises(ValueError):
+        FeedEfficiencyService(session).compute(DAY2, DAY1)
@@ -0,0 +1,66 @@
+from yem_sistem.imports.headers import HeaderResolver, fold_header, header_fingerprint
+
+FIELDS = {
+    "date": ("Date",),
+    "group": ("Group Number",),
+    "cows": ("Total Cows",),
+    "yield": ("Avg. Yield Yesterday",),
+}
+
+
+def _resolver(compiled: list | None = None) -> HeaderResolver:
+    def compile(positions):
+        if compiled is not None:
+            compiled.append(dict(positions))
+        return lambda row: {field: row[index] for field, index in positions.items()}
+
+    return HeaderResolver(FIELDS, compile)
+
+
+def test_fold_ignores_case_spacing_and_turkish_letters():
+    assert fold_header("  TOPLAM   İnekler ") == fold_header("toplam inekler")
+    assert fold_header("Grup Numarası") == "grup numarasi"
+
+
+def test_english_and_turkish_headers_resolve_to_the_same_fields():
+    resolver = _resolver()
+    english = resolver.resolve(["Date", "Group Number", "Total Cows", "Avg. Yield Yesterday"])
+    turkish = resolver.resolve(["Tarih", "grup numarası", "TOPLAM İNEKLER", "Ort. Verim Dün"])
+    assert english.positions == turkish.positions == {"date": 0, "group": 1, "cows": 2, "yield": 3}
+    assert turkish.fuzzy == {}
+
+
+def test_placeholders_are_ignored_and_unknown_labels_reported():
+    layout = _resolver().resolve(["Tarih", "Column32", "Sütun1", "#REF!", "Barn Temperature", None, 7])
+    assert layout.positions == {"date": 0}
+    assert layout.ignored == ("Column32", "Sütun1", "#REF!")
+    assert layout.unmapped == ("Barn Temperature",)
+
+
+def test_fuzzy_match_only_claims_fields_left_free():
+    layout = _resolver().resolve(["Date", "Grup Numaras", "Total Cow", "Total Cows"])
+    # "Total Cows" matches exactly, so the near miss "Total Cow" stays unmapped
+    assert layout.positions == {"date": 0, "group": 1, "cows": 3}
+    assert layout.fuzzy == {"Grup Numaras": "group"}
+    assert layout.unmapped == ("Total Cow",)
+
+
+def test_second_column_for_a_field_is_unmapped():
+    layout = _resolver().resolve(["Date", "Tarih"])
+    assert layout.positions == {"date": 0}
+    assert layout.unmapped == ("Tarih",)
+
+
+def test_layouts_and_extractors_are_cached_per_fingerprint():
+    compiled: list = []
+    resolver = _resolver(compiled)
+    first = resolver.resolve(["Date", "Total Cows", None, None])
+    again = resolver.resolve(["date", " total  cows"])
+    assert header_fingerprint(["Date", "Total Cows", None]) == header_fingerprint(["date", "total cows"])
+    assert again is first
+    assert resolver.stats() == {"hits": 1, "misses": 1, "layouts": 1}
+
+    extract = resolver.extractor(first.positions)
+    assert resolver.extractor(dict(first.positions)) is extract
+    assert len(compiled) == 1
+    assert extract(["2024-03-01", 120]) == {"date": "2024-03-01", "cows": 120}
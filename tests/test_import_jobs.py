@@ -0,0 +1,106 @@
+from datetime import time
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from yem_sistem.imports.dtm_batch_import import DtmBatchImportService, DtmImportError
+from yem_sistem.imports.models import ImportJob, ImportStatus
+from yem_sistem.production_batches.models import ProductionBatch
+from yem_sistem.stock_balances.service import StockBalanceService
+from yem_sistem.stock_movements.service import StockService
+
+from tests.factories import load_row
+
+# B3 needs more soy than the 500 kg in stock
+ROWS = [
+    load_row("B1", "CORN", "100.000", start=time(6, 0)),
+    load_row("B2", "CORN", "100.000", start=time(7, 0)),
+    load_row("B3", "SOY", "600.000", start=time(8, 0)),
+    load_row("B4", "CORN", "100.000", start=time(9, 0)),
+]
+
+
+def _batch_count(session) -> int:
+    return session.scalar(select(func.count()).select_from(ProductionBatch))
+
+
+def test_failed_chunked_import_resumes_from_its_checkpoint(session, materials, receive):
+    corn, soy, _ = materials
+    service = DtmBatchImportService(session)
+    job = service.create_job("load.xlsx", "resume", "ADMIN", chunk_size=1)
+
+    with pytest.raises(DtmImportError, match="Negative stock blocked"):
+        service.run_job_rows(job.id, list(ROWS), chunk_size=1)
+
+    failed = session.get(ImportJob, job.id)
+    assert failed.status == ImportStatus.FAILED
+    assert (failed.batches_done, failed.rows_done, failed.movements_done) == (2, 2, 2)
+    assert failed.last_batch_key == "B2|2024-03-01|07:00:00"
+    assert _batch_count(session) == 2
+
+    receive(soy, "200.000")
+    resumed = service.create_job("load.xlsx", "resume", "ADMIN", chunk_size=1)
+    assert resumed.id == job.id
+    summary = service.run_job_rows(job.id, list(ROWS), chunk_size=1)
+
+    assert (summary.rows_processed, summary.movements_created) == (4, 4)
+    assert session.get(ImportJob, job.id).status == ImportStatus.SUCCESS
+    assert _batch_count(session) == 4
+    stock = StockService(session)
+    assert stock.get_current_stocks([corn.id, soy.id]) == {corn.id: Decimal("700.000"), soy.id: Decimal("100.000")}
+    assert StockBalanceService(session).verify() == []
+
+
+def test_rows_already_stored_are_not_counted_as_progress(session, materials, receive):
+    receive(materials[1], "200.000")
+    service = DtmBatchImportService(session)
+    earlier = service.create_job("first-half.xlsx", "first-half", "ADMIN")
+    service.run_job_rows(earlier.id, ROWS[:2])
+
+    job = service.create_job("load.xlsx", "overlapping", "ADMIN", chunk_size=1)
+    summary = service.run_job_rows(job.id, list(ROWS), chunk_size=1)
+
+    assert (summary.rows_processed, summary.movements_created) == (2, 2)
+    assert session.get(ImportJob, job.id).batches_done == 4
+    assert _batch_count(session) == 4
+
+
+def test_resume_with_different_content_is_refused(session, materials):
+    service = DtmBatchImportService(session)
+    job = service.create_job("load.xlsx", "mismatch", "ADMIN", chunk_size=1)
+    with pytest.raises(DtmImportError):
+        service.run_job_rows(job.id, list(ROWS), chunk_size=1)
+
+    service.create_job("load.xlsx", "mismatch", "ADMIN", chunk_size=1)
+    other = [load_row("X1", "CORN", "1.000"), load_row("X2", "CORN", "1.000"), load_row("X3", "CORN", "1.000")]
+    with pytest.raises(DtmImportError, match="does not match the import checkpoint"):
+        service.run_job_rows(job.id, other, chunk_size=1)
+    assert _batch_count(session) == 2
+
+
+def test_imported_file_is_a_hash_duplicate(session, materials):
+    service = DtmBatchImportService(session)
+    job = service.create_job("load.xlsx", "done", "ADMIN")
+    service.run_job_rows(job.id, [load_row("B1", "CORN", "10.000")])
+    with pytest.raises(DtmImportError, match="hash duplicate"):
+        service.create_job("load.xlsx", "done", "ADMIN")
+
+
+def test_queued_or_running_job_is_not_handed_out_again(session, materials):
+    service = DtmBatchImportService(session)
+    job = service.create_job("load.xlsx", "busy", "ADMIN")
+    with pytest.raises(DtmImportError, match="already queued"):
+        service.create_job("load.xlsx", "busy", "ADMIN")
+
+    service._start_job(job.id)
+    with pytest.raises(DtmImportError, match="already running"):
+        service.run_job_rows(job.id, [load_row("B1", "CORN", "10.000")])
+    # the losing run leaves the job to its owner
+    assert session.get(ImportJob, job.id).status == ImportStatus.RUNNING
+    assert _batch_count(session) == 0
+
+
+def test_only_admin_creates_import_jobs(session):
+    with pytest.raises(PermissionError):
+        DtmBatchImportService(session).create_job("load.xlsx", "role", "ACCEPTANCE")
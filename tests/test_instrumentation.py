@@ -0,0 +1,31 @@
+import logging
+
+from sqlalchemy import select, text
+
+from yem_sistem.db.instrumentation import N_PLUS_ONE_THRESHOLD, instrument_engine, query_scope, redact_parameters
+from yem_sistem.materials.models import Material
+
+
+def test_redacted_parameters_keep_only_their_shape():
+    assert redact_parameters({"code": "CORN", "pw": "secret"}, False) == "{code=?, pw=?}"
+    assert redact_parameters(("CORN", 1), False) == "(2 values)"
+    assert redact_parameters([{"a": 1}, {"a": 2}], True) == "2 sets of {a=?}"
+    assert redact_parameters([], True) == "0 sets of ()"
+    assert redact_parameters(None, False) == "()"
+
+
+def test_repeated_statement_is_reported_once_per_scope(engine, session, materials, caplog):
+    instrument_engine(engine)
+    with caplog.at_level(logging.WARNING, logger="yem_sistem.db.instrumentation"):
+        with query_scope("test-outer") as outer:
+            session.execute(text("SELECT 1"))
+            with query_scope("test-inner") as inner:
+                for material in materials * N_PLUS_ONE_THRESHOLD:
+                    session.execute(select(Material.name).where(Material.id == material.id))
+
+    assert outer.statements == 1 and outer.repeated == []
+    assert inner.statements == len(materials) * N_PLUS_ONE_THRESHOLD
+    assert len(inner.repeated) == 1 and "FROM materials" in inner.repeated[0]
+    warnings = [r.getMessage() for r in caplog.records if "possible N+1" in r.getMessage()]
+    assert len(warnings) == 1 and "test-inner" in warnings[0]
+    assert "CORN" not in warnings[0]
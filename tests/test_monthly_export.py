@@ -0,0 +1,60 @@
+import csv
+import io
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from yem_sistem.monthly_prices.export import MonthlyAccountingExport, parse_month
+from yem_sistem.monthly_prices.models import MonthlyPrice
+from yem_sistem.stock_movements.models import MovementReason, MovementType
+from yem_sistem.stock_movements.service import StockService
+
+from tests.factories import out_row
+
+
+@pytest.fixture
+def ledger(session, materials, receive):
+    corn = materials[0]
+    receive(corn, "200.000", at=datetime(2024, 2, 10, tzinfo=timezone.utc))
+    StockService(session).record_movement_rows(
+        [
+            out_row(corn.id, "100.000", datetime(2024, 2, 20, tzinfo=timezone.utc)),
+            {
+                **out_row(corn.id, "50.000", datetime(2024, 3, 5, tzinfo=timezone.utc)),
+                "movement_type": MovementType.OUT_CORRECTION,
+                "reason": MovementReason.ADJUSTMENT,
+            },
+        ]
+    )
+    session.add(MonthlyPrice(material_id=corn.id, price_month=date(2024, 3, 1), unit_price=Decimal("2.0000")))
+    session.commit()
+    return materials
+
+
+def test_opening_carries_the_previous_closing_forward(session, ledger):
+    rows = list(MonthlyAccountingExport(session).iter_rows(parse_month("2024-02"), parse_month("2024-03")))
+
+    # salt never moved, so it has no rows
+    assert [(r.material_code, r.month) for r in rows] == [
+        ("CORN", "2024-02"),
+        ("CORN", "2024-03"),
+        ("SOY", "2024-02"),
+        ("SOY", "2024-03"),
+    ]
+    feb, mar, soy_feb, soy_mar = rows
+    assert (feb.opening_kg, feb.in_kg, feb.out_production_kg, feb.closing_kg) == (1000, 200, 100, 1100)
+    assert feb.unit_price is None and feb.closing_value is None
+    assert (mar.opening_kg, mar.out_correction_kg, mar.closing_kg) == (1100, 50, 1050)
+    assert mar.closing_value == Decimal("2100.00") and mar.consumption_value == Decimal("0.00")
+    assert soy_feb.opening_kg == soy_feb.closing_kg == soy_mar.closing_kg == 500
+
+
+def test_csv_starts_with_the_header(session, ledger):
+    buffer = io.StringIO()
+    MonthlyAccountingExport(session).write_csv(date(2024, 3, 1), date(2024, 3, 1), buffer)
+    lines = list(csv.reader(io.StringIO(buffer.getvalue())))
+    assert lines[0][:4] == ["month", "material_code", "material_name", "opening_kg"]
+    assert lines[1][:2] == ["2024-03", "CORN"]
+    with pytest.raises(ValueError):
+        MonthlyAccountingExport(session).statement(date(2024, 3, 1), date(2024, 2, 1))
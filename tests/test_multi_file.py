@@ -0,0 +1,103 @@
+from datetime import date, datetime, time
+from pathlib import Path
+
+import pytest
+from sqlalchemy.orm import Session
+
+from yem_sistem import cli
+from yem_sistem.imports import multi_file
+from yem_sistem.imports.dtm_batch_import import OPTIONAL_DM_COLUMN, REQUIRED_COLUMNS, DtmBatchImportService
+from yem_sistem.imports.multi_file import (
+    MultiFileDtmImporter,
+    QueuedDtmFile,
+    iter_spilled_rows,
+    order_parsed_files,
+    parse_dtm_file,
+)
+
+
+def _write_export(path: Path, lines: list[tuple]) -> Path:
+    openpyxl = pytest.importorskip("openpyxl")
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Load"
+    ws.append([*REQUIRED_COLUMNS, OPTIONAL_DM_COLUMN])
+    for line in lines:
+        ws.append(line)
+    wb.save(path)
+    return path
+
+
+def _line(id_batch: str, day: date, start: time, ingredient: str, loaded: float) -> tuple:
+    return (id_batch, f"Batch {id_batch}", day, start, None, "Feeder 1", "R1", "Dairy TMR", ingredient, None, 100.0, loaded, None, None)
+
+
+@pytest.fixture(autouse=True)
+def spill_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(multi_file, "UPLOAD_DIR", tmp_path / "spill")
+    monkeypatch.setattr(multi_file, "SPILL_CHUNK_ROWS", 2)
+    return tmp_path / "spill"
+
+
+def test_worker_returns_a_header_and_spills_the_rows(tmp_path, spill_dir):
+    lines = [
+        _line("B2", date(2024, 3, 2), time(9, 0), "CORN", 50.0),
+        _line("B1", date(2024, 3, 1), time(7, 30), "CORN", 40.0),
+        _line("B1", date(2024, 3, 1), time(7, 30), "SOY", 10.0),
+    ]
+    path = _write_export(tmp_path / "load.xlsx", lines)
+
+    parsed = parse_dtm_file(QueuedDtmFile(job_id=7, file_name="load.xlsx", path=path))
+
+    assert parsed.error is None
+    assert parsed.first_at == datetime(2024, 3, 1, 7, 30)
+    assert parsed.rows_path.parent == spill_dir
+    assert list(iter_spilled_rows(parsed.rows_path)) == list(DtmBatchImportService._parse_load_sheet("load.xlsx", path))
+
+
+def test_bad_file_reports_an_error_and_leaves_no_spill(tmp_path, spill_dir):
+    path = _write_export(tmp_path / "load.xlsx", [_line("B1", date(2024, 3, 1), time(7, 30), "CORN", -1.0)])
+
+    parsed = parse_dtm_file(QueuedDtmFile(job_id=7, file_name="load.xlsx", path=path))
+
+    assert parsed.error == "Loaded value cannot be null or negative"
+    assert parsed.rows_path is None
+    assert list(spill_dir.iterdir()) == []
+
+
+def test_overlapping_exports_stop_the_run_at_the_later_file(tmp_path, engine, session, materials):
+    exports = {
+        "c.xlsx": [_line("C1", date(2024, 3, 3), time(8, 0), "CORN", 10.0)],
+        "b.xlsx": [_line("B1", date(2024, 3, 1), time(12, 0), "CORN", 10.0)],
+        "a.xlsx": [
+            _line("A1", date(2024, 3, 1), time(7, 0), "CORN", 10.0),
+            _line("A2", date(2024, 3, 2), time(9, 0), "CORN", 10.0),
+        ],
+    }
+    service = DtmBatchImportService(session)
+    parsed = []
+    for name, lines in exports.items():
+        job = service.create_job(name, name, "ADMIN")
+        parsed.append(parse_dtm_file(QueuedDtmFile(job.id, name, _write_export(tmp_path / name, lines))))
+
+    ordered = order_parsed_files(parsed)
+
+    assert [f.file_name for f in ordered] == ["a.xlsx", "b.xlsx", "c.xlsx"]
+    assert ordered[1].error.startswith("Batches from 2024-03-01 12:00 to 2024-03-01 12:00 overlap a.xlsx")
+    assert ordered[2].error is None
+
+    importer = MultiFileDtmImporter(lambda: Session(engine, expire_on_commit=False))
+    results = importer._write_in_order(ordered, None)
+    assert [(r.file_name, r.status) for r in results] == [
+        ("a.xlsx", "SUCCESS"),
+        ("b.xlsx", "FAILED"),
+        ("c.xlsx", "SKIPPED"),
+    ]
+
+
+def test_cli_reports_a_role_without_import_rights(tmp_path, engine, monkeypatch, capsys):
+    path = _write_export(tmp_path / "load.xlsx", [_line("B1", date(2024, 3, 1), time(7, 30), "CORN", 40.0)])
+    monkeypatch.setattr(cli, "SessionLocal", lambda: Session(engine, expire_on_commit=False))
+
+    assert cli.main(["import-dtm", str(path), "--role", "ACCEPTANCE"]) == 1
+    assert capsys.readouterr().out.startswith("FAILED   ")
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from yem_sistem.stock_movements.models import MovementReason, MovementType, StockMovement
+from yem_sistem.stock_movements.service import NegativeStockError, StockService
+
+from tests.conftest import OPENING_AT
+from tests.factories import out_row
+
+
+def test_out_movement_beyond_stock_is_blocked(session, materials):
+    corn = materials[0]
+    stock = StockService(session)
+    with pytest.raises(NegativeStockError, match="current=1000.000, out=1000.001"):
+        stock.add_movement(
+            StockMovement(
+                material_id=corn.id,
+                movement_type=MovementType.OUT_PRODUCTION,
+                reason=MovementReason.DTM_CONSUMPTION,
+                quantity=Decimal("1000.001"),
+                movement_at=OPENING_AT + timedelta(hours=1),
+            )
+        )
+    session.rollback()
+    assert stock.get_current_stock(corn.id) == Decimal("1000.000")
+    assert session.scalar(select(StockMovement.id).where(StockMovement.movement_type == MovementType.OUT_PRODUCTION)) is None
+
+
+def test_negative_stock_report_lists_every_short_material(session, materials):
+    corn, soy, salt = materials
+    day = datetime(2024, 2, 1, tzinfo=timezone.utc)
+    rows = [
+        out_row(corn.id, "600.000", day),
+        out_row(corn.id, "600.000", day + timedelta(hours=1)),
+        out_row(corn.id, "100.000", day + timedelta(hours=2)),
+        out_row(soy.id, "400.000", day),
+        out_row(salt.id, "1.000", day + timedelta(hours=3)),
+    ]
+    with pytest.raises(NegativeStockError) as raised:
+        StockService(session).validate_movement_rows(rows)
+
+    shortfalls = raised.value.shortfalls
+    assert [s.material_id for s in shortfalls] == [corn.id, salt.id]
+    assert shortfalls[0].current == Decimal("1000.000")
+    assert shortfalls[0].first_negative_at == day + timedelta(hours=1)
+    assert shortfalls[0].projected == Decimal("-300.000")
+    assert shortfalls[0].out_total == Decimal("1300.000")
+    assert shortfalls[1].projected == Decimal("-1.000")
+
+
+def test_later_delivery_does_not_cover_an_earlier_shortfall(session, materials):
+    salt = materials[2]
+    day = datetime(2024, 2, 1, tzinfo=timezone.utc)
+    delivery = {**out_row(salt.id, "50.000", day + timedelta(hours=1)), "movement_type": MovementType.IN}
+    with pytest.raises(NegativeStockError) as raised:
+        StockService(session).validate_movement_rows([delivery, out_row(salt.id, "10.000", day)])
+    assert raised.value.shortfalls[0].first_negative_at == day
@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from email.utils import format_datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from yem_sistem.db.base import Base
+from yem_sistem.db.session import get_async_session
+from yem_sistem.materials.models import Material
+from yem_sistem.stock_movements.models import MovementReason, MovementType, StockMovement
+from yem_sistem.stock_movements.service import StockService
+from yem_sistem.web.app import app
+from yem_sistem.web.cache import PageCache, page_cache
+
+CHANGED_AT = datetime(2024, 3, 1, 12, 0, 30, 250_000, tzinfo=timezone.utc)
+
+
+def test_cache_is_keyed_on_the_version():
+    cache = PageCache(max_entries=2)
+    page = cache.put("/stocks", 1, "<p>one</p>", CHANGED_AT)
+    assert cache.get("/stocks", 1) is page
+    assert cache.get("/stocks", 2) is None
+    assert cache.put("/stocks", 2, "<p>two</p>", CHANGED_AT).etag != page.etag
+
+
+def test_least_recently_used_page_is_evicted():
+    cache = PageCache(max_entries=2)
+    cache.put("a", 1, "a", CHANGED_AT)
+    cache.put("b", 1, "b", CHANGED_AT)
+    cache.get("a", 1)
+    cache.put("c", 1, "c", CHANGED_AT)
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) is not None
+
+
+def test_conditional_get_validators():
+    page = PageCache().put("/stocks", 1, "<p>stock</p>", CHANGED_AT)
+    assert page.not_modified({"if-none-match": page.etag})
+    assert page.not_modified({"if-none-match": f'"other", W/{page.etag}'})
+    assert page.not_modified({"if-none-match": "*"})
+    assert not page.not_modified({"if-none-match": '"other"'})
+    # If-None-Match wins over a matching If-Modified-Since
+    assert not page.not_modified({"if-none-match": '"other"', "if-modified-since": format_datetime(CHANGED_AT, usegmt=True)})
+    assert page.not_modified({"if-modified-since": format_datetime(CHANGED_AT, usegmt=True)})
+    assert not page.not_modified({"if-modified-since": format_datetime(CHANGED_AT - timedelta(seconds=1), usegmt=True)})
+    assert not page.not_modified({"if-modified-since": "yesterday"})
+    assert not page.not_modified({})
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    pytest.importorskip("aiosqlite")
+    # the page reads through the async engine, so both need the same database file
+    engine = create_engine(f"sqlite:///{tmp_path / 'pages.db'}")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def client(file_engine, tmp_path):
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'pages.db'}")
+
+    async def session_override():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    page_cache.clear()
+    app.dependency_overrides[get_async_session] = session_override
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+        page_cache.clear()
+
+
+def test_stock_page_revalidates_until_the_ledger_changes(file_engine, client):
+    with Session(file_engine, expire_on_commit=False) as session:
+        corn = Material(code="CORN", name="Corn", unit="kg")
+        session.add(corn)
+        session.commit()
+        stock = StockService(session)
+        stock.add_movement(
+            StockMovement(
+                material_id=corn.id,
+                movement_type=MovementType.IN,
+                reason=MovementReason.MATERIAL_ACCEPTANCE,
+                quantity=Decimal("1000.000"),
+                movement_at=CHANGED_AT,
+                reference_type="acceptance",
+            )
+        )
+        session.commit()
+
+        first = client.get("/stocks")
+        assert first.status_code == 200
+        etag = first.headers["ETag"]
+        assert first.headers["Cache-Control"] == "no-cache"
+
+        revalidated = client.get("/stocks", headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["ETag"] == etag
+        assert revalidated.content == b""
+
+        stock.add_movement(
+            StockMovement(
+                material_id=corn.id,
+                movement_type=MovementType.OUT_PRODUCTION,
+                reason=MovementReason.DTM_CONSUMPTION,
+                quantity=Decimal("250.000"),
+                movement_at=CHANGED_AT + timedelta(hours=1),
+                reference_type="DTM_BATCH",
+            )
+        )
+        session.commit()
+
+    changed = client.get("/stocks", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert "750" in changed.text
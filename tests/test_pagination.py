@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from yem_sistem.db.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from yem_sistem.stock_movements.models import MovementType, StockMovement
+from yem_sistem.stock_movements.service import StockService
+
+from tests.conftest import OPENING_AT
+
+
+@pytest.fixture
+def ledger(materials, receive) -> list[StockMovement]:
+    corn = materials[0]
+    # two movements share every timestamp, so pages must break ties on id
+    return [receive(corn, "1.000", OPENING_AT + timedelta(days=1 + i // 2)) for i in range(7)]
+
+
+def _walk(stock: StockService, limit: int, **filters) -> list[list[int]]:
+    pages, cursor = [], None
+    while True:
+        page = stock.list_movements(limit=limit, cursor=cursor, **filters)
+        pages.append([m.id for m in page.items])
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages
+
+
+def test_cursor_pages_cover_the_ledger_once_newest_first(session, materials, ledger):
+    stock = StockService(session)
+    pages = _walk(stock, limit=3, material_id=materials[0].id)
+
+    newest_first = sorted(ledger, key=lambda m: (m.movement_at, m.id), reverse=True)
+    opening = session.scalar(select(func.min(StockMovement.id)).where(StockMovement.material_id == materials[0].id))
+    assert [len(page) for page in pages] == [3, 3, 2]
+    assert [i for page in pages for i in page] == [m.id for m in newest_first] + [opening]
+
+
+def test_last_full_page_has_no_cursor(session, materials, ledger):
+    page = StockService(session).list_movements(material_id=materials[0].id, limit=8)
+    assert len(page.items) == 8
+    assert page.next_cursor is None
+
+
+def test_filters_apply_on_every_page(session, materials, ledger):
+    pages = _walk(StockService(session), limit=2, movement_type=MovementType.IN, start=(OPENING_AT + timedelta(days=2)).date())
+    ids = [i for page in pages for i in page]
+    movements = [session.get(StockMovement, i) for i in ids]
+    assert len(ids) == 5
+    assert all(m.movement_at.date() >= (OPENING_AT + timedelta(days=2)).date() for m in movements)
+
+
+def test_cursor_round_trip_and_bad_tokens():
+    columns = (StockMovement.movement_at, StockMovement.id)
+    assert decode_cursor(encode_cursor((OPENING_AT, 42)), columns) == (OPENING_AT, 42)
+    for token in ("not-base64!", encode_cursor((42,)), encode_cursor(("yesterday", 1))):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(token, columns)
+
+
+def test_page_size_is_bounded(session):
+    with pytest.raises(ValueError, match="limit must be between"):
+        StockService(session).list_movements(limit=0)
@@ -0,0 +1,41 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from sqlalchemy import update
+
+from yem_sistem.stock_balances.models import StockBalance
+from yem_sistem.stock_balances.service import BalanceDrift, StockBalanceService
+from yem_sistem.stock_movements.service import StockService
+
+from tests.conftest import OPENING_AT
+from tests.factories import out_row
+
+
+def test_balances_follow_the_ledger(session, materials, receive):
+    corn, soy, salt = materials
+    stock = StockService(session)
+    later = OPENING_AT + timedelta(days=1)
+    stock.record_movement_rows([out_row(corn.id, "250.500", later), out_row(soy.id, "500.000", later)])
+    session.commit()
+    receive(salt, "20.000", later)
+
+    expected = {corn.id: Decimal("749.500"), soy.id: Decimal("0.000"), salt.id: Decimal("20.000")}
+    assert stock.get_current_stocks([corn.id, soy.id, salt.id]) == expected
+    balances = StockBalanceService(session)
+    assert balances.verify() == []
+    assert {material_id: balance for material_id, (balance, _) in balances.ledger_balances().items()} == expected
+
+
+def test_rebuild_corrects_drift_from_the_ledger(session, materials):
+    corn, soy, _ = materials
+    session.execute(update(StockBalance).where(StockBalance.material_id == corn.id).values(quantity=Decimal("1.000")))
+    session.execute(update(StockBalance).where(StockBalance.material_id == soy.id).values(quantity=Decimal("500.000")))
+    session.commit()
+    balances = StockBalanceService(session)
+
+    drift = balances.rebuild()
+    session.commit()
+
+    assert drift == [BalanceDrift(material_id=corn.id, stored=Decimal("1.000"), ledger=Decimal("1000.000"))]
+    assert balances.verify() == []
+    assert balances.get(corn.id) == Decimal("1000.000")
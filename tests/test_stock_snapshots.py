@@ -0,0 +1,55 @@
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from yem_sistem.stock_movements.service import StockService
+from yem_sistem.stock_snapshots.models import StockSnapshot
+from yem_sistem.stock_snapshots.service import StockSnapshotService
+
+from tests.conftest import OPENING_AT
+from tests.factories import out_row
+
+
+def at(day: int, hour: int = 0) -> datetime:
+    return datetime(2024, 1, day, hour, tzinfo=timezone.utc)
+
+
+def snapshot_rows(session) -> list[tuple]:
+    return session.execute(
+        select(StockSnapshot.material_id, StockSnapshot.as_of, StockSnapshot.quantity).order_by(
+            StockSnapshot.material_id, StockSnapshot.as_of
+        )
+    ).all()
+
+
+def test_lookups_match_the_ledger_across_refreshes_and_backdated_writes(session, materials, receive):
+    corn = materials[0]
+    receive(corn, "100.000", at=at(2, 6))
+    StockService(session).record_movement_rows([out_row(corn.id, "30.000", at(2, 18)), out_row(corn.id, "20.000", at(4))])
+    session.commit()
+    snapshots = StockSnapshotService(session)
+    assert snapshots.refresh(through=date(2024, 1, 3)) == 3  # corn on the 1st and 2nd, soy on the 1st
+
+    expected = {
+        OPENING_AT - timedelta(seconds=1): Decimal("0.000"),
+        at(1, 12): Decimal("1000.000"),
+        at(2, 18): Decimal("1070.000"),
+        at(3): Decimal("1070.000"),
+        at(4): Decimal("1050.000"),
+        at(9): Decimal("1050.000"),
+    }
+    for moment, quantity in expected.items():
+        assert snapshots.get_stock_at(corn.id, moment) == quantity, moment
+
+    # a movement dated inside a snapshotted day drops the snapshots after it
+    receive(corn, "5.000", at=at(2, 12))
+    assert [as_of.day for material_id, as_of, _ in snapshot_rows(session) if material_id == corn.id] == [2]
+    assert snapshots.get_stock_at(corn.id, at(3)) == Decimal("1075.000")
+    assert snapshots.get_stock_at(corn.id, at(9)) == Decimal("1055.000")
+
+    snapshots.refresh(through=date(2024, 1, 9))
+    incremental = snapshot_rows(session)
+    snapshots.rebuild(through=date(2024, 1, 9))
+    assert snapshot_rows(session) == incremental
+    assert snapshots.get_stock_at(corn.id, at(9)) == Decimal("1055.000")
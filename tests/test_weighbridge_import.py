@@ -0,0 +1,113 @@
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from yem_sistem.acceptance.models import Acceptance
+from yem_sistem.acceptance.service import AcceptanceAuthorizationError
+from yem_sistem.audit_logs.models import AuditLog
+from yem_sistem.db.session import get_session
+from yem_sistem.imports import uploads
+from yem_sistem.imports.weighbridge_import import ACCEPTED, DUPLICATE, REJECTED, WeighbridgeImportError, WeighbridgeImportService
+from yem_sistem.stock_movements.models import StockMovement
+from yem_sistem.stock_movements.service import StockService
+from yem_sistem.web.app import app
+
+EXPORT = (
+    "Tarih;Saat;Plaka;Malzeme Kodu;Net Ağırlık;Firma\n"
+    "02.03.2024;08:15;34 AB 100;CORN;12000;Agro Ltd\n"
+    "02.03.2024;09:40;34 AB 200;soy;8000,5;Agro Ltd\n"
+    "02.03.2024;09:40;34 AB 200;SOY;8000,5;Agro Ltd\n"
+    "02.03.2024;10:00;34 AB 300;BARLEY;5000;\n"
+    "02.03.2024;11:00;34 AB 400;CORN;0;\n"
+    "not a date;11:00;34 AB 500;CORN;100;\n"
+)
+
+
+def _count(session, model, *where) -> int:
+    return session.scalar(select(func.count()).select_from(model).where(*where))
+
+
+def test_every_row_gets_its_own_result(session, materials):
+    corn, soy, _ = materials
+    summary = WeighbridgeImportService(session).import_file("kantar.csv", EXPORT.encode(), "ACCEPTANCE")
+
+    assert (summary.accepted, summary.duplicates, summary.rejected) == (2, 1, 3)
+    assert [(r.line, r.status) for r in summary.results] == [
+        (2, ACCEPTED),
+        (3, ACCEPTED),
+        (4, DUPLICATE),
+        (5, REJECTED),
+        (6, REJECTED),
+        (7, REJECTED),
+    ]
+    assert summary.results[2].message == "same truck as line 3"
+    assert "unknown material code 'BARLEY'" in summary.results[3].message
+    assert StockService(session).get_current_stocks([corn.id, soy.id]) == {
+        corn.id: Decimal("13000.000"),
+        soy.id: Decimal("8500.500"),
+    }
+
+
+def test_resent_file_reports_duplicates_and_writes_nothing_new(session, materials):
+    service = WeighbridgeImportService(session)
+    first = service.import_file("kantar.csv", EXPORT.encode(), "ADMIN")
+    movements = _count(session, StockMovement)
+
+    again = service.import_file("kantar.csv", EXPORT.encode(), "ADMIN")
+
+    assert (again.accepted, again.duplicates, again.rejected) == (0, 3, 3)
+    assert {r.line: r.message for r in again.results if r.status == DUPLICATE}[2] == "already accepted"
+    assert _count(session, Acceptance) == first.accepted
+    assert _count(session, StockMovement) == movements
+    assert _count(session, AuditLog, AuditLog.entity_name == "acceptance") == first.accepted
+
+
+def test_only_new_trucks_are_written_when_a_file_overlaps(session, materials):
+    service = WeighbridgeImportService(session)
+    service.import_file("kantar.csv", EXPORT.encode(), "ADMIN")
+    extra = EXPORT.splitlines()[0] + "\n" + EXPORT.splitlines()[1] + "\n02.03.2024;13:00;34 AB 600;CORN;700;\n"
+
+    summary = service.import_file("kantar.csv", extra.encode(), "ADMIN")
+
+    assert [(r.status, r.acceptance_id is not None) for r in summary.results] == [(DUPLICATE, False), (ACCEPTED, True)]
+    new_id = summary.results[1].acceptance_id
+    assert _count(session, StockMovement, StockMovement.reference_type == "acceptance", StockMovement.reference_id == new_id) == 1
+    assert _count(session, AuditLog, AuditLog.entity_id == str(new_id)) == 1
+
+
+def test_file_problems_and_roles_are_errors(session, materials):
+    service = WeighbridgeImportService(session)
+    with pytest.raises(AcceptanceAuthorizationError):
+        service.import_file("kantar.csv", EXPORT.encode(), "VIEWER")
+    with pytest.raises(WeighbridgeImportError, match="header row"):
+        service.import_file("kantar.csv", b"a;b\n1;2\n", "ADMIN")
+    with pytest.raises(WeighbridgeImportError, match="Only"):
+        service.import_file("kantar.txt", EXPORT.encode(), "ADMIN")
+
+
+def test_route_returns_per_row_results(engine, materials, tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", tmp_path)
+
+    def session_override():
+        with Session(engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = session_override
+    try:
+        client = TestClient(app)
+        files = {"file": ("kantar.csv", EXPORT.encode(), "text/csv")}
+        first = client.post("/imports/acceptance", files=files, headers={"X-Role": "ACCEPTANCE"})
+        again = client.post("/imports/acceptance", files=files, headers={"X-Role": "ACCEPTANCE"})
+        forbidden = client.post("/imports/acceptance", files=files, headers={"X-Role": "VIEWER"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert first.status_code == 200
+    assert [row["status"] for row in first.json()["rows"]] == [ACCEPTED, ACCEPTED, DUPLICATE, REJECTED, REJECTED, REJECTED]
+    assert again.status_code == 200
+    assert again.json()["accepted"] == 0
+    assert forbidden.status_code == 403
+    assert list(tmp_path.iterdir()) == []  # staged uploads are removed after every request